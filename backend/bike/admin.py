@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import HeroSection, HeroBikeImage, InfoSection, SupportFeature
-from .models import Location, BuyBike
+from .models import Location, BuyBike, BikeImage, IdempotencyKey, ImageJob
 from django.contrib import admin
 from .models import LastSection, LastSectionImage
 from django.utils.html import format_html   
@@ -15,6 +15,7 @@ from django.utils.html import format_html
 
 from .models import AboutSection1, AboutSection2, AboutSection3, AboutSection3Image
 from .models import SellBikePage, HowItWorks
+from .models import Brand, BikeModel, BikeVariant, Category, FuelType, Color
 
 class HowItWorksInline(admin.TabularInline):
     model = HowItWorks
@@ -133,6 +134,61 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 
+class BikeModelInline(admin.TabularInline):
+    model = BikeModel
+    extra = 1
+    fields = ("name",)
+
+
+class BikeVariantInline(admin.TabularInline):
+    model = BikeVariant
+    extra = 1
+    fields = ("name",)
+
+
+@admin.register(Brand)
+class BrandAdmin(admin.ModelAdmin):
+    list_display = ("name",)
+    search_fields = ("name",)
+    inlines = [BikeModelInline]
+
+
+@admin.register(BikeModel)
+class BikeModelAdmin(admin.ModelAdmin):
+    list_display = ("name", "brand")
+    list_filter = ("brand",)
+    list_select_related = ("brand",)
+    search_fields = ("name", "brand__name")
+    inlines = [BikeVariantInline]
+
+
+@admin.register(BikeVariant)
+class BikeVariantAdmin(admin.ModelAdmin):
+    list_display = ("name", "bike_model")
+    list_select_related = ("bike_model",)
+    search_fields = ("name", "bike_model__name")
+
+
+@admin.register(Category, FuelType, Color)
+class CatalogOptionAdmin(admin.ModelAdmin):
+    list_display = ("name",)
+    search_fields = ("name",)
+
+
+class BikeImageInline(admin.TabularInline):
+    model = BikeImage
+    extra = 1
+    fields = ("image_preview", "image", "order", "alt_text")
+    readonly_fields = ("image_preview",)
+    ordering = ("order",)
+
+    def image_preview(self, obj):
+        if obj and obj.image:
+            return format_html('<img src="{}" style="max-height:100px;"/>', obj.image.url)
+        return ""
+    image_preview.short_description = "Preview"
+
+
 @admin.register(BuyBike)
 class BuyBikeAdmin(admin.ModelAdmin):
     list_display = (
@@ -144,14 +200,11 @@ class BuyBikeAdmin(admin.ModelAdmin):
         "refurbished", "registration_certificate", "finance", "insurance", "warranty",
         "owners", "transmission", "location"
     )
-    search_fields = ("title", "brand", "description", "bike_model", "bike_variant")
+    search_fields = ("title", "external_ref", "brand__name", "description", "bike_model__name", "bike_variant__name")
+    list_select_related = ("brand", "bike_model", "bike_variant")
 
-    readonly_fields = (
-        "created_at", "updated_at", 
-        "featured_image_preview", 
-        "variant1_preview", "variant2_preview",
-        "variant3_preview", "variant4_preview", "variant5_preview"
-    )
+    readonly_fields = ("created_at", "updated_at", "featured_image_preview")
+    inlines = [BikeImageInline]
 
     def featured_image_preview(self, obj):
         if obj and obj.featured_image:
@@ -159,17 +212,6 @@ class BuyBikeAdmin(admin.ModelAdmin):
         return ""
     featured_image_preview.short_description = "Featured preview"
 
-    def variant1_preview(self, obj):
-        return format_html('<img src="{}" style="max-height:100px;"/>', obj.variant_image1.url) if obj.variant_image1 else ""
-    def variant2_preview(self, obj):
-        return format_html('<img src="{}" style="max-height:100px;"/>', obj.variant_image2.url) if obj.variant_image2 else ""
-    def variant3_preview(self, obj):
-        return format_html('<img src="{}" style="max-height:100px;"/>', obj.variant_image3.url) if obj.variant_image3 else ""
-    def variant4_preview(self, obj):
-        return format_html('<img src="{}" style="max-height:100px;"/>', obj.variant_image4.url) if obj.variant_image4 else ""
-    def variant5_preview(self, obj):
-        return format_html('<img src="{}" style="max-height:100px;"/>', obj.variant_image5.url) if obj.variant_image5 else ""
-
     fieldsets = (
         ("Basic", {
             "fields": (
@@ -180,15 +222,6 @@ class BuyBikeAdmin(admin.ModelAdmin):
                 ("featured_image", "card_bg_image"),
             )
         }),
-        ("Variant Thumbnails", {
-            "fields": (
-                "variant1_preview", "variant_image1",
-                "variant2_preview", "variant_image2",
-                "variant3_preview", "variant_image3",
-                "variant4_preview", "variant_image4",
-                "variant5_preview", "variant_image5",
-            )
-        }),
         ("Identity", {
             "fields": (
                 ("brand", "category"),
@@ -274,6 +307,28 @@ class FAQAdmin(admin.ModelAdmin):
     ordering = ("order",)
 
 
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "model", "object_id", "field", "status", "attempts", "width", "height", "created_at", "finished_at")
+    list_filter = ("status", "model")
+    search_fields = ("name", "result_name")
+    readonly_fields = [f.name for f in ImageJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ("id", "scope", "key", "status_code", "created_at", "expires_at")
+    list_filter = ("scope", "status_code")
+    search_fields = ("key",)
+    readonly_fields = [f.name for f in IdempotencyKey._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(ContactConfig)
 class ContactConfigAdmin(admin.ModelAdmin):
     list_display = ("heading", "is_active", "created_at")
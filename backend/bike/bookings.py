@@ -0,0 +1,111 @@
+"""
+Booking a bike as one atomic operation.
+
+The bike is claimed with a conditional `UPDATE ... SET is_booked = true WHERE
+id = %s AND is_booked = false`: the database serializes concurrent claims on
+the row, so exactly one request sees an updated row count of 1 and every
+other one gets BikeUnavailable (HTTP 409) instead of a second Booking. The
+claim and the Booking insert share a transaction, so a failed insert releases
+the bike again.
+
+The UPDATE bypasses BuyBike.save() and its signals, so it sets updated_at
+itself (conditional GET validators, inventory index watermark) and bumps the
+catalog version once the transaction commits.
+
+A booking that stays unpaid ("created") longer than BOOKING_HOLD_MINUTES is
+an abandoned hold: expire_holds() marks it "expired" and releases its bike,
+see the `expire_booking_holds` command.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import pricing
+from .cache import bump_catalog_version
+from .models import Booking, BuyBike
+
+logger = logging.getLogger(__name__)
+
+# bookings holding their bike: a bike whose bookings are all expired/cancelled is released
+LIVE_STATUSES = ("created", "paid")
+
+
+class BikeUnavailable(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This bike is already booked."
+    default_code = "bike_booked"
+
+
+def quote(bike, fees=()):
+    """
+    Booking amounts for `bike` plus the PRICING_FEES codes in `fees`, priced by
+    bike/pricing.py exactly like /api/pricing/quote/. gst_amount holds all
+    configured taxes and test_drive_fee all chosen fees (only "test_drive" by default).
+    """
+    available = pricing.fees()
+    priced = pricing.quote(bike.price, {code: available[code] for code in fees})
+    return {
+        "amount": priced["price"], "gst_amount": priced["tax_total"],
+        "test_drive_fee": priced["total"] - priced["price"] - priced["tax_total"], "total_amount": priced["total"],
+    }
+
+
+def book(bike, user=None, fees=()):
+    """Claims `bike` and creates its Booking, or raises BikeUnavailable."""
+    with transaction.atomic():
+        claimed = BuyBike.objects.filter(pk=bike.pk, is_booked=False).update(
+            is_booked=True, updated_at=timezone.now(),
+        )
+        if not claimed:
+            raise BikeUnavailable()
+        booking = Booking.objects.create(buybike=bike, user=user, status="created", **quote(bike, fees))
+        transaction.on_commit(bump_catalog_version)
+    bike.is_booked = True
+    return booking
+
+
+def expire_holds(batch_size=500, now=None):
+    """
+    Expires unpaid bookings older than the hold window, `batch_size` at a
+    time, and releases their bikes. Each batch is one indexed SELECT
+    (booking_status_created_idx, LIMIT batch_size) plus two set-based
+    UPDATEs, so a sweep costs O(expired holds) however large the table is.
+    Returns the run's metrics.
+    """
+    started = time.monotonic()
+    now = now or timezone.now()
+    cutoff = now - timedelta(minutes=settings.BOOKING_HOLD_MINUTES)
+    stats = {"expired": 0, "released": 0, "batches": 0}
+    while True:
+        holds = list(
+            Booking.objects.filter(status="created", created_at__lt=cutoff)
+            .order_by("created_at").values_list("id", "buybike_id")[:batch_size]
+        )
+        if not holds:
+            break
+        with transaction.atomic():
+            # conditional: a payment confirmed since the SELECT keeps its booking
+            stats["expired"] += Booking.objects.filter(id__in=[pk for pk, _ in holds], status="created").update(
+                status="expired", updated_at=now,
+            )
+            stats["released"] += (
+                BuyBike.objects.filter(pk__in={bike for _, bike in holds}, is_booked=True)
+                .exclude(bookings__status__in=LIVE_STATUSES)
+                .update(is_booked=False, updated_at=now)
+            )
+        stats["batches"] += 1
+        if len(holds) < batch_size:
+            break
+    if stats["released"]:
+        # released bikes are back in the cached listings
+        bump_catalog_version()
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    if stats["batches"]:
+        logger.info("booking holds swept: %s", stats)
+    return stats
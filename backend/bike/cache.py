@@ -0,0 +1,85 @@
+"""
+Catalog version counter and the versioned BuyBike response cache.
+
+Every BuyBike / Location change bumps the version (see bike/signals.py), so
+cache keys that embed it go stale at once instead of waiting for a timeout.
+The counter, facet counts and cached responses live in the "catalog" cache
+alias (falling back to "default"); configure a shared backend (Redis,
+Memcached, database, file) in CACHES when running several worker processes.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+CATALOG_VERSION_KEY = "bike:catalog-version"
+STATS_KEYS = {"hits": "bike:response-cache:hits", "misses": "bike:response-cache:misses"}
+
+
+def catalog_cache():
+    return caches["catalog" if "catalog" in settings.CACHES else "default"]
+
+
+def catalog_version():
+    cache = catalog_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    cache = catalog_cache()
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # key was evicted; any fresh value invalidates the old keys
+        cache.set(CATALOG_VERSION_KEY, catalog_version() + 1, timeout=None)
+        return cache.get(CATALOG_VERSION_KEY)
+
+
+# ---- response cache ---------------------------------------------------------
+
+def response_cache_enabled():
+    return getattr(settings, "CATALOG_RESPONSE_CACHE_ENABLED", True)
+
+
+def response_key(scope, request, signature):
+    """`signature` is the normalized query string / url kwargs of the request."""
+    renderer = getattr(request, "accepted_renderer", None)
+    # absolute URLs in the body differ between http:// and https:// requests
+    raw = "|".join([request.scheme, request.get_host(), getattr(renderer, "format", ""), signature])
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"bike:response:{catalog_version()}:{scope}:{digest}"
+
+
+def get_response(key):
+    entry = catalog_cache().get(key)
+    record_stat("hits" if entry is not None else "misses")
+    return entry
+
+
+def set_response(key, entry):
+    catalog_cache().set(key, entry)
+
+
+def record_stat(name):
+    cache = catalog_cache()
+    try:
+        cache.incr(STATS_KEYS[name])
+    except ValueError:
+        if not cache.add(STATS_KEYS[name], 1, timeout=None):
+            cache.incr(STATS_KEYS[name])
+
+
+def response_stats():
+    cache = catalog_cache()
+    hits = cache.get(STATS_KEYS["hits"], 0)
+    misses = cache.get(STATS_KEYS["misses"], 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0}
+
+
+def reset_response_stats():
+    catalog_cache().delete_many(list(STATS_KEYS.values()))
@@ -0,0 +1,67 @@
+"""
+Conditional GET (ETag / Last-Modified) for the catalog endpoints.
+
+The validators are computed from `updated_at` before anything is serialized,
+so a client revalidating an unchanged listing or bike gets a bodiless 304.
+Location / catalog option edits touch `updated_at` on the bikes they affect
+(see bike/signals.py), so it tracks everything the payloads render.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, urlencode
+
+
+def make_etag(request, *parts):
+    # absolute media URLs depend on the scheme and host, and the renderer picks the body format
+    renderer = getattr(request, "accepted_renderer", None)
+    raw = "|".join(str(p) for p in [request.scheme, request.get_host(), getattr(renderer, "format", ""), *parts])
+    return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+def query_signature(request):
+    # sorted, blank values dropped: "?b=1&a=" and "?b=1" select the same page
+    params = sorted(
+        (key, value) for key in request.query_params for value in request.query_params.getlist(key) if value != ""
+    )
+    return urlencode(params)
+
+
+def list_validators(request, latest, total):
+    """
+    ETag / Last-Modified for a filtered listing: the newest `updated_at` and
+    the row count of the selection plus every query param (filters, ordering,
+    page, cursor).
+    """
+    etag = make_etag(request, query_signature(request), latest.isoformat() if latest else "", total)
+    return etag, int(latest.timestamp()) if latest else None
+
+
+def page_validators(request, rows, has_next, has_previous):
+    """
+    ETag / Last-Modified for one keyset page: its rows' ids and `updated_at`
+    plus whether it links onwards. The rows are fetched anyway, so this needs
+    no query over the rest of the selection.
+    """
+    stamps = [f"{row.pk}:{row.updated_at.isoformat()}" for row in rows]
+    etag = make_etag(request, query_signature(request), has_next, has_previous, *stamps)
+    latest = max((row.updated_at for row in rows), default=None)
+    return etag, int(latest.timestamp()) if latest else None
+
+
+def object_validators(request, obj):
+    return make_etag(request, obj.pk, obj.updated_at.isoformat()), int(obj.updated_at.timestamp())
+
+
+def not_modified(request, etag, last_modified):
+    """Returns a 304 response when the client's validators still match, else None."""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # let clients keep the body but revalidate every time
+    patch_cache_control(response, no_cache=True)
+    return response
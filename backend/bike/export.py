@@ -0,0 +1,156 @@
+"""
+Streaming CSV / NDJSON export of the (BikeFilter-filtered) BuyBike inventory.
+
+Rows are read with `values_list(...).iterator(chunk_size)` (a server-side
+cursor on PostgreSQL), encoded line by line, grouped into ~64 KB pieces and
+optionally gzip-compressed on the fly, so memory stays flat whatever the
+inventory size. Used by /api/buybikes/export/ and the `export_bikes` command.
+
+Columns use the names `import_bikes` reads (catalog/location names, image
+storage paths), so an export can be re-imported as is: rows update the bike
+with their `external_ref`, or their `id` when they have none.
+"""
+import csv
+import zlib
+from collections import defaultdict
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import BikeImage
+
+# column -> values_list lookup
+COLUMNS = {
+    "id": "id",
+    "external_ref": "external_ref",
+    "title": "title",
+    "description": "description",
+    "price": "price",
+    "location": "location__name",
+    "brand": "brand__name",
+    "bike_model": "bike_model__name",
+    "bike_variant": "bike_variant__name",
+    "category": "category__name",
+    "fuel_type": "fuel_type__name",
+    "color": "color__name",
+    "year": "year",
+    "registration_year": "registration_year",
+    "kilometers": "kilometers",
+    "engine_cc": "engine_cc",
+    "owner": "owner",
+    "owners": "owners",
+    "transmission": "transmission",
+    "rto_state": "rto_state",
+    "rto_city": "rto_city",
+    "refurbished": "refurbished",
+    "registration_certificate": "registration_certificate",
+    "finance": "finance",
+    "insurance": "insurance",
+    "warranty": "warranty",
+    "is_booked": "is_booked",
+    "ignition_type": "ignition_type",
+    "front_brake_type": "front_brake_type",
+    "rear_brake_type": "rear_brake_type",
+    "abs": "abs",
+    "odometer": "odometer",
+    "wheel_type": "wheel_type",
+    "featured_image": "featured_image",
+    "card_bg_image": "card_bg_image",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+# ordered BikeImage storage names, fetched per chunk: a JSON list, "|"-joined in CSV
+GALLERY_COLUMN = "images"
+HEADER = [*COLUMNS, GALLERY_COLUMN]
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+
+def rows(queryset, chunk_size=CHUNK_SIZE):
+    # stable order so partial downloads / diffs line up
+    records = queryset.order_by("id").values_list(*COLUMNS.values()).iterator(chunk_size=chunk_size)
+    while True:
+        batch = list(islice(records, chunk_size))
+        if not batch:
+            return
+        galleries = defaultdict(list)
+        images = BikeImage.objects.filter(bike_id__in=[record[0] for record in batch])
+        for bike_id, name in images.order_by("bike_id", "order", "pk").values_list("bike_id", "image"):
+            galleries[bike_id].append(name)
+        for record in batch:
+            yield (*record, galleries.get(record[0], []))
+
+
+class _Echo:
+    """File-like object whose write() just returns the line for csv.writer."""
+    def write(self, value):
+        return value
+
+
+def csv_lines(records):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(HEADER)
+    for *values, gallery in records:
+        yield writer.writerow(["" if value is None else value for value in values] + ["|".join(gallery)])
+
+
+def ndjson_lines(records):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for record in records:
+        yield encoder.encode(dict(zip(HEADER, record))) + "\n"
+
+
+def buffered(lines, size=BUFFER_SIZE):
+    """Joins lines into ~`size`-byte UTF-8 pieces."""
+    parts, length = [], 0
+    for line in lines:
+        data = line.encode("utf-8")
+        parts.append(data)
+        length += len(data)
+        if length >= size:
+            yield b"".join(parts)
+            parts, length = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def accepts_gzip(header):
+    """
+    Whether an Accept-Encoding header allows gzip: listed (or covered by "*")
+    with a non-zero q-value. "gzip;q=0" refuses it.
+    """
+    qualities = {}
+    for item in (header or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def gzipped(pieces, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for piece in pieces:
+        data = compressor.compress(piece)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(queryset, fmt="csv", gzip=False, chunk_size=CHUNK_SIZE):
+    """Byte chunks of the whole export of `queryset`."""
+    lines = csv_lines if fmt == "csv" else ndjson_lines
+    pieces = buffered(lines(rows(queryset, chunk_size)))
+    return gzipped(pieces) if gzip else pieces
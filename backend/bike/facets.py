@@ -0,0 +1,114 @@
+"""
+Facet counts for the buy page filters.
+
+All facets are computed from a single GROUP BY over the filtered BuyBike
+queryset (one row per distinct brand/category/.../price-bucket/year-bucket
+combination) and rolled up in Python, so one query answers every facet.
+"""
+import hashlib
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Case, Count, IntegerField, Value, When
+
+from .cache import catalog_cache, catalog_version
+
+# catalog lookup FKs report {"id", "value", "count"}; choice fields {"value", "count"}
+REF_FACETS = ["brand", "category", "fuel_type", "color"]
+CHOICE_FACETS = ["owners", "transmission"]
+FACET_FIELDS = REF_FACETS + CHOICE_FACETS
+
+# (label, min, max) -> maps straight onto BikeFilter price_min/price_max, year_min/year_max
+PRICE_BUCKETS = [
+    ("Under 50,000", None, 49999),
+    ("50,000 - 1,00,000", 50000, 99999),
+    ("1,00,000 - 2,00,000", 100000, 199999),
+    ("2,00,000 - 5,00,000", 200000, 499999),
+    ("5,00,000 and above", 500000, None),
+]
+YEAR_BUCKETS = [
+    ("Before 2010", None, 2009),
+    ("2010 - 2014", 2010, 2014),
+    ("2015 - 2019", 2015, 2019),
+    ("2020 and newer", 2020, None),
+]
+
+FACET_CACHE_TIMEOUT = getattr(settings, "FACET_CACHE_TIMEOUT", 60 * 10)
+
+
+def bucket_case(field, buckets):
+    # NULL values land in bucket -1, which is not reported
+    whens = [When(**{f"{field}__isnull": True}, then=Value(-1))]
+    whens += [
+        When(**{f"{field}__lte": upper}, then=Value(index))
+        for index, (_, _, upper) in enumerate(buckets) if upper is not None
+    ]
+    return Case(*whens, default=Value(len(buckets) - 1), output_field=IntegerField())
+
+
+def filter_signature(params, filter_names):
+    """Stable hash of the filter params that actually affect the result."""
+    parts = []
+    for name in sorted(filter_names):
+        values = sorted(v.strip() for v in params.getlist(name) if v.strip())
+        if values:
+            parts.append(f"{name}={','.join(values)}")
+    return hashlib.md5("&".join(parts).encode()).hexdigest()
+
+
+def compute_facets(queryset):
+    rows = (
+        queryset.order_by()
+        .annotate(price_bucket=bucket_case("price", PRICE_BUCKETS), year_bucket=bucket_case("year", YEAR_BUCKETS))
+        .values(*FACET_FIELDS, *[f"{field}__name" for field in REF_FACETS], "price_bucket", "year_bucket")
+        .annotate(n=Count("id"))
+    )
+
+    total = 0
+    counters = {field: Counter() for field in FACET_FIELDS}
+    price_counts = Counter()
+    year_counts = Counter()
+    for row in rows:
+        n = row["n"]
+        total += n
+        for field in REF_FACETS:
+            if row[field]:
+                counters[field][(row[field], row[f"{field}__name"])] += n
+        for field in CHOICE_FACETS:
+            if row[field]:
+                counters[field][row[field]] += n
+        price_counts[row["price_bucket"]] += n
+        year_counts[row["year_bucket"]] += n
+
+    facets = {}
+    for field in REF_FACETS:
+        facets[field] = [
+            {"id": pk, "value": name, "count": count}
+            for (pk, name), count in sorted(counters[field].items(), key=lambda kv: (-kv[1], kv[0][1]))
+        ]
+    for field in CHOICE_FACETS:
+        facets[field] = [
+            {"value": value, "count": count}
+            for value, count in sorted(counters[field].items(), key=lambda kv: (-kv[1], kv[0]))
+        ]
+    facets["price"] = [
+        {"label": label, "min": low, "max": high, "count": price_counts[index]}
+        for index, (label, low, high) in enumerate(PRICE_BUCKETS)
+    ]
+    facets["year"] = [
+        {"label": label, "min": low, "max": high, "count": year_counts[index]}
+        for index, (label, low, high) in enumerate(YEAR_BUCKETS)
+    ]
+    return {"count": total, "facets": facets}
+
+
+def cached_facets(filterset):
+    """Facets for a bound BikeFilter, cached per catalog version + filter signature."""
+    signature = filter_signature(filterset.data, filterset.filters.keys())
+    key = f"bike:facets:{catalog_version()}:{signature}"
+    cache = catalog_cache()
+    data = cache.get(key)
+    if data is None:
+        data = compute_facets(filterset.qs)
+        cache.set(key, data, FACET_CACHE_TIMEOUT)
+    return data
@@ -1,6 +1,43 @@
 import django_filters
-from django.db.models import Q
+from django.db.models import F, Q
+from rest_framework import filters
 from .models import BuyBike
+from . import search
+
+class CatalogOptionFilter(django_filters.CharFilter):
+    """
+    Comma separated ids and/or names of a catalog lookup (Brand, Category, ...).
+    Names are resolved to ids against the small lookup table first, so the
+    BuyBike query is always an indexed `<fk>_id IN (...)`. A name matches its
+    option case-insensitively; a name that is no option's full name matches
+    every option containing it, like the old `icontains` filters
+    (?category=EV -> "EV (Electric Vehicle)", ?brand=royal -> "Royal Enfield").
+    """
+    def option_ids(self, model, value):
+        ids, names = set(), []
+        for part in value.split(","):
+            part = " ".join(part.split())
+            if part.isdigit():
+                ids.add(int(part))
+            elif part:
+                names.append(part)
+        if names:
+            option_model = model._meta.get_field(self.field_name).related_model
+            by_name = Q()
+            for name in names:
+                by_name |= Q(name__icontains=name)
+            candidates = list(option_model.objects.filter(by_name).values_list("pk", "name"))
+            for name in names:
+                wanted = name.casefold()
+                exact = [pk for pk, option in candidates if option.casefold() == wanted]
+                ids.update(exact or [pk for pk, option in candidates if wanted in option.casefold()])
+        return sorted(ids)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return qs.filter(**{f"{self.field_name}__in": self.option_ids(qs.model, value)})
+
 
 class BikeFilter(django_filters.FilterSet):
     price_min = django_filters.NumberFilter(field_name="price", lookup_expr="gte")
@@ -11,13 +48,18 @@ class BikeFilter(django_filters.FilterSet):
     engine_cc_min = django_filters.NumberFilter(field_name="engine_cc", lookup_expr="gte")
     engine_cc_max = django_filters.NumberFilter(field_name="engine_cc", lookup_expr="lte")
 
-    # For textual filters, use icontains for partial matching (more user friendly)
-    brand = django_filters.CharFilter(field_name="brand", lookup_expr="icontains")
-    category = django_filters.CharFilter(field_name="category", lookup_expr="icontains")
-    fuel_type = django_filters.CharFilter(field_name="fuel_type", lookup_expr="icontains")
-    color = django_filters.CharFilter(field_name="color", lookup_expr="icontains")
+    # available=true -> unbooked inventory only (served by the partial indexes on BuyBike)
+    available = django_filters.BooleanFilter(field_name="is_booked", exclude=True)
+
+    # Catalog lookups: multi-value, indexed FK matches (?brand=1,4,7 or ?brand=Honda,TVS or ?brand=royal)
+    brand = CatalogOptionFilter(field_name="brand")
+    bike_model = CatalogOptionFilter(field_name="bike_model")
+    bike_variant = CatalogOptionFilter(field_name="bike_variant")
+    category = CatalogOptionFilter(field_name="category")
+    fuel_type = CatalogOptionFilter(field_name="fuel_type")
+    color = CatalogOptionFilter(field_name="color")
 
-    # custom multi-field search (search across title/description/brand/location.name)
+    # full-text search across title/brand/model/variant/category/location/description
     search = django_filters.CharFilter(method="search_filter")
 
     class Meta:
@@ -26,10 +68,36 @@ class BikeFilter(django_filters.FilterSet):
         fields = []
 
     def search_filter(self, queryset, name, value):
-        # treat location as FK -> search location.name
-        return queryset.filter(
-            Q(title__icontains=value) |
-            Q(description__icontains=value) |
-            Q(brand__icontains=value) |
-            Q(location__name__icontains=value)
-        )
+        # FTS5 / tsvector index, see bike/search.py; annotates search_rank
+        return search.search_queryset(queryset, value)
+
+
+class BuyBikeOrderingFilter(filters.OrderingFilter):
+    """
+    Same as DRF's OrderingFilter, but a search without an explicit
+    ?ordering= is ordered by relevance (best match first), and the order is
+    total: NULLs (year / kilometers) sort last and `id` breaks ties in the
+    direction of the first term. Page-number pages are then stable across
+    requests and agree with the cursor pagination and the inventory index.
+    """
+    tiebreaker = "id"
+    search_param = "search"
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and search.tokens(
+            request.query_params.get(self.search_param)
+        ):
+            return ["-search_rank", "-created_at"]
+        return super().get_ordering(request, queryset, view)
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        exprs = [
+            F(term.lstrip("-")).desc(nulls_last=True) if term.startswith("-") else F(term).asc(nulls_last=True)
+            for term in ordering
+        ]
+        if self.tiebreaker not in {term.lstrip("-") for term in ordering}:
+            exprs.append(F(self.tiebreaker).desc() if ordering[0].startswith("-") else F(self.tiebreaker).asc())
+        return queryset.order_by(*exprs)
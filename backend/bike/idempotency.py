@@ -0,0 +1,113 @@
+"""
+`Idempotency-Key` support for POST endpoints (booking creation and payment
+confirmation), so a double click or a mobile retry cannot book twice.
+
+The first request with a key inserts an IdempotencyKey row (unique on scope +
+key) in the same transaction as the view's own writes, and stores the
+response on it when the view succeeds. A retry with the same key is then one
+indexed SELECT that replays the stored response, with an
+`Idempotent-Replayed: true` header, without touching BuyBike or Booking.
+
+- A request that fails (any exception or non-2xx response) stores nothing,
+  so its retry runs again.
+- A concurrent duplicate blocks on the unique index until the first request
+  commits, then replays it (or runs itself if the first one rolled back).
+- Reusing a key for a different user, booking or body is a 422.
+- Keys are replayed for IDEMPOTENCY_KEY_TTL_HOURS; expired rows are
+  ignored and deleted by `purge_idempotency_keys`.
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was already used for a different request."
+    default_code = "idempotency_key_reused"
+
+
+def fingerprint(request, kwargs):
+    user = request.user.pk if request.user and request.user.is_authenticated else None
+    payload = json.dumps([user, kwargs, request.data], sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def replay(record, digest):
+    if record.fingerprint != digest:
+        raise IdempotencyKeyReused()
+    response = Response(record.response, status=record.status_code)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def purge_expired(batch_size=1000):
+    """Deletes expired keys in batches; returns how many were deleted."""
+    deleted = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=timezone.now())
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=ids).delete()[0]
+
+
+def idempotent(scope):
+    """
+    Decorates a view's `post` so it honours an Idempotency-Key header under
+    `scope`; requests without the header are unaffected.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def post(view, request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if not key:
+                return handler(view, request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                raise ValidationError({HEADER: f"Must be at most {MAX_KEY_LENGTH} characters."})
+
+            digest = fingerprint(request, kwargs)
+            record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+            if record and record.expires_at <= timezone.now():
+                record.delete()
+                record = None
+            if record:
+                return replay(record, digest)
+
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        scope=scope, key=key, fingerprint=digest,
+                        expires_at=timezone.now() + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+                    )
+                    response = handler(view, request, *args, **kwargs)
+                    if status.is_success(response.status_code):
+                        record.status_code, record.response = response.status_code, response.data
+                        record.save(update_fields=["status_code", "response"])
+                    else:
+                        record.delete()
+                    return response
+            except IntegrityError:
+                # a concurrent request with the same key committed first
+                record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+                if record is None:
+                    raise
+                return replay(record, digest)
+        return post
+    return decorator
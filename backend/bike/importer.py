@@ -0,0 +1,414 @@
+"""
+Streaming bulk import of BuyBike rows from CSV or JSON Lines (`import_bikes`).
+
+Records are read one at a time and handled in chunks: every row of a chunk is
+validated against the model fields, location / catalog names are resolved in bulk,
+and the valid rows are written with one bulk_create + one bulk_update inside
+a transaction. Rows carrying an `external_ref` that already exists update
+that bike; rows without one update the bike with their `id` if it exists (so
+an `export_bikes` file re-imports onto the same bikes); everything else is
+created. Memory use is bounded by the chunk size, not the file size.
+
+A record is validated as a whole before it touches its bike, and image files
+are copied into storage only once it is valid; the files a chunk copied are
+deleted again if its transaction rolls back. Bulk writes skip the model
+signals, so each committed chunk indexes its bikes for full-text search,
+queues the image jobs of the files it copied and bumps the catalog version
+itself. After every commit
+a JSON checkpoint records how many records are done, so an interrupted import
+can continue with --resume.
+"""
+import csv
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import models, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from . import jobs, search
+from .cache import bump_catalog_version
+from .models import BikeImage, BikeModel, BikeVariant, Brand, BuyBike, Category, Color, FuelType, ImageJob, Location
+
+SCALAR_FIELDS = [
+    "external_ref", "title", "description", "price", "year", "registration_year", "kilometers", "engine_cc",
+    "owner", "owners", "transmission", "rto_state", "rto_city", "refurbished", "registration_certificate",
+    "finance", "insurance", "warranty", "is_booked", "ignition_type", "front_brake_type", "rear_brake_type",
+    "abs", "odometer", "wheel_type",
+]
+REQUIRED_FIELDS = ["title", "price"]
+# name columns -> lookup model (bike_model is scoped by brand, bike_variant by bike_model)
+OPTION_FIELDS = {"brand": Brand, "category": Category, "fuel_type": FuelType, "color": Color}
+IMAGE_FIELDS = ["featured_image", "card_bg_image"]
+# ordered BikeImage gallery: a JSON list or a "|"-separated string of paths; replaces the bike's gallery
+GALLERY_COLUMN = "images"
+
+WRITABLE_FIELDS = [*SCALAR_FIELDS, "location", *OPTION_FIELDS, "bike_model", "bike_variant", *IMAGE_FIELDS]
+
+BOOLEAN_WORDS = {"true": True, "yes": True, "y": True, "1": True, "false": False, "no": False, "n": False, "0": False}
+
+MAX_REPORTED_ERRORS = 20
+
+
+def clean_value(model_field, raw, instance):
+    """Model-level validation of one imported value (choices, max_length, validators)."""
+    if isinstance(raw, str):
+        raw = raw.strip()
+        if isinstance(model_field, models.BooleanField) and raw.lower() in BOOLEAN_WORDS:
+            raw = BOOLEAN_WORDS[raw.lower()]
+    if raw in ("", None):
+        if isinstance(model_field, models.BooleanField):
+            raw = False
+        elif model_field.null:
+            raw = None
+        else:
+            raw = ""
+    return model_field.clean(raw, instance)
+
+
+def read_records(path, fmt=None):
+    """Yields (record number, dict or parse error string), streaming the file."""
+    fmt = fmt or ("csv" if str(path).lower().endswith(".csv") else "jsonl")
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(handle), start=1):
+                yield number, {key.strip(): value for key, value in row.items() if key}
+            return
+        number = 0
+        for line in handle:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield number, f"invalid JSON: {exc}"
+                continue
+            yield number, record if isinstance(record, dict) else "expected a JSON object"
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+    # csv.writer receiving every failed record (`errors` keeps the first few only)
+    report: object = None
+
+    def error(self, number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((number, message))
+        if self.report is not None:
+            self.report.writerow([number, message])
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+class BikeImporter:
+    def __init__(self, images_dir=None, chunk_size=500, dry_run=False, error_report=None):
+        self.images_dir = Path(images_dir).resolve() if images_dir else None
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.stats = ImportStats(report=error_report)
+        self.locations = {}
+        self.options = {}
+        # (storage, name) of the files copied by the current chunk
+        self.copied = []
+
+    # ---- name resolution ---------------------------------------------------
+
+    def resolve_locations(self, names):
+        """Upserts every location of a chunk with one SELECT and one bulk INSERT."""
+        missing = {" ".join(n.split()).lower(): " ".join(n.split()) for n in names}
+        missing = {key: name for key, name in missing.items() if key and key not in self.locations}
+        if not missing:
+            return
+        existing = Location.objects.annotate(lname=Lower("name")).filter(lname__in=list(missing))
+        for location in existing:
+            self.locations[location.name.lower()] = location
+        new = [Location(name=name) for key, name in missing.items() if key not in self.locations]
+        for location in Location.objects.bulk_create(new):
+            self.locations[location.name.lower()] = location
+
+    def location(self, name):
+        return self.locations.get(" ".join((name or "").split()).lower())
+
+    def option(self, model, name, **scope):
+        name = " ".join((name or "").split())
+        if not name:
+            return None
+        key = (model, name.lower(), tuple(sorted((k, getattr(v, "pk", v)) for k, v in scope.items())))
+        if key not in self.options:
+            self.options[key] = model.objects.resolve(name, **scope)
+        return self.options[key]
+
+    # ---- images ------------------------------------------------------------
+
+    def image_source(self, value):
+        """The file an image path relative to --images-dir points at."""
+        if self.images_dir is None:
+            raise ValueError("image columns need --images-dir")
+        source = (self.images_dir / value).resolve()
+        if self.images_dir not in source.parents or not source.is_file():
+            raise ValueError(f"{value!r} not found in {self.images_dir}")
+        return source
+
+    def image_name(self, model_field, instance, source):
+        """Storage name for an image source file (copied into storage unless it is already media)."""
+        media_root = Path(settings.MEDIA_ROOT).resolve()
+        if media_root in source.parents:
+            return source.relative_to(media_root).as_posix()
+        name = model_field.generate_filename(instance, source.name)
+        if self.dry_run:
+            return name
+        with open(source, "rb") as handle:
+            name = model_field.storage.save(name, File(handle))
+        self.copied.append((model_field.storage, name))
+        return name
+
+    def discard_copies(self):
+        """
+        Deletes the files copied by a rolled-back chunk. A content-addressed
+        save may have returned a blob that committed rows already use; those
+        are kept.
+        """
+        names = {name for _, name in self.copied}
+        for model in apps.get_app_config("bike").get_models():
+            for model_field in model._meta.get_fields():
+                if names and isinstance(model_field, models.FileField):
+                    names -= set(
+                        model._default_manager.filter(**{f"{model_field.attname}__in": names})
+                        .values_list(model_field.attname, flat=True)
+                    )
+        for storage, name in self.copied:
+            if name in names:
+                storage.delete(name)
+        self.copied = []
+
+    # ---- chunks ------------------------------------------------------------
+
+    @staticmethod
+    def record_key(record):
+        """("external_ref", ref) or ("id", pk) to upsert on, or None to create."""
+        ref = str(record.get("external_ref") or "").strip()
+        if ref:
+            return ("external_ref", ref)
+        pk = str(record.get("id") or "").strip()
+        if not pk:
+            return None
+        if not pk.isdigit():
+            raise ValueError(f"id: {pk!r} is not a number")
+        return ("id", int(pk))
+
+    def build(self, record, existing, pending):
+        present = [name for name in SCALAR_FIELDS if name in record]
+        key = self.record_key(record)
+        ref = key[1] if key and key[0] == "external_ref" else None
+        instance = (pending.get(key) or existing.get(key)) if key else None
+        creating = instance is None
+        if creating:
+            instance = BuyBike()
+            missing = [name for name in REQUIRED_FIELDS if name not in present]
+            if missing:
+                raise ValueError(f"missing required column(s): {', '.join(missing)}")
+        # validate the whole record before assigning anything: a failed record must
+        # not leave half its values on a bike a later record of the chunk updates
+        values, errors = {}, []
+        for name in present:
+            try:
+                values[name] = clean_value(BuyBike._meta.get_field(name), record[name], instance)
+            except ValidationError as exc:
+                errors.append(f"{name}: {' '.join(exc.messages)}")
+        if ref:
+            values["external_ref"] = ref
+        if errors:
+            raise ValueError("; ".join(errors))
+        sources = {}
+        for name in IMAGE_FIELDS:
+            if name in record:
+                value = (record[name] or "").strip()
+                try:
+                    sources[name] = self.image_source(value) if value else None
+                except ValueError as exc:
+                    raise ValueError(f"{name}: {exc}")
+        gallery = None
+        if GALLERY_COLUMN in record:
+            paths = record[GALLERY_COLUMN] or []
+            if isinstance(paths, str):
+                paths = paths.split("|")
+            try:
+                gallery = [self.image_source(path.strip()) for path in paths if path.strip()]
+            except ValueError as exc:
+                raise ValueError(f"{GALLERY_COLUMN}: {exc}")
+        if creating and key and key[0] == "id":
+            key = None  # an id this database does not have: a new bike, not that id
+
+        if "location" in record:
+            values["location"] = self.location(str(record["location"] or ""))
+        for name, model in OPTION_FIELDS.items():
+            if name in record:
+                values[name] = self.option(model, record[name])
+        if "bike_model" in record:
+            brand = values["brand"] if "brand" in values else instance.brand
+            values["bike_model"] = self.option(BikeModel, record["bike_model"], brand=brand)
+        if "bike_variant" in record:
+            bike_model = values["bike_model"] if "bike_model" in values else instance.bike_model
+            values["bike_variant"] = self.option(BikeVariant, record["bike_variant"], bike_model=bike_model)
+        for name, source in sources.items():
+            values[name] = self.image_name(BuyBike._meta.get_field(name), instance, source) if source else None
+        if gallery is not None:
+            image_field = BikeImage._meta.get_field("image")
+            instance._import_gallery = [self.image_name(image_field, instance, source) for source in gallery]
+
+        for name, value in values.items():
+            setattr(instance, name, value)
+        images = [name for name in IMAGE_FIELDS if values.get(name)]
+        if images:
+            instance._import_images = [*getattr(instance, "_import_images", []), *images]
+        return key, instance
+
+    def write_galleries(self, bikes):
+        bikes = [bike for bike in bikes if hasattr(bike, "_import_gallery")]
+        if not bikes:
+            return []
+        # one DELETE without the per-image delete signals, which would re-touch every
+        # bike and bump the catalog version per image; commit() bumps it once
+        old = BikeImage.objects.filter(bike__in=[bike.pk for bike in bikes])
+        old._raw_delete(old.db)
+        return BikeImage.objects.bulk_create(
+            [
+                BikeImage(bike=bike, image=name, order=order)
+                for bike in bikes for order, name in enumerate(bike._import_gallery, start=1)
+            ],
+            batch_size=self.chunk_size,
+        )
+
+    def write_chunk(self, chunk):
+        keys = []
+        for _, record in chunk:
+            try:
+                keys.append(self.record_key(record) if isinstance(record, dict) else None)
+            except ValueError:
+                keys.append(None)  # reported by build()
+        existing = {}
+        for field_name in ("external_ref", "id"):
+            values = [key[1] for key in keys if key and key[0] == field_name]
+            if values:
+                existing.update(
+                    ((field_name, value), bike)
+                    for value, bike in BuyBike.objects.in_bulk(values, field_name=field_name).items()
+                )
+        self.resolve_locations(str(r["location"]) for _, r in chunk if isinstance(r, dict) and r.get("location"))
+
+        pending = {}
+        creates, updates, update_fields = [], [], {"updated_at"}
+        for number, record in chunk:
+            self.stats.read += 1
+            if not isinstance(record, dict):
+                self.stats.error(number, record)
+                continue
+            try:
+                key, instance = self.build(record, existing, pending)
+            except ValueError as exc:
+                self.stats.error(number, str(exc))
+                continue
+            if instance.pk is not None:
+                update_fields.update(name for name in WRITABLE_FIELDS if name in record)
+            if key and key in pending:
+                continue  # the same bike again in this chunk: already queued, last values win
+            if key:
+                pending[key] = instance
+            if instance.pk is None:
+                creates.append(instance)
+            else:
+                instance.updated_at = timezone.now()
+                updates.append(instance)
+
+        BuyBike.objects.bulk_create(creates, batch_size=self.chunk_size)
+        if updates:
+            BuyBike.objects.bulk_update(updates, sorted(update_fields), batch_size=self.chunk_size)
+        gallery = self.write_galleries(creates + updates)
+        # resizing / metadata stripping / renditions happen in `process_image_jobs`
+        ImageJob.objects.bulk_create(
+            [jobs.job_for(bike, name) for bike in creates + updates for name in getattr(bike, "_import_images", [])]
+            + [jobs.job_for(image, "image") for image in gallery],
+            batch_size=self.chunk_size,
+        )
+        # bulk writes bypass the post_save search indexing; re-read with the
+        # related names the documents need instead of lazy-loading them per bike
+        search.index_bikes(
+            BuyBike.objects.filter(pk__in=[bike.pk for bike in creates + updates])
+            .select_related(*search.DOCUMENT_RELATED)
+        )
+        self.stats.created += len(creates)
+        self.stats.updated += len(updates)
+
+    def run(self, records, skip=0, on_chunk=None):
+        chunk = []
+        for number, record in records:
+            if number <= skip:
+                continue
+            chunk.append((number, record))
+            if len(chunk) >= self.chunk_size:
+                self.commit(chunk, on_chunk)
+                chunk = []
+        if chunk:
+            self.commit(chunk, on_chunk)
+        return self.stats
+
+    def commit(self, chunk, on_chunk=None):
+        try:
+            with transaction.atomic():
+                self.write_chunk(chunk)
+                if self.dry_run:
+                    transaction.set_rollback(True)
+        except Exception:
+            self.discard_copies()
+            raise
+        self.copied = []
+        if self.dry_run:
+            # rolled back: forget rows that no longer exist
+            self.locations.clear()
+            self.options.clear()
+        else:
+            bump_catalog_version()
+        if on_chunk:
+            on_chunk(chunk[-1][0], self.stats)
+
+
+def load_checkpoint(path, source):
+    if not os.path.exists(path):
+        return 0
+    with open(path) as handle:
+        data = json.load(handle)
+    if data.get("source") != str(Path(source).resolve()):
+        raise ValueError(f"checkpoint {path} belongs to {data.get('source')}")
+    return data["records"]
+
+
+def save_checkpoint(path, source, number, stats):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as handle:
+        json.dump({
+            "source": str(Path(source).resolve()), "records": number,
+            "created": stats.created, "updated": stats.updated, "failed": stats.failed,
+        }, handle)
+    shutil.move(tmp, path)
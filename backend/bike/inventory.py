@@ -0,0 +1,237 @@
+"""
+Optional per-process columnar index of the BuyBike inventory.
+
+The numeric columns BikeFilter ranges over and BuyBikeList sorts by are kept
+as NumPy arrays, so a page-number listing request becomes a vectorized mask +
+argsort that yields an ordered list of ids; only the ids on the requested page
+are hydrated from the database (one `id__in` query).
+
+Enabled with settings.INVENTORY_INDEX_ENABLED and only when NumPy is
+installed. Requests the index cannot answer (full-text search, cursor mode,
+multi-field ordering, invalid params) fall back to the normal ORM path.
+The index refreshes incrementally from `updated_at`, at most once every
+INVENTORY_INDEX_REFRESH_SECONDS or as soon as the catalog version changes,
+and reloads fully when rows disappear. Each refresh re-reads the rows updated
+within WATERMARK_OVERLAP of the newest one it has seen: `updated_at` is set
+before commit, so a slow transaction can become visible after a later one
+and a strict `updated_at > watermark` would miss it for good.
+
+Page order is BuyBikeOrderingFilter's: the field with NULLs last, then `id`
+in the same direction, so an indexed page holds exactly the rows the ORM
+path would return for it.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+
+from .cache import catalog_version
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+NUMBER_COLUMNS = {
+    # column -> dtype; nullable columns are float so NULL can be NaN
+    "price": "float64",
+    "year": "float64",
+    "kilometers": "float64",
+    "engine_cc": "float64",
+}
+REF_COLUMNS = ["location", "brand", "bike_model", "bike_variant", "category", "fuel_type", "color"]
+ORDERING_COLUMNS = {"created_at", "price", "kilometers", "year", "id"}
+WATERMARK_OVERLAP = timedelta(minutes=5)  # longest expected write transaction
+
+NULL_REF = -1
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_micros(value):
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def enabled():
+    return np is not None and getattr(settings, "INVENTORY_INDEX_ENABLED", False)
+
+
+class InventoryIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.columns = None
+        self.watermark = None
+        self.checked_at = 0.0
+        self.version = None
+        self.generation = 0  # bumped whenever the columns change
+        self.needs_reload = True
+
+    # ---- loading -----------------------------------------------------------
+
+    def _fetch(self, queryset):
+        fields = ["id", "created_at", "updated_at", "is_booked", *NUMBER_COLUMNS, *[f"{c}_id" for c in REF_COLUMNS]]
+        rows = list(queryset.order_by().values_list(*fields))
+        columns = {"id": np.array([r[0] for r in rows], dtype="int64")}
+        # microseconds, exact: ties must stay ties and distinct values distinct,
+        # and the conditional GET validators must match the ORM path
+        columns["created_at"] = np.array([to_micros(r[1]) for r in rows], dtype="int64")
+        columns["updated_at"] = np.array([to_micros(r[2]) for r in rows], dtype="int64")
+        columns["is_booked"] = np.array([bool(r[3]) for r in rows], dtype=bool)
+        offset = 4
+        for i, (name, dtype) in enumerate(NUMBER_COLUMNS.items()):
+            columns[name] = np.array([np.nan if r[offset + i] is None else r[offset + i] for r in rows], dtype=dtype)
+        offset += len(NUMBER_COLUMNS)
+        for i, name in enumerate(REF_COLUMNS):
+            columns[name] = np.array([NULL_REF if r[offset + i] is None else r[offset + i] for r in rows], dtype="int64")
+        watermark = max((r[2] for r in rows), default=None)
+        return columns, watermark
+
+    def _reload(self, model):
+        self.columns, self.watermark = self._fetch(model.objects.all())
+        self.needs_reload = False
+        self.generation += 1
+
+    def _merge(self, model):
+        changed, watermark = self._fetch(model.objects.filter(updated_at__gte=self.watermark - WATERMARK_OVERLAP))
+        seen = np.isin(self.columns["id"], changed["id"])
+        known = dict(zip(self.columns["id"][seen].tolist(), self.columns["updated_at"][seen].tolist()))
+        if all(known.get(pk) == stamp for pk, stamp in zip(changed["id"].tolist(), changed["updated_at"].tolist())):
+            return  # only rows an earlier refresh already merged
+        self.columns = {name: np.concatenate([col[~seen], changed[name]]) for name, col in self.columns.items()}
+        self.watermark = max(self.watermark, watermark)
+        self.generation += 1
+
+    def refresh(self, model, force=False):
+        interval = getattr(settings, "INVENTORY_INDEX_REFRESH_SECONDS", 5)
+        version = catalog_version()
+        # a version bump means a change this index may not have seen; refresh
+        # now so the response cache never stores a stale listing under it
+        fresh = time.monotonic() - self.checked_at < interval and version == self.version
+        if not force and fresh and not self.needs_reload:
+            return
+        with self.lock:
+            total = model.objects.count()
+            if self.columns is None or self.needs_reload or self.watermark is None:
+                self._reload(model)
+            else:
+                self._merge(model)
+                if total != len(self.columns["id"]):
+                    # rows were deleted (or bulk-updated without updated_at)
+                    self._reload(model)
+            self.checked_at = time.monotonic()
+            self.version = version
+
+    # ---- querying ----------------------------------------------------------
+
+    # mask() and ordered_ids() take the `columns` snapshot of one request: a
+    # concurrent refresh swaps self.columns for arrays of another length
+
+    def mask(self, cols, filterset):
+        """
+        Boolean mask over `cols` for a *valid* BikeFilter, or None if one of
+        its active filters has no columnar equivalent.
+        """
+        from .filters import CatalogOptionFilter
+
+        mask = np.ones(len(cols["id"]), dtype=bool)
+        for name, value in filterset.form.cleaned_data.items():
+            if value in (None, ""):
+                continue
+            flt = filterset.filters[name]
+            column = flt.field_name
+            if isinstance(flt, CatalogOptionFilter):
+                ids = flt.option_ids(filterset.queryset.model, value)
+                mask &= np.isin(cols[column], ids)
+            elif column == "is_booked":
+                match = cols["is_booked"] == bool(value)
+                mask &= ~match if flt.exclude else match
+            elif column in NUMBER_COLUMNS and flt.lookup_expr in ("gte", "lte"):
+                # NaN comparisons are False, i.e. NULL never matches a range, as in SQL
+                with np.errstate(invalid="ignore"):
+                    mask &= cols[column] >= float(value) if flt.lookup_expr == "gte" else cols[column] <= float(value)
+            else:
+                return None
+        return mask
+
+    def ordered_ids(self, cols, mask, ordering):
+        field = ordering.lstrip("-")
+        descending = ordering.startswith("-")
+        ids = cols["id"][mask]
+        key = cols[field][mask].astype("float64")
+        if descending:
+            key, tiebreak = -key, -ids
+        else:
+            tiebreak = ids
+        # NULLs sort last in both directions, like the cursor pagination
+        key = np.where(np.isnan(key), np.inf, key)
+        return ids[np.lexsort((tiebreak, key))]
+
+
+class IndexedResult:
+    """
+    Sequence over an ordered id list that Django's Paginator can page through;
+    slicing hydrates only the requested ids from `queryset`.
+    """
+    def __init__(self, ids, queryset, index, latest=None):
+        self.ids = ids
+        self.queryset = queryset
+        self.index = index
+        self.latest = latest
+
+    def count(self):
+        return len(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        page_ids = [int(pk) for pk in self.ids[item]]
+        rows = {obj.pk: obj for obj in self.queryset.filter(id__in=page_ids)}
+        if len(rows) != len(page_ids):
+            # a row vanished since the last refresh
+            self.index.needs_reload = True
+        return [rows[pk] for pk in page_ids if pk in rows]
+
+
+_index = InventoryIndex()
+
+
+def shared_index(model):
+    """The refreshed per-process index, for other vectorized readers (bike/similar.py)."""
+    _index.refresh(model)
+    return _index
+
+
+def lookup(view, queryset):
+    """
+    Answers a BuyBikeList request from the columnar index. Returns an
+    IndexedResult, or None when the request must take the ORM path.
+    """
+    request = view.request
+    if not enabled() or view.paginator is None or view.paginator.is_cursor_request(request):
+        return None
+    if request.query_params.get("search", "").strip():
+        return None
+
+    ordering_terms = []
+    for backend in view.filter_backends:
+        if hasattr(backend, "get_ordering"):
+            ordering_terms = backend().get_ordering(request, queryset, view) or []
+    if len(ordering_terms) != 1 or ordering_terms[0].lstrip("-") not in ORDERING_COLUMNS:
+        return None
+
+    filterset = view.filterset_class(request.query_params, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        return None
+
+    _index.refresh(queryset.model)
+    cols = _index.columns
+    mask = _index.mask(cols, filterset)
+    if mask is None:
+        return None
+    latest = None
+    if mask.any():
+        latest = EPOCH + timedelta(microseconds=int(cols["updated_at"][mask].max()))
+    return IndexedResult(_index.ordered_ids(cols, mask, ordering_terms[0]), queryset, _index, latest)
@@ -0,0 +1,140 @@
+"""
+Database-backed queue for post-upload image work (the ImageJob table).
+
+Saving a model with a freshly uploaded ImageField only writes the file and
+queues an ImageJob (see signals.py), so admin saves return right away. The
+`process_image_jobs` worker then claims jobs in batches and, per image:
+
+- shrinks originals larger than IMAGE_MAX_DIMENSION and strips their metadata
+  (renditions.normalize), pointing the field at the new file with a
+  conditional UPDATE so a re-upload in the meantime wins,
+- writes the WebP/JPEG renditions and clears their "pending" marker
+  (renditions.settled),
+- records the final dimensions on the job.
+
+Until a job is done, serializers serve the original URL with an empty srcset.
+Claims are made with an UPDATE ... WHERE status='pending' tagged with a
+per-batch token, so several workers can share the table. Failed jobs are
+retried with a growing delay; jobs stuck in "running" (crashed worker) are
+released after STALE_AFTER. Superseded originals are left to `collect_media`.
+"""
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from . import renditions
+from .cache import bump_catalog_version
+from .models import BikeImage, BuyBike, ImageJob
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY = timedelta(seconds=30)
+STALE_AFTER = timedelta(minutes=10)
+
+
+def new_uploads(instance):
+    """Image fields of `instance` holding a file that this save will write."""
+    uploads = []
+    for field in renditions.image_fields(type(instance)):
+        fieldfile = getattr(instance, field.attname)
+        if fieldfile and not fieldfile._committed:
+            uploads.append(field.name)
+    return uploads
+
+
+def job_for(instance, field_name):
+    return ImageJob(
+        model=instance._meta.label_lower, object_id=instance.pk, field=field_name,
+        name=getattr(instance, field_name).name,
+    )
+
+
+def enqueue(instance, field_names):
+    return ImageJob.objects.bulk_create([job_for(instance, name) for name in field_names if getattr(instance, name)])
+
+
+def release_stale():
+    return ImageJob.objects.filter(
+        status="running", claimed_at__lt=timezone.now() - STALE_AFTER,
+    ).update(status="pending", claimed_by="")
+
+
+def claim(batch_size):
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    ids = list(
+        ImageJob.objects.filter(status="pending", run_after__lte=now)
+        .order_by("id").values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    # a concurrent worker may have claimed some of them; only our token counts
+    ImageJob.objects.filter(id__in=ids, status="pending").update(
+        status="running", claimed_by=token, claimed_at=now, attempts=F("attempts") + 1,
+    )
+    return list(ImageJob.objects.filter(claimed_by=token, status="running"))
+
+
+def touch_owner(model, pk):
+    # listing/detail validators and the inventory index key off BuyBike.updated_at
+    if model is BuyBike:
+        BuyBike.objects.filter(pk=pk).update(updated_at=timezone.now())
+    elif model is BikeImage:
+        BuyBike.objects.filter(images__pk=pk).update(updated_at=timezone.now())
+
+
+def process(job):
+    model = apps.get_model(job.model)
+    field = model._meta.get_field(job.field)
+    rows = model._default_manager.filter(pk=job.object_id)
+    if rows.values_list(field.attname, flat=True).first() != job.name:
+        return "superseded"
+
+    name, width, height = renditions.normalize(field.storage, job.name, settings.IMAGE_MAX_DIMENSION)
+    if name != job.name and not rows.filter(**{field.attname: job.name}).update(**{field.attname: name}):
+        # not deleted here: with content-addressed storage `name` may be a blob other rows
+        # already share; if it is unreferenced, collect_media removes it
+        return "superseded"
+    renditions.generate(field.storage, name)
+    renditions.settled(job.name, name)
+    touch_owner(model, job.object_id)
+    job.result_name, job.width, job.height = name, width, height
+    return "done"
+
+
+def finish(job, status, error=""):
+    job.status = "failed" if status == "failed" else "done"
+    job.last_error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "last_error", "finished_at", "result_name", "width", "height"])
+
+
+def retry(job, error):
+    if job.attempts >= MAX_ATTEMPTS:
+        finish(job, "failed", error)
+        return
+    ImageJob.objects.filter(pk=job.pk).update(
+        status="pending", claimed_by="", last_error=error, run_after=timezone.now() + RETRY_DELAY * job.attempts,
+    )
+
+
+def run_batch(batch_size=20):
+    """Processes one batch; returns {outcome: count}."""
+    release_stale()
+    counts = {}
+    for job in claim(batch_size):
+        try:
+            outcome = process(job)
+        except Exception as exc:  # any failure is recorded on the job and retried
+            outcome = "retried" if job.attempts < MAX_ATTEMPTS else "failed"
+            retry(job, f"{type(exc).__name__}: {exc}")
+        else:
+            finish(job, outcome, "superseded by a newer upload" if outcome == "superseded" else "")
+        counts[outcome] = counts.get(outcome, 0) + 1
+    if counts.get("done"):
+        # cached listing responses embed the (until now empty) srcsets
+        bump_catalog_version()
+    return counts
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from bike import cache
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss statistics of the BuyBike response cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them.")
+
+    def handle(self, *args, **options):
+        stats = cache.response_stats()
+        self.stdout.write(
+            f"catalog version {cache.catalog_version()}: "
+            f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_ratio']:.1%} hit ratio)"
+        )
+        if options["reset"]:
+            cache.reset_response_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,105 @@
+import os
+import shutil
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from bike import renditions
+
+PROGRESS_EVERY = 5000
+
+
+def referenced_names(chunk_size=2000):
+    """Every file name stored in a FileField/ImageField of the bike app."""
+    names = set()
+    for model in apps.get_app_config("bike").get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                values = model._default_manager.exclude(**{field.attname: ""}).values_list(field.attname, flat=True)
+                names.update(name for name in values.iterator(chunk_size=chunk_size) if name)
+    return names
+
+
+def walk(root, skip):
+    """Yields (relative posix path, DirEntry) of every file below `root`, depth first."""
+    stack = [""]
+    while stack:
+        relative = stack.pop()
+        with os.scandir(os.path.join(root, relative)) as entries:
+            for entry in entries:
+                path = f"{relative}/{entry.name}" if relative else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if os.path.abspath(entry.path) not in skip:
+                        stack.append(path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield path, entry
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete (or move to --quarantine) files under MEDIA_ROOT that no FileField/ImageField of the bike "
+        "app references and that are older than --grace-hours. Renditions live as long as their original."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed.")
+        parser.add_argument("--grace-hours", type=float, default=24.0, help="Keep files younger than this.")
+        parser.add_argument("--quarantine", help="Move unreferenced files into this directory instead of deleting.")
+
+    def handle(self, *args, **options):
+        root = os.path.abspath(settings.MEDIA_ROOT)
+        if not os.path.isdir(root):
+            raise CommandError(f"MEDIA_ROOT {root} does not exist")
+        quarantine = os.path.abspath(options["quarantine"]) if options["quarantine"] else None
+        dry_run = options["dry_run"]
+        cutoff = time.time() - options["grace_hours"] * 3600
+
+        started = time.monotonic()
+        referenced = referenced_names()
+        self.stdout.write(f"{len(referenced)} referenced files ({time.monotonic() - started:.1f}s).")
+
+        scanned = kept_young = removed = freed = 0
+        emptied = set()
+        for path, entry in walk(root, skip={quarantine} if quarantine else set()):
+            scanned += 1
+            if options["verbosity"] >= 1 and scanned % PROGRESS_EVERY == 0:
+                self.stdout.write(f"  {scanned} files scanned, {removed} unreferenced ({freed / 2**20:.1f} MB)")
+            if path in referenced or renditions.original_name(path) in referenced:
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_mtime > cutoff:
+                kept_young += 1
+                continue
+            removed += 1
+            freed += stat.st_size
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"  {path}")
+            if dry_run:
+                continue
+            if quarantine:
+                target = os.path.join(quarantine, *path.split("/"))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(entry.path, target)
+            else:
+                os.remove(entry.path)
+            emptied.add(os.path.dirname(entry.path))
+
+        self.prune(root, emptied)
+        verb = "would be removed" if dry_run else ("quarantined" if quarantine else "removed")
+        self.stdout.write(self.style.SUCCESS(
+            f"{scanned} files scanned in {time.monotonic() - started:.1f}s: {removed} unreferenced {verb} "
+            f"({freed / 2**20:.1f} MB), {kept_young} unreferenced kept inside the grace period."
+        ))
+
+    def prune(self, root, directories):
+        # drop directories the removals emptied (e.g. blob shards), never MEDIA_ROOT itself
+        for directory in sorted(directories, key=len, reverse=True):
+            while directory != root and directory.startswith(root):
+                try:
+                    os.rmdir(directory)
+                except OSError:  # not empty (or already gone)
+                    break
+                directory = os.path.dirname(directory)
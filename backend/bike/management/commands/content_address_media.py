@@ -0,0 +1,97 @@
+import os
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import default_storage, storages
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.utils import timezone
+
+from bike import renditions
+from bike.cache import bump_catalog_version
+from bike.models import BikeImage, BuyBike, ImageJob
+from bike.storage import ContentAddressedStorage, blob_name, content_digest, is_blob
+
+
+def backend(storage):
+    return storages["default"] if storage is default_storage else storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Move files stored before content addressing into blobs/ and repoint every FileField/ImageField "
+        "of the bike app that references them. Duplicates collapse into one blob; the old files stay "
+        "until collect_media removes them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would move.")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        moved = {}  # old name -> blob name, shared by every field using the file
+        blobs = set()
+        duplicates = missing = rows_moved = saved = 0
+
+        for model in apps.get_app_config("bike").get_models():
+            for field in model._meta.get_fields():
+                if not isinstance(field, models.FileField):
+                    continue
+                storage = backend(field.storage)
+                if not isinstance(storage, ContentAddressedStorage):
+                    self.stdout.write(f"  skipping {model.__name__}.{field.name}: storage is not content-addressed")
+                    continue
+                names = (
+                    model._default_manager.exclude(**{field.attname: ""}).exclude(**{f"{field.attname}__isnull": True})
+                    .values_list(field.attname, flat=True).distinct().iterator()
+                )
+                count = 0
+                for name in names:
+                    if is_blob(name) or renditions.is_rendition(name):
+                        continue
+                    if name not in moved:
+                        if not storage.exists(name):
+                            missing += 1
+                            continue
+                        moved[name] = self.store(storage, name, dry_run)
+                        if moved[name] in blobs:
+                            duplicates += 1
+                            saved += storage.size(name)
+                        blobs.add(moved[name])
+                    count += self.repoint(model, field, name, moved[name], dry_run)
+                rows_moved += count
+                if count and options["verbosity"] >= 1:
+                    self.stdout.write(f"  {model.__name__}.{field.name}: {count} rows")
+
+        if rows_moved and not dry_run:
+            bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Dry run: ' if dry_run else ''}{len(moved)} files -> {len(blobs)} blobs "
+            f"({duplicates} duplicates, {saved / 1024:.0f} KB saved), {rows_moved} rows repointed, "
+            f"{missing} missing files skipped."
+        ))
+
+    def store(self, storage, name, dry_run):
+        with storage.open(name, "rb") as handle:
+            if dry_run:
+                return blob_name(content_digest(File(handle)), os.path.splitext(name)[1].lower())
+            return storage.save(name, File(handle))
+
+    def repoint(self, model, field, old, new, dry_run):
+        rows = model._default_manager.filter(**{field.attname: old})
+        if dry_run:
+            return rows.count()
+        with transaction.atomic():
+            pks = list(rows.values_list("pk", flat=True))
+            rows.update(**{field.attname: new})
+            if isinstance(field, models.ImageField):
+                # renditions belong to the old name; the worker writes the blob's
+                ImageJob.objects.bulk_create([
+                    ImageJob(model=model._meta.label_lower, object_id=pk, field=field.name, name=new) for pk in pks
+                ])
+            # listing/detail validators and the inventory index key off BuyBike.updated_at
+            if model is BuyBike:
+                BuyBike.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+            elif model is BikeImage:
+                BuyBike.objects.filter(images__pk__in=pks).update(updated_at=timezone.now())
+        return len(pks)
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bike import bookings
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire bookings left unpaid for longer than BOOKING_HOLD_MINUTES and release their bikes. "
+        "Sweeps every --interval seconds until interrupted unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Sweep once and exit.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Bookings expired per transaction.")
+        parser.add_argument("--interval", type=float, default=60.0, help="Seconds between sweeps.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+        totals = {"runs": 0, "expired": 0, "released": 0}
+        try:
+            while True:
+                stats = bookings.expire_holds(options["batch_size"])
+                totals["runs"] += 1
+                totals["expired"] += stats["expired"]
+                totals["released"] += stats["released"]
+                if options["verbosity"] >= 2 or (options["verbosity"] >= 1 and stats["expired"]):
+                    self.stdout.write(
+                        f"  {stats['expired']} holds expired, {stats['released']} bikes released "
+                        f"in {stats['batches']} batches ({stats['seconds']:.2f}s)"
+                    )
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f"Booking holds ({settings.BOOKING_HOLD_MINUTES:g} min): {totals['expired']} expired, "
+            f"{totals['released']} bikes released in {totals['runs']} sweeps."
+        ))
@@ -0,0 +1,54 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from bike import export
+from bike.filters import BikeFilter
+from bike.models import BuyBike
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the BuyBike inventory to CSV or NDJSON. --filter takes the same parameters as "
+        "/api/buybikes/, e.g. --filter brand=honda --filter price_max=90000."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help='Output file, or "-" for stdout. A .gz suffix implies --gzip.')
+        parser.add_argument("--format", choices=list(export.FORMATS), help="Default: from the file extension, else csv.")
+        parser.add_argument("--gzip", action="store_true", help="Gzip-compress the output.")
+        parser.add_argument("--filter", action="append", default=[], metavar="NAME=VALUE", help="BikeFilter parameter.")
+        parser.add_argument("--chunk-size", type=int, default=export.CHUNK_SIZE, help="Rows fetched per round trip.")
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        gzip = options["gzip"] or output.endswith(".gz")
+        fmt = options["format"] or ("ndjson" if output.removesuffix(".gz").endswith((".ndjson", ".jsonl")) else "csv")
+
+        params = QueryDict(mutable=True)
+        for item in options["filter"]:
+            name, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"--filter expects NAME=VALUE, got {item!r}")
+            params.appendlist(name, value)
+        filterset = BikeFilter(params, queryset=BuyBike.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(f"Invalid filters: {filterset.errors.as_json()}")
+
+        started = time.monotonic()
+        written = 0
+        handle = sys.stdout.buffer if output == "-" else open(output, "wb")
+        try:
+            for piece in export.stream(filterset.qs, fmt, gzip=gzip, chunk_size=options["chunk_size"]):
+                handle.write(piece)
+                written += len(piece)
+        finally:
+            if output != "-":
+                handle.close()
+        if output != "-":
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote {written / 1024:.0f} KB of {fmt}{' (gzip)' if gzip else ''} to {output} in {elapsed:.1f}s."
+            ))
@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from bike import renditions
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the missing WebP/JPEG renditions of every image uploaded through the bike app "
+        "(new uploads get theirs from process_image_jobs)."
+    )
+
+    def handle(self, *args, **options):
+        images = generated = 0
+        for model in apps.get_app_config("bike").get_models():
+            for field in renditions.image_fields(model):
+                names = (
+                    model._default_manager.exclude(**{field.attname: ""}).exclude(**{f"{field.attname}__isnull": True})
+                    .values_list(field.attname, flat=True).distinct().iterator()
+                )
+                for name in names:
+                    images += 1
+                    try:
+                        widths = renditions.generate(field.storage, name)
+                    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+                        self.stderr.write(f"  {name}: {exc}")
+                        continue
+                    renditions.settled(name)
+                    generated += bool(widths)
+                    if options["verbosity"] >= 2:
+                        self.stdout.write(f"  {name}: {', '.join(map(str, widths)) or '-'}")
+        self.stdout.write(self.style.SUCCESS(f"{generated} of {images} images have renditions."))
@@ -0,0 +1,91 @@
+import csv
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bike import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import BuyBike rows from a CSV or JSON Lines file. Columns are BuyBike field names; "
+        "location/brand/bike_model/bike_variant/category/fuel_type/color take names, image columns "
+        "take paths relative to --images-dir (\"images\": a |-separated or JSON list that replaces the "
+        "gallery), and rows whose external_ref already exists are updated."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (.csv) or JSON Lines file.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Override detection from the file extension.")
+        parser.add_argument("--images-dir", help="Directory that image paths in the file are relative to.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows validated and written per transaction.")
+        parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint.json).")
+        parser.add_argument("--resume", action="store_true", help="Skip the records done by a previous run.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate everything, then roll back each chunk.")
+        parser.add_argument(
+            "--error-report", help="Write every failed record (record number, error) to this CSV file.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.isfile(path):
+            raise CommandError(f"{path} does not exist")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive")
+        checkpoint = options["checkpoint"] or f"{path}.checkpoint.json"
+
+        skip = 0
+        if options["resume"]:
+            try:
+                skip = importer.load_checkpoint(checkpoint, path)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f"Resuming after record {skip}.")
+
+        report = writer = None
+        if options["error_report"]:
+            # a resumed run appends to the report of the run it continues
+            append = options["resume"] and os.path.exists(options["error_report"])
+            report = open(options["error_report"], "a" if append else "w", newline="", encoding="utf-8")
+            writer = csv.writer(report)
+            if not append:
+                writer.writerow(["record", "error"])
+
+        bike_importer = importer.BikeImporter(
+            images_dir=options["images_dir"], chunk_size=options["chunk_size"], dry_run=options["dry_run"],
+            error_report=writer,
+        )
+
+        def on_chunk(number, stats):
+            if not options["dry_run"]:
+                importer.save_checkpoint(checkpoint, path, number, stats)
+            if options["verbosity"] >= 1:
+                self.stdout.write(
+                    f"  record {number}: {stats.created} created, {stats.updated} updated, "
+                    f"{stats.failed} failed ({stats.rate:.0f} rows/s)"
+                )
+
+        try:
+            stats = bike_importer.run(importer.read_records(path, options["format"]), skip=skip, on_chunk=on_chunk)
+        except Exception as exc:
+            raise CommandError(
+                f"Import stopped: {exc}. Committed chunks are kept; rerun with --resume to continue."
+            ) from exc
+        finally:
+            if report:
+                report.close()
+
+        if not options["dry_run"] and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        for number, message in stats.errors:
+            self.stderr.write(f"record {number}: {message}")
+        if stats.failed > len(stats.errors):
+            self.stderr.write(f"... and {stats.failed - len(stats.errors)} more errors")
+        if report and stats.failed:
+            self.stderr.write(f"All {stats.failed} errors are listed in {options['error_report']}.")
+        summary = (
+            f"{'Dry run: ' if options['dry_run'] else ''}{stats.read} records in {stats.elapsed:.1f}s "
+            f"({stats.rate:.0f} rows/s): {stats.created} created, {stats.updated} updated, {stats.failed} failed."
+        )
+        self.stdout.write(self.style.SUCCESS(summary) if not stats.failed else self.style.WARNING(summary))
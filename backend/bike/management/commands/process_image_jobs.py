@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bike import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued image jobs (shrink oversized uploads, strip metadata, write WebP/JPEG renditions, "
+        "record dimensions). Polls until interrupted unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when the queue is empty.")
+        parser.add_argument("--batch-size", type=int, default=20, help="Jobs claimed per round trip.")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+        totals = {}
+        try:
+            while True:
+                started = time.monotonic()
+                counts = jobs.run_batch(options["batch_size"])
+                if counts:
+                    for outcome, count in counts.items():
+                        totals[outcome] = totals.get(outcome, 0) + count
+                    if options["verbosity"] >= 1:
+                        summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items()))
+                        self.stdout.write(f"  {summary} ({time.monotonic() - started:.1f}s)")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(totals.items())) or "no jobs"
+        self.stdout.write(self.style.SUCCESS(f"Image jobs: {summary}."))
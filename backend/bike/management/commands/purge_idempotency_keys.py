@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bike import idempotency
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete Idempotency-Key records older than IDEMPOTENCY_KEY_TTL_HOURS (expired keys are already "
+        "ignored by the booking endpoints). Run it from cron, e.g. hourly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per statement.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+        deleted = idempotency.purge_expired(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from bike import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the BuyBike full-text search index from scratch."
+
+    def handle(self, *args, **options):
+        count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} bikes."))
@@ -0,0 +1,104 @@
+"""
+Absolute media URL resolution shared by every serializer.
+
+The scheme/host prefix is computed once per request (or taken from
+settings.MEDIA_CDN_URL when a CDN fronts the media files) and storage URLs
+are memoized per file name, so serializing a page of rows does not re-run
+host parsing and storage URL logic for every image field.
+
+MediaSrcsetField adds the responsive renditions of an image (bike/renditions.py)
+as {"webp": "<url> 320w, <url> 640w", "jpeg": ...}, ready for <source srcset>.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework import serializers
+
+from . import renditions
+
+RESOLVER_ATTR = "_media_url_resolver"
+
+
+@lru_cache(maxsize=8192)
+def storage_url(storage, name):
+    return storage.url(name)
+
+
+class MediaURLResolver:
+    def __init__(self, request=None):
+        cdn = getattr(settings, "MEDIA_CDN_URL", "")
+        if cdn:
+            self.prefix = cdn.rstrip("/")
+        elif request is not None:
+            self.prefix = f"{request.scheme}://{request.get_host()}"
+        else:
+            self.prefix = ""
+
+    def url(self, fieldfile):
+        if not fieldfile or not getattr(fieldfile, "name", None):
+            return None
+        return self.name_url(fieldfile.storage, fieldfile.name)
+
+    def name_url(self, storage, name):
+        url = storage_url(storage, name)
+        if "://" in url or url.startswith("//"):
+            # remote storages (S3 etc.) already return absolute URLs
+            return url
+        return self.prefix + url
+
+
+def get_resolver(request):
+    if request is None:
+        return MediaURLResolver()
+    # DRF wraps the Django request; cache the resolver on the underlying one
+    target = getattr(request, "_request", request)
+    resolver = getattr(target, RESOLVER_ATTR, None)
+    if resolver is None:
+        resolver = MediaURLResolver(request)
+        setattr(target, RESOLVER_ATTR, resolver)
+    return resolver
+
+
+def build_media_url(fieldfile, request=None):
+    return get_resolver(request).url(fieldfile)
+
+
+def build_srcset(fieldfile, request=None):
+    """{format: srcset string} of the image's renditions ({} when there are none)."""
+    if not fieldfile or not getattr(fieldfile, "name", None):
+        return None
+    widths = renditions.ensure(fieldfile)
+    if not widths:
+        return {}
+    resolver = get_resolver(request)
+    return {
+        fmt: ", ".join(
+            f"{resolver.name_url(fieldfile.storage, renditions.rendition_name(fieldfile.name, w, fmt))} {w}w"
+            for w in widths
+        )
+        for fmt in renditions.FORMATS
+    }
+
+
+class MediaFileField(serializers.FileField):
+    def to_representation(self, value):
+        if not value:
+            return None
+        if getattr(self, "use_url", True):
+            return build_media_url(value, self.context.get("request"))
+        return value.name
+
+
+class MediaImageField(serializers.ImageField):
+    def to_representation(self, value):
+        if not value:
+            return None
+        if getattr(self, "use_url", True):
+            return build_media_url(value, self.context.get("request"))
+        return value.name
+
+
+class MediaSrcsetField(serializers.ReadOnlyField):
+    """Read-only srcset map of an image field: `featured_image_srcset = MediaSrcsetField(source="featured_image")`."""
+    def to_representation(self, value):
+        return build_srcset(value, self.context.get("request"))
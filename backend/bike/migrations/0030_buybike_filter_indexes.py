@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0029_sellbikepage_howitworks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buybike',
+            index=models.Index(fields=['created_at', 'id'], name='buybike_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buybike',
+            index=models.Index(fields=['price', 'id'], name='buybike_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buybike',
+            index=models.Index(fields=['year', 'id'], name='buybike_year_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buybike',
+            index=models.Index(fields=['kilometers', 'id'], name='buybike_km_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buybike',
+            index=models.Index(fields=['engine_cc'], name='buybike_engine_cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buybike',
+            index=models.Index(condition=models.Q(('is_booked', False)), fields=['created_at', 'id'], name='buybike_avail_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buybike',
+            index=models.Index(condition=models.Q(('is_booked', False)), fields=['price', 'id'], name='buybike_avail_price_idx'),
+        ),
+    ]
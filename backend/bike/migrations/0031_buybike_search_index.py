@@ -0,0 +1,68 @@
+from django.db import migrations
+
+
+SQLITE_CREATE = """
+CREATE VIRTUAL TABLE buybike_fts USING fts5(
+    title, brand, tags, location, description,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+SQLITE_BACKFILL = """
+INSERT INTO buybike_fts (rowid, title, brand, tags, location, description)
+SELECT b.id, b.title, b.brand,
+       TRIM(b.bike_model || ' ' || b.bike_variant || ' ' || b.category),
+       COALESCE(l.name, ''), b.description
+FROM buybike b LEFT JOIN bike_location l ON l.id = b.location_id
+"""
+
+POSTGRES_CREATE = [
+    """
+    CREATE TABLE buybike_search (
+        bike_id bigint PRIMARY KEY REFERENCES buybike (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX buybike_search_document_gin ON buybike_search USING GIN (document)",
+]
+
+POSTGRES_BACKFILL = """
+INSERT INTO buybike_search (bike_id, document)
+SELECT b.id,
+       setweight(to_tsvector('simple', b.title), 'A') ||
+       setweight(to_tsvector('simple', concat_ws(' ', b.brand, b.bike_model, b.bike_variant, b.category)), 'B') ||
+       setweight(to_tsvector('simple', COALESCE(l.name, '')), 'C') ||
+       setweight(to_tsvector('simple', b.description), 'D')
+FROM buybike b LEFT JOIN bike_location l ON l.id = b.location_id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(SQLITE_BACKFILL)
+    elif vendor == "postgresql":
+        for sql in POSTGRES_CREATE:
+            schema_editor.execute(sql)
+        schema_editor.execute(POSTGRES_BACKFILL)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS buybike_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS buybike_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0030_buybike_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
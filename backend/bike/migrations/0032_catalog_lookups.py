@@ -0,0 +1,125 @@
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0031_buybike_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Brand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='bike_brand_name_ci_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BikeModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('brand', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='models', to='bike.brand')),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='BikeVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('bike_model', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='bike.bikemodel')),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+            ],
+            options={
+                'verbose_name_plural': 'Categories',
+                'ordering': ['name'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='bike_category_name_ci_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Color',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='bike_color_name_ci_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FuelType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+            ],
+            options={
+                'ordering': ['name'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='bike_fueltype_name_ci_uniq')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bikemodel',
+            constraint=models.UniqueConstraint(models.F('brand'), django.db.models.functions.text.Lower('name'), name='bike_bikemodel_brand_name_ci_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='bikevariant',
+            constraint=models.UniqueConstraint(models.F('bike_model'), django.db.models.functions.text.Lower('name'), name='bike_bikevariant_model_name_ci_uniq'),
+        ),
+        # new FK columns live next to the old strings until 0033 has folded them
+        migrations.AddField(
+            model_name='buybike',
+            name='brand_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='bike.brand'),
+        ),
+        migrations.AddField(
+            model_name='buybike',
+            name='bike_model_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='bike.bikemodel'),
+        ),
+        migrations.AddField(
+            model_name='buybike',
+            name='bike_variant_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='bike.bikevariant'),
+        ),
+        migrations.AddField(
+            model_name='buybike',
+            name='category_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='bike.category'),
+        ),
+        migrations.AddField(
+            model_name='buybike',
+            name='color_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='bike.color'),
+        ),
+        migrations.AddField(
+            model_name='buybike',
+            name='fuel_type_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='bike.fueltype'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.db import migrations
+
+# old free-text column -> (lookup model, temporary FK column from 0032)
+FIELDS = [
+    ("brand", "Brand", "brand_ref"),
+    ("bike_model", "BikeModel", "bike_model_ref"),
+    ("bike_variant", "BikeVariant", "bike_variant_ref"),
+    ("category", "Category", "category_ref"),
+    ("fuel_type", "FuelType", "fuel_type_ref"),
+    ("color", "Color", "color_ref"),
+]
+
+
+def normalize(value):
+    return " ".join((value or "").split())
+
+
+def fold_strings(apps, schema_editor):
+    """
+    Folds the free-text BuyBike columns into the lookup tables. Spelling
+    variants that differ only in case/whitespace collapse into one option;
+    the first spelling seen becomes the display name.
+    """
+    BuyBike = apps.get_model("bike", "BuyBike")
+    SellBikePage = apps.get_model("bike", "SellBikePage")
+    models = {name: apps.get_model("bike", name) for _, name, _ in FIELDS}
+    resolved = {}
+
+    def resolve(model_name, value, **scope):
+        value = normalize(value)
+        if not value:
+            return None
+        key = (model_name, value.casefold()) + tuple(o.pk for o in scope.values())
+        if key not in resolved:
+            model = models[model_name]
+            resolved[key] = (
+                model.objects.filter(name__iexact=value, **scope).first()
+                or model.objects.create(name=value, **scope)
+            )
+        return resolved[key]
+
+    for bike in BuyBike.objects.order_by("pk").iterator():
+        brand = resolve("Brand", bike.brand)
+        bike_model = resolve("BikeModel", bike.bike_model, brand=brand) if brand else resolve("BikeModel", bike.bike_model)
+        bike_variant = (
+            resolve("BikeVariant", bike.bike_variant, bike_model=bike_model) if bike_model
+            else resolve("BikeVariant", bike.bike_variant)
+        )
+        BuyBike.objects.filter(pk=bike.pk).update(
+            brand_ref=brand,
+            bike_model_ref=bike_model,
+            bike_variant_ref=bike_variant,
+            category_ref=resolve("Category", bike.category),
+            fuel_type_ref=resolve("FuelType", bike.fuel_type),
+            color_ref=resolve("Color", bike.color),
+        )
+
+    # the sell page brand dropdown was a comma separated list; keep those brands too
+    for page in SellBikePage.objects.exclude(brand_options__isnull=True).exclude(brand_options=""):
+        for name in page.brand_options.split(","):
+            resolve("Brand", name)
+
+
+def unfold_strings(apps, schema_editor):
+    BuyBike = apps.get_model("bike", "BuyBike")
+    for bike in BuyBike.objects.order_by("pk").iterator():
+        values = {}
+        for column, _, ref in FIELDS:
+            option = getattr(bike, ref)
+            values[column] = option.name if option else ""
+        BuyBike.objects.filter(pk=bike.pk).update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0032_catalog_lookups'),
+    ]
+
+    operations = [
+        migrations.RunPython(fold_strings, unfold_strings),
+    ]
@@ -0,0 +1,96 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0033_fold_catalog_strings'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='buybike',
+            name='brand',
+        ),
+        migrations.RemoveField(
+            model_name='buybike',
+            name='bike_model',
+        ),
+        migrations.RemoveField(
+            model_name='buybike',
+            name='bike_variant',
+        ),
+        migrations.RemoveField(
+            model_name='buybike',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='buybike',
+            name='color',
+        ),
+        migrations.RemoveField(
+            model_name='buybike',
+            name='fuel_type',
+        ),
+        migrations.RenameField(
+            model_name='buybike',
+            old_name='brand_ref',
+            new_name='brand',
+        ),
+        migrations.AlterField(
+            model_name='buybike',
+            name='brand',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='buybikes', to='bike.brand'),
+        ),
+        migrations.RenameField(
+            model_name='buybike',
+            old_name='bike_model_ref',
+            new_name='bike_model',
+        ),
+        migrations.AlterField(
+            model_name='buybike',
+            name='bike_model',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='buybikes', to='bike.bikemodel'),
+        ),
+        migrations.RenameField(
+            model_name='buybike',
+            old_name='bike_variant_ref',
+            new_name='bike_variant',
+        ),
+        migrations.AlterField(
+            model_name='buybike',
+            name='bike_variant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='buybikes', to='bike.bikevariant'),
+        ),
+        migrations.RenameField(
+            model_name='buybike',
+            old_name='category_ref',
+            new_name='category',
+        ),
+        migrations.AlterField(
+            model_name='buybike',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='buybikes', to='bike.category'),
+        ),
+        migrations.RenameField(
+            model_name='buybike',
+            old_name='color_ref',
+            new_name='color',
+        ),
+        migrations.AlterField(
+            model_name='buybike',
+            name='color',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='buybikes', to='bike.color'),
+        ),
+        migrations.RenameField(
+            model_name='buybike',
+            old_name='fuel_type_ref',
+            new_name='fuel_type',
+        ),
+        migrations.AlterField(
+            model_name='buybike',
+            name='fuel_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='buybikes', to='bike.fueltype'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0034_buybike_catalog_fks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buybike',
+            index=models.Index(fields=['updated_at'], name='buybike_updated_idx'),
+        ),
+    ]
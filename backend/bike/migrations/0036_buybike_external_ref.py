@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0035_buybike_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='buybike',
+            name='external_ref',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0036_buybike_external_ref'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BikeImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(upload_to='buybikes/variants/')),
+                ('order', models.PositiveSmallIntegerField(default=0)),
+                ('alt_text', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bike', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='bike.buybike')),
+            ],
+            options={
+                'ordering': ['order', 'pk'],
+                'indexes': [models.Index(fields=['bike', 'order'], name='bikeimage_bike_order_idx')],
+            },
+        ),
+    ]
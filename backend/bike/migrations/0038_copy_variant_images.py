@@ -0,0 +1,44 @@
+from django.db import migrations
+
+VARIANT_FIELDS = ["variant_image1", "variant_image2", "variant_image3", "variant_image4", "variant_image5"]
+
+
+def copy_to_gallery(apps, schema_editor):
+    """Turns every non-empty variant_imageN into BikeImage(order=N)."""
+    BuyBike = apps.get_model("bike", "BuyBike")
+    BikeImage = apps.get_model("bike", "BikeImage")
+    batch = []
+    for row in BuyBike.objects.values_list("id", *VARIANT_FIELDS).iterator(chunk_size=500):
+        bike_id, names = row[0], row[1:]
+        batch.extend(
+            BikeImage(bike_id=bike_id, image=name, order=order)
+            for order, name in enumerate(names, start=1) if name
+        )
+        if len(batch) >= 500:
+            BikeImage.objects.bulk_create(batch)
+            batch = []
+    BikeImage.objects.bulk_create(batch)
+
+
+def copy_to_columns(apps, schema_editor):
+    """Reverse: the first five gallery images go back into variant_image1..5."""
+    BuyBike = apps.get_model("bike", "BuyBike")
+    BikeImage = apps.get_model("bike", "BikeImage")
+    galleries = {}
+    for bike_id, name in BikeImage.objects.order_by("bike_id", "order", "pk").values_list("bike_id", "image"):
+        galleries.setdefault(bike_id, [])
+        if len(galleries[bike_id]) < len(VARIANT_FIELDS):
+            galleries[bike_id].append(name)
+    for bike_id, names in galleries.items():
+        BuyBike.objects.filter(pk=bike_id).update(**dict(zip(VARIANT_FIELDS, names)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0037_bikeimage'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_to_gallery, copy_to_columns),
+    ]
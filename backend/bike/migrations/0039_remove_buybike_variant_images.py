@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:50
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bike', '0038_copy_variant_images'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='buybike',
+            name='variant_image1',
+        ),
+        migrations.RemoveField(
+            model_name='buybike',
+            name='variant_image2',
+        ),
+        migrations.RemoveField(
+            model_name='buybike',
+            name='variant_image3',
+        ),
+        migrations.RemoveField(
+            model_name='buybike',
+            name='variant_image4',
+        ),
+        migrations.RemoveField(
+            model_name='buybike',
+            name='variant_image5',
+        ),
+    ]
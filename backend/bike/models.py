@@ -1,6 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 class SellBikePage(models.Model):
     # Top Banner Section
@@ -83,6 +86,7 @@ class Booking(models.Model):
         ("created", "Created"),
         ("paid", "Paid"),
         ("cancelled", "Cancelled"),
+        ("expired", "Expired"),  # unpaid past BOOKING_HOLD_MINUTES; see bookings.expire_holds()
     ]
 
     buybike = models.ForeignKey("BuyBike", on_delete=models.CASCADE, related_name="bookings")
@@ -101,6 +105,13 @@ class Booking(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # the hold sweeper's "status = created AND created_at < cutoff ORDER BY created_at" scan
+            models.Index(fields=["status", "created_at"], name="booking_status_created_idx"),
+            # /api/bookings/mine/ keyset pages: "user_id = %s ORDER BY created_at DESC, id DESC", answered
+            # from the index alone (the page's rows are then fetched by pk)
+            models.Index(fields=["user", "created_at", "id"], name="booking_user_created_idx"),
+        ]
 
     def __str__(self):
         return f"Booking #{self.id} for {self.buybike.title}"
@@ -167,6 +178,76 @@ class SupportFeature(models.Model):
         return f"{self.order} - {self.title}"
 
 
+class CatalogOptionQuerySet(models.QuerySet):
+    def resolve(self, name, **scope):
+        """
+        Returns the option whose name matches `name` case-insensitively (after
+        collapsing whitespace), creating it if needed. Blank names give None.
+        """
+        name = " ".join((name or "").split())
+        if not name:
+            return None
+        option = self.filter(name__iexact=name, **scope).first()
+        if option is None:
+            option = self.create(name=name, **scope)
+        return option
+
+
+class CatalogOption(models.Model):
+    """
+    Base for the normalized catalog lookups (brand, model, variant, category,
+    fuel type, color) that BuyBike references by integer FK.
+    """
+    name = models.CharField(max_length=150)
+
+    objects = CatalogOptionQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(Lower("name"), name="%(app_label)s_%(class)s_name_ci_uniq"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class Brand(CatalogOption):
+    pass
+
+
+class BikeModel(CatalogOption):
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, null=True, blank=True, related_name="models")
+
+    class Meta(CatalogOption.Meta):
+        constraints = [
+            models.UniqueConstraint("brand", Lower("name"), name="bike_bikemodel_brand_name_ci_uniq"),
+        ]
+
+
+class BikeVariant(CatalogOption):
+    bike_model = models.ForeignKey(BikeModel, on_delete=models.CASCADE, null=True, blank=True, related_name="variants")
+
+    class Meta(CatalogOption.Meta):
+        constraints = [
+            models.UniqueConstraint("bike_model", Lower("name"), name="bike_bikevariant_model_name_ci_uniq"),
+        ]
+
+
+class Category(CatalogOption):
+    class Meta(CatalogOption.Meta):
+        verbose_name_plural = "Categories"
+
+
+class FuelType(CatalogOption):
+    pass
+
+
+class Color(CatalogOption):
+    pass
+
+
 class Location(models.Model):
     name = models.CharField(max_length=150, unique=True)
     image = models.ImageField(upload_to="locations/", blank=True, null=True)
@@ -195,6 +276,8 @@ class BuyBike(models.Model):
     ]
 
     # Core details
+    # dealer stock reference; `import_bikes` updates the row with a matching ref
+    external_ref = models.CharField(max_length=100, unique=True, null=True, blank=True)
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     price = models.PositiveIntegerField()
@@ -202,17 +285,17 @@ class BuyBike(models.Model):
         "Location", on_delete=models.SET_NULL, null=True, blank=True, related_name="buybikes"
     )
 
-    # basic meta
-    brand = models.CharField(max_length=100, blank=True)
-    bike_model = models.CharField(max_length=150, blank=True)
-    bike_variant = models.CharField(max_length=120, blank=True)
+    # basic meta (normalized catalog lookups)
+    brand = models.ForeignKey(Brand, on_delete=models.SET_NULL, null=True, blank=True, related_name="buybikes")
+    bike_model = models.ForeignKey(BikeModel, on_delete=models.SET_NULL, null=True, blank=True, related_name="buybikes")
+    bike_variant = models.ForeignKey(BikeVariant, on_delete=models.SET_NULL, null=True, blank=True, related_name="buybikes")
     year = models.PositiveSmallIntegerField(null=True, blank=True)
     registration_year = models.PositiveSmallIntegerField(null=True, blank=True)
     kilometers = models.PositiveIntegerField(null=True, blank=True)
     engine_cc = models.PositiveSmallIntegerField(null=True, blank=True)
-    fuel_type = models.CharField(max_length=50, blank=True)
-    color = models.CharField(max_length=50, blank=True)
-    category = models.CharField(max_length=100, blank=True)
+    fuel_type = models.ForeignKey(FuelType, on_delete=models.SET_NULL, null=True, blank=True, related_name="buybikes")
+    color = models.ForeignKey(Color, on_delete=models.SET_NULL, null=True, blank=True, related_name="buybikes")
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name="buybikes")
 
     # ownership & transmission
     owner = models.CharField(max_length=150, blank=True)
@@ -237,13 +320,7 @@ class BuyBike(models.Model):
     # images
     featured_image = models.ImageField(upload_to="buybikes/images/", blank=True, null=True)
     card_bg_image = models.ImageField(upload_to="buybikes/card_bg/", blank=True, null=True)
-
-    # ✅ 5 Variant Thumbnails
-    variant_image1 = models.ImageField(upload_to="buybikes/variants/", blank=True, null=True)
-    variant_image2 = models.ImageField(upload_to="buybikes/variants/", blank=True, null=True)
-    variant_image3 = models.ImageField(upload_to="buybikes/variants/", blank=True, null=True)
-    variant_image4 = models.ImageField(upload_to="buybikes/variants/", blank=True, null=True)
-    variant_image5 = models.ImageField(upload_to="buybikes/variants/", blank=True, null=True)
+    # variant thumbnails live in the ordered BikeImage gallery (bike.images)
 
     # specs
     ignition_type = models.CharField(max_length=120, blank=True, help_text="e.g. Kick & Self Start")
@@ -259,11 +336,117 @@ class BuyBike(models.Model):
     class Meta:
         ordering = ["-created_at"]
         db_table = "buybike"
+        # Every BikeFilter range column and BuyBikeList ordering field gets a
+        # (field, id) index so filtered/sorted pages are index range scans;
+        # `id` is the tiebreaker used by the cursor pagination.
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="buybike_created_id_idx"),
+            models.Index(fields=["price", "id"], name="buybike_price_id_idx"),
+            models.Index(fields=["year", "id"], name="buybike_year_id_idx"),
+            models.Index(fields=["kilometers", "id"], name="buybike_km_id_idx"),
+            models.Index(fields=["engine_cc"], name="buybike_engine_cc_idx"),
+            # conditional GET fingerprint (Max/Count) and incremental index refreshes
+            models.Index(fields=["updated_at"], name="buybike_updated_idx"),
+            # partial indexes for the unbooked (sellable) inventory
+            models.Index(
+                fields=["created_at", "id"], condition=models.Q(is_booked=False),
+                name="buybike_avail_created_idx",
+            ),
+            models.Index(
+                fields=["price", "id"], condition=models.Q(is_booked=False),
+                name="buybike_avail_price_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class BikeImage(models.Model):
+    """
+    Ordered gallery image of a BuyBike (shown on the detail page only).
+    Order is controlled by `order` (lower => shown earlier).
+    """
+    bike = models.ForeignKey(BuyBike, related_name="images", on_delete=models.CASCADE)
+    image = models.ImageField(upload_to="buybikes/variants/")
+    order = models.PositiveSmallIntegerField(default=0)
+    alt_text = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["order", "pk"]
+        indexes = [models.Index(fields=["bike", "order"], name="bikeimage_bike_order_idx")]
+
+    def __str__(self):
+        return f"{self.bike_id} - Image {self.order}"
+
+
+class ImageJob(models.Model):
+    """
+    Post-upload work on one image field value (shrink oversized originals,
+    strip metadata, write renditions, record dimensions). Queued on save and
+    run by the `process_image_jobs` worker; see bike/jobs.py.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    model = models.CharField(max_length=100)  # app_label.model_name, e.g. "bike.buybike"
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=100)
+    name = models.CharField(max_length=255)  # storage name when queued; a re-upload supersedes the job
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    # result: the processed original and its dimensions
+    result_name = models.CharField(max_length=255, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["status", "run_after"], name="imagejob_status_run_idx")]
+
+    def __str__(self):
+        return f"{self.model}#{self.object_id}.{self.field} ({self.status})"
+
+
+class IdempotencyKey(models.Model):
+    """
+    The stored response of a POST sent with an `Idempotency-Key` header, so
+    a retried booking/confirm-payment request replays it instead of running
+    again; see bike/idempotency.py. Rows expire after IDEMPOTENCY_KEY_TTL_HOURS
+    and are deleted by `purge_idempotency_keys`.
+    """
+    scope = models.CharField(max_length=50)  # the endpoint, e.g. "booking-create"
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)  # sha256 of user + url kwargs + body
+
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["scope", "key"], name="idempotencykey_scope_key_uniq")]
+        indexes = [models.Index(fields=["expires_at"], name="idempotencykey_expires_idx")]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
+
+
 
 
 
@@ -0,0 +1,244 @@
+import base64
+import functools
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class BuyBikeCursorPagination(BasePagination):
+    """
+    Keyset ("seek") pagination for the buy page infinite scroll.
+
+    Rows are ordered by the requested `ordering` field (one of the view's
+    `ordering_fields`) with `id` as tiebreaker, and each page is fetched with
+    a `WHERE (field, id) > (last_field, last_id)` style predicate instead of
+    OFFSET, so there is no COUNT(*) and deep pages cost the same as page 1.
+    NULLs (year / kilometers are nullable) always sort last.
+    """
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE or 12
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    default_ordering = "-created_at"
+    tiebreaker = "id"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor["r"])
+
+        queryset = queryset.order_by(*self.order_expressions(reverse))
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(cursor["p"], reverse))
+
+        # fetch one extra row to know whether there is a following page
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Returns [(field_name, descending), ...] ending with the id tiebreaker.
+        Only the first requested ordering term is honoured; OrderingFilter has
+        already validated it against `view.ordering_fields`.
+        """
+        terms = []
+        for backend in getattr(view, "filter_backends", []):
+            if hasattr(backend, "get_ordering"):
+                terms = backend().get_ordering(request, queryset, view) or []
+                break
+        term = next((t for t in terms if isinstance(t, str)), self.default_ordering)
+        field = term.lstrip("-")
+        descending = term.startswith("-")
+        if field == self.tiebreaker:
+            return [(self.tiebreaker, descending)]
+        return [(field, descending), (self.tiebreaker, descending)]
+
+    def order_expressions(self, reverse=False):
+        # walking backwards flips every direction, which also moves NULLs first
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        exprs = []
+        for field, descending in self.ordering:
+            if descending != reverse:
+                exprs.append(F(field).desc(**nulls))
+            else:
+                exprs.append(F(field).asc(**nulls))
+        return exprs
+
+    def seek_filter(self, position, reverse=False):
+        """
+        Lexicographic "comes after (field1, field2, ...)" predicate, honouring
+        per-field direction and NULLS LAST. With reverse=True it selects the
+        rows that come before the position instead.
+        """
+        condition = Q(pk__in=[])
+        equal_prefix = Q()
+        for (field, descending), value in zip(self.ordering, position):
+            condition |= equal_prefix & self._after(field, value, descending, reverse)
+            if value is None:
+                equal_prefix &= Q(**{f"{field}__isnull": True})
+            else:
+                equal_prefix &= Q(**{field: value})
+        return condition
+
+    def _after(self, field, value, descending, reverse):
+        if value is None:
+            # NULLs are last: only a reverse walk can step back into non-null values
+            return Q(**{f"{field}__isnull": False}) if reverse else Q(pk__in=[])
+        lookup = "lt" if descending != reverse else "gt"
+        after = Q(**{f"{field}__{lookup}": value})
+        if not reverse:
+            after |= Q(**{f"{field}__isnull": True})
+        return after
+
+    def position_for(self, instance):
+        return [getattr(instance, field) for field, _ in self.ordering]
+
+    def encode_cursor(self, position, reverse):
+        payload = {
+            "p": [value.isoformat() if hasattr(value, "isoformat") else value for value in position],
+            "r": 1 if reverse else 0,
+        }
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            raw = payload["p"]
+            if len(raw) != len(self.ordering):
+                raise ValueError
+            position = [self._to_python(field, value) for (field, _), value in zip(self.ordering, raw)]
+            return {"p": position, "r": bool(payload.get("r"))}
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _to_python(self, field, value):
+        if value is None:
+            return value
+        try:
+            return self.model._meta.get_field(field).to_python(value)
+        except FieldDoesNotExist:
+            # annotations such as search_rank are stored as plain JSON values
+            return value
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.position_for(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.position_for(self.page[0]), reverse=True)
+
+
+class BookingHistoryPagination(BuyBikeCursorPagination):
+    """
+    Keyset pages of one user's bookings, newest first (`-created_at`, `id`),
+    seeking over booking_user_created_idx; the view sets no ordering filter.
+    """
+    default_ordering = "-created_at"
+    max_page_size = 50
+
+
+class CountedPaginator(DjangoPaginator):
+    """Paginator that is handed the row count instead of running its own COUNT(*)."""
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count  # overrides the cached_property
+
+
+class BuyBikePagination(BasePagination):
+    """
+    Lets each request pick its pagination mode:
+      /api/buybikes/?page=3                 -> page-number mode (default, old clients)
+      /api/buybikes/?pagination=cursor      -> first keyset page
+      /api/buybikes/?cursor=<token>         -> following keyset pages
+    """
+    mode_query_param = "pagination"
+
+    def __init__(self):
+        self.delegate = PageNumberPagination()
+
+    def is_cursor_request(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or BuyBikeCursorPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        """`count`: the size of `queryset` when the caller knows it already (page-number mode)."""
+        if self.is_cursor_request(request):
+            self.delegate = BuyBikeCursorPagination()
+        else:
+            self.delegate = PageNumberPagination()
+            if count is not None:
+                self.delegate.django_paginator_class = functools.partial(CountedPaginator, count=count)
+        return self.delegate.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.delegate.get_paginated_response_schema(schema)
+
+    def get_results(self, data):
+        return data["results"]
@@ -0,0 +1,94 @@
+"""
+Pricing engine: what a buyer pays for a bike, in exact Decimal arithmetic.
+
+- Taxes (PRICING_TAX_RULES, "code:rate" pairs, default "gst:0.18") are
+  charged on the bike price. Each tax is rounded half-up to the paisa on
+  its own.
+- Fees (PRICING_FEES, "code:amount" pairs, default "test_drive:1000") are
+  optional add-ons and are not taxed.
+- The total is price + taxes + the fees the buyer picked.
+
+quote_many() serves the batch `/api/pricing/quote/` endpoint. The taxed base
+of each bike is cached under the catalog version, which every BuyBike save
+(including a price edit) bumps, and under a digest of the tax rules. A page
+of cached bikes is therefore a cache get_many and no query; the misses cost
+one `id IN (...)` query.
+"""
+import hashlib
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .cache import catalog_cache, catalog_version
+from .models import BuyBike
+
+CENT = Decimal("0.01")
+MAX_IDS = 100  # bikes per /api/pricing/quote/ request
+
+
+def money(value):
+    return Decimal(value or 0).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def parse_pairs(setting_name):
+    """Parses a "code:number,code:number" setting into {code: Decimal}."""
+    pairs = {}
+    for item in filter(None, (part.strip() for part in getattr(settings, setting_name, "").split(","))):
+        code, _, number = item.partition(":")
+        try:
+            pairs[code.strip()] = Decimal(number.strip())
+        except InvalidOperation:
+            raise ImproperlyConfigured(f"{setting_name}: {item!r} is not code:number") from None
+    return pairs
+
+
+def tax_rules():
+    return parse_pairs("PRICING_TAX_RULES")
+
+
+def fees():
+    return {code: money(amount) for code, amount in parse_pairs("PRICING_FEES").items()}
+
+
+def base_quote(price, rules):
+    """Price and its taxes; fees are added per request by quote()."""
+    price = money(price)
+    taxes = [{"code": code, "rate": rate, "amount": money(price * rate)} for code, rate in rules.items()]
+    return {"price": price, "taxes": taxes, "tax_total": sum((tax["amount"] for tax in taxes), Decimal("0.00"))}
+
+
+def with_fees(base, chosen):
+    """`chosen` is {code: amount} of the fees the buyer added."""
+    fee_list = [{"code": code, "amount": money(amount)} for code, amount in chosen.items()]
+    total = base["price"] + base["tax_total"] + sum((fee["amount"] for fee in fee_list), Decimal("0.00"))
+    return {**base, "fees": fee_list, "total": total}
+
+
+def quote(price, chosen_fees=None):
+    return with_fees(base_quote(price, tax_rules()), chosen_fees or {})
+
+
+def rules_digest(rules):
+    raw = ",".join(f"{code}:{rate}" for code, rate in rules.items())
+    return hashlib.md5(raw.encode()).hexdigest()[:12]
+
+
+def quote_many(bike_ids, chosen_fees=None):
+    """Returns ({bike id: quote}, [ids that do not exist]) for `bike_ids`."""
+    rules = tax_rules()
+    cache = catalog_cache()
+    prefix = f"bike:quote:{catalog_version()}:{rules_digest(rules)}:"
+    cached = cache.get_many([f"{prefix}{pk}" for pk in bike_ids])
+    bases = {pk: cached[f"{prefix}{pk}"] for pk in bike_ids if f"{prefix}{pk}" in cached}
+
+    uncached = [pk for pk in bike_ids if pk not in bases]
+    if uncached:
+        fresh = dict.fromkeys(uncached, False)  # unknown ids are cached too; creating a bike bumps the version
+        for pk, price in BuyBike.objects.filter(pk__in=uncached).values_list("pk", "price"):
+            fresh[pk] = base_quote(price, rules)
+        cache.set_many({f"{prefix}{pk}": base for pk, base in fresh.items()})
+        bases.update(fresh)
+
+    quotes = {pk: with_fees(bases[pk], chosen_fees or {}) for pk in bike_ids if bases[pk]}
+    return quotes, [pk for pk in bike_ids if not bases[pk]]
@@ -0,0 +1,214 @@
+"""
+Responsive image renditions (fixed-width WebP + JPEG) for every ImageField.
+
+Each rendition is stored next to its original as `<original name>.<width>w.<ext>`,
+e.g. buybikes/images/r15.jpg.640w.webp, in the original's storage. Widths come
+from settings.IMAGE_RENDITION_WIDTHS and never upscale: a 900px upload gets the
+320 and 640 renditions only. They are written by the `process_image_jobs`
+worker after an upload (bike/jobs.py), together with normalize(): oversized
+originals are shrunk to IMAGE_MAX_DIMENSION and metadata (EXIF GPS etc.) is
+dropped. `generate_renditions` backfills files uploaded before this existed.
+
+Serializers only look renditions up, never generate them: until every
+rendition of an image exists it is served as the original alone. Uploaded
+names are never overwritten (the storage picks a fresh name), so a complete
+set is memoized per process. An incomplete one (or a missing original, e.g.
+not yet synced to this server) is remembered by name in the catalog cache,
+shared by all workers, until the job queue has written the renditions and
+calls settled(); PENDING_TIMEOUT only bounds a marker nobody clears.
+"""
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import models
+from PIL import Image, ImageOps
+
+from .cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+# format -> (file extension, Pillow format, save options)
+FORMATS = {
+    "webp": ("webp", "WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("jpg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+RENDITION_RE = re.compile(r"\.(\d+)w\.(webp|jpg)$")
+# EXIF orientations that rotate the image by 90 degrees
+ROTATED = {5, 6, 7, 8}
+# re-encodable originals; GIFs (maybe animated) and the rest are left untouched
+NORMALIZED_FORMATS = {"JPEG": {"quality": 90, "optimize": True}, "PNG": {"optimize": True}, "WEBP": {"quality": 90}}
+MEMO_SIZE = 8192
+PENDING_TIMEOUT = 60 * 60
+
+_lock = threading.Lock()
+_available = OrderedDict()
+
+
+def configured_widths():
+    return sorted(set(getattr(settings, "IMAGE_RENDITION_WIDTHS", (320, 640, 1024, 1600))))
+
+
+def rendition_name(name, width, fmt):
+    return f"{name}.{width}w.{FORMATS[fmt][0]}"
+
+
+def is_rendition(name):
+    return RENDITION_RE.search(name) is not None
+
+
+def original_name(name):
+    """The original a rendition name belongs to (None for non-renditions)."""
+    match = RENDITION_RE.search(name)
+    return name[:match.start()] if match else None
+
+
+def display_size(image):
+    width, height = image.size
+    if image.getexif().get(0x0112) in ROTATED:
+        return height, width
+    return width, height
+
+
+def target_widths(width):
+    return [w for w in configured_widths() if w < width]
+
+
+def flatten(image, fmt):
+    if fmt == "jpeg":
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return image.convert("RGB") if image.mode != "RGB" else image
+    if image.mode not in ("RGB", "RGBA"):
+        return image.convert("RGBA" if image.mode in ("LA", "P") else "RGB")
+    return image
+
+
+def encode(image, fmt):
+    _, pil_format, options = FORMATS[fmt]
+    buffer = BytesIO()
+    flatten(image, fmt).save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def generate(storage, name):
+    """Writes the missing renditions of `name`; returns the widths available."""
+    with storage.open(name, "rb") as handle:
+        image = Image.open(handle)
+        width, _ = display_size(image)
+        widths = target_widths(width)
+        missing = [
+            (w, fmt) for w in widths for fmt in FORMATS if not storage.exists(rendition_name(name, w, fmt))
+        ]
+        if not missing:
+            return tuple(widths)
+        # JPEG: let libjpeg decode at a reduced scale that still covers the largest rendition
+        scale = max(w for w, _ in missing) / width
+        image.draft("RGB", (round(image.width * scale), round(image.height * scale)))
+        image = ImageOps.exif_transpose(image)
+    # largest first, each one resized from the previous to keep the filter cheap
+    source = image
+    for w in sorted({w for w, _ in missing}, reverse=True):
+        h = max(1, round(image.height * w / image.width))
+        source = source.resize((w, h), Image.LANCZOS, reducing_gap=3.0)
+        for fmt in FORMATS:
+            if (w, fmt) in missing:
+                storage.save(rendition_name(name, w, fmt), ContentFile(encode(source, fmt)))
+    return tuple(widths)
+
+
+def normalize(storage, name, max_dimension):
+    """
+    Shrinks an original larger than `max_dimension` and drops its metadata,
+    saving the result under a new name. Returns (name, width, height), the
+    name unchanged when there was nothing to do.
+    """
+    with storage.open(name, "rb") as handle:
+        image = Image.open(handle)
+        width, height = display_size(image)
+        options = NORMALIZED_FORMATS.get(image.format)
+        metadata = bool(image.getexif()) or any(key in image.info for key in ("exif", "xmp", "XML:com.adobe.xmp"))
+        if options is None or (max(width, height) <= max_dimension and not metadata):
+            return name, width, height
+        pil_format, icc_profile = image.format, image.info.get("icc_profile")
+        image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    if pil_format == "JPEG" and image.mode not in ("RGB", "L", "CMYK"):
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    # only the color profile survives
+    image.save(buffer, pil_format, icc_profile=icc_profile, **options)
+    return storage.save(name, ContentFile(buffer.getvalue())), image.width, image.height
+
+
+def complete(storage, name):
+    """Widths of `name` when all its renditions exist, else None (still pending)."""
+    with storage.open(name, "rb") as handle:
+        width, _ = display_size(Image.open(handle))
+    widths = target_widths(width)
+    if all(storage.exists(rendition_name(name, w, fmt)) for w in widths for fmt in FORMATS):
+        return tuple(widths)
+    return None
+
+
+def pending_key(name):
+    return f"bike:renditions-pending:{hashlib.md5(name.encode()).hexdigest()}"
+
+
+def available(storage, name):
+    """Rendition widths of `name`; () while they are pending or impossible."""
+    key = (id(storage), name)
+    with _lock:
+        widths = _available.get(key)
+        if widths is not None:
+            _available.move_to_end(key)
+    if widths is not None:
+        return widths
+    cache = catalog_cache()
+    if cache.get(pending_key(name)):
+        return ()
+    try:
+        widths = complete(storage, name)
+    except FileNotFoundError:
+        widths = None  # may still appear: treat it as pending
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        # unreadable original: serve the original URL only
+        logger.warning("No renditions for %s: %s", name, exc)
+        widths = ()
+    if widths is None:
+        cache.set(pending_key(name), True, PENDING_TIMEOUT)
+        return ()
+    with _lock:
+        _available[key] = widths
+        _available.move_to_end(key)
+        while len(_available) > MEMO_SIZE:
+            _available.popitem(last=False)
+    return widths
+
+
+def settled(*names):
+    """Called once the renditions of `names` are written: drops their pending markers."""
+    catalog_cache().delete_many([pending_key(name) for name in names])
+
+
+def ensure(fieldfile):
+    if not fieldfile or not getattr(fieldfile, "name", None) or is_rendition(fieldfile.name):
+        return ()
+    return available(fieldfile.storage, fieldfile.name)
+
+
+def image_fields(model):
+    return [f for f in model._meta.get_fields() if isinstance(f, models.ImageField)]
+
+
+def forget():
+    with _lock:
+        _available.clear()
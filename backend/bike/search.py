@@ -0,0 +1,144 @@
+"""
+Full-text search over BuyBike listings.
+
+SQLite keeps an FTS5 virtual table (`buybike_fts`, rowid == buybike.id) and
+PostgreSQL a side table of weighted tsvectors behind a GIN index
+(`buybike_search`). Both are created by migration 0031 and kept in sync by
+the BuyBike / Location signals in bike/signals.py. Any other database falls
+back to the old icontains matching.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# fields that feed the search document; saves touching none of them are skipped
+INDEXED_FIELDS = {"title", "brand", "bike_model", "bike_variant", "category", "description", "location"}
+# related rows read by document(); select_related these when indexing in bulk
+DOCUMENT_RELATED = ["location", "brand", "bike_model", "bike_variant", "category"]
+
+MAX_TERMS = 8
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# bm25 column weights: title, brand, tags (model/variant/category), location, description
+FTS_WEIGHTS = "10.0, 6.0, 4.0, 3.0, 1.0"
+
+
+def tokens(value):
+    return TOKEN_RE.findall((value or "").lower())[:MAX_TERMS]
+
+
+def _name(option):
+    return option.name if option else ""
+
+
+def document(bike):
+    return {
+        "title": bike.title or "",
+        "brand": _name(bike.brand),
+        "tags": " ".join(filter(None, [_name(bike.bike_model), _name(bike.bike_variant), _name(bike.category)])),
+        "location": _name(bike.location),
+        "description": bike.description or "",
+    }
+
+
+def index_bike(bike):
+    index_bikes([bike])
+
+
+def index_bikes(bikes, batch_size=500):
+    """(Re-)indexes `bikes`, batching the statements with executemany. Returns the count."""
+    batch, count = [], 0
+    for bike in bikes:
+        batch.append(bike)
+        count += 1
+        if len(batch) >= batch_size:
+            _write_documents(batch)
+            batch = []
+    if batch:
+        _write_documents(batch)
+    return count
+
+
+def _write_documents(bikes):
+    docs = [(bike.pk, document(bike)) for bike in bikes]
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.executemany("DELETE FROM buybike_fts WHERE rowid = %s", [[pk] for pk, _ in docs])
+            cursor.executemany(
+                "INSERT INTO buybike_fts (rowid, title, brand, tags, location, description) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [[pk, d["title"], d["brand"], d["tags"], d["location"], d["description"]] for pk, d in docs],
+            )
+        elif connection.vendor == "postgresql":
+            cursor.executemany(
+                "INSERT INTO buybike_search (bike_id, document) VALUES (%s, "
+                "setweight(to_tsvector('simple', %s), 'A') || "
+                "setweight(to_tsvector('simple', %s), 'B') || "
+                "setweight(to_tsvector('simple', %s), 'C') || "
+                "setweight(to_tsvector('simple', %s), 'D')) "
+                "ON CONFLICT (bike_id) DO UPDATE SET document = EXCLUDED.document",
+                [[pk, d["title"], f'{d["brand"]} {d["tags"]}', d["location"], d["description"]] for pk, d in docs],
+            )
+
+
+def remove_bike(pk):
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("DELETE FROM buybike_fts WHERE rowid = %s", [pk])
+        elif connection.vendor == "postgresql":
+            cursor.execute("DELETE FROM buybike_search WHERE bike_id = %s", [pk])
+
+
+def rebuild_index():
+    """Drops every indexed document and re-indexes all bikes. Returns the row count."""
+    from .models import BuyBike
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("DELETE FROM buybike_fts")
+        elif connection.vendor == "postgresql":
+            cursor.execute("TRUNCATE buybike_search")
+    return index_bikes(BuyBike.objects.select_related(*DOCUMENT_RELATED).iterator(chunk_size=500))
+
+
+def search_queryset(queryset, value):
+    """
+    Restricts `queryset` to bikes matching every search term (prefix match)
+    and annotates `search_rank` (higher is more relevant).
+    """
+    terms = tokens(value)
+    if not terms:
+        return queryset
+
+    if connection.vendor == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        ids = RawSQL("SELECT rowid FROM buybike_fts WHERE buybike_fts MATCH %s", [match])
+        rank = RawSQL(
+            f"SELECT -bm25(buybike_fts, {FTS_WEIGHTS}) FROM buybike_fts "
+            'WHERE buybike_fts MATCH %s AND rowid = "buybike"."id"',
+            [match], output_field=FloatField(),
+        )
+    elif connection.vendor == "postgresql":
+        query = " & ".join(f"{term}:*" for term in terms)
+        ids = RawSQL(
+            "SELECT bike_id FROM buybike_search WHERE document @@ to_tsquery('simple', %s)", [query]
+        )
+        rank = RawSQL(
+            "SELECT ts_rank(document, to_tsquery('simple', %s)) FROM buybike_search "
+            'WHERE bike_id = "buybike"."id"',
+            [query], output_field=FloatField(),
+        )
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(title__icontains=term) |
+                Q(description__icontains=term) |
+                Q(brand__name__icontains=term) |
+                Q(location__name__icontains=term)
+            )
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    return queryset.filter(id__in=ids).annotate(search_rank=rank)
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import HeroSection, HeroBikeImage, InfoSection, SupportFeature
 from rest_framework import serializers
-from .models import BuyBike, Location
+from .models import BuyBike, BikeImage, Location
 from .models import Booking, BuyBike
 from rest_framework import serializers
 from .models import LastSection, LastSectionImage
@@ -14,24 +14,54 @@ from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from .models import AboutSectionOne
 from .models import SellBikePage, HowItWorks
+from .models import Brand, BikeModel, BikeVariant
 
 from .models import AboutSection1, AboutSection2, AboutSection3, AboutSection3Image
+from django.db import models
+from . import bookings, pricing
+from .media import MediaFileField, MediaImageField, MediaSrcsetField, build_media_url, build_srcset
+
+
+class AbsoluteImageMixin:
+    """
+    Routes every image/file URL through bike.media (per-request host prefix,
+    memoized storage URLs, optional MEDIA_CDN_URL). Auto-generated model
+    ImageFields use it too via serializer_field_mapping.
+    """
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: MediaFileField,
+        models.ImageField: MediaImageField,
+    }
+
+    def media_url(self, field):
+        return build_media_url(field, self.context.get("request"))
+
+    def get_absolute_url(self, obj, field_name, request):
+        return build_media_url(getattr(obj, field_name), request)
+
+
+class HowItWorksSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
+    image_srcset = MediaSrcsetField(source="image")
 
-class HowItWorksSerializer(serializers.ModelSerializer):
     class Meta:
         model = HowItWorks
-        fields = ["id", "title", "image"]
+        fields = ["id", "title", "image", "image_srcset"]
 
-class SellBikePageSerializer(serializers.ModelSerializer):
+class SellBikePageSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     how_it_works = HowItWorksSerializer(many=True, read_only=True)
+    top_banner_image_srcset = MediaSrcsetField(source="top_banner_image")
+    second_banner_image_srcset = MediaSrcsetField(source="second_banner_image")
 
     class Meta:
         model = SellBikePage
         fields = [
             "id",
             "top_banner_image",
+            "top_banner_image_srcset",
             "top_banner_text",
             "second_banner_image",
+            "second_banner_image_srcset",
             "second_banner_top_text",
             "second_banner_bottom_text",
             "brand_options",
@@ -43,13 +73,23 @@ class SellBikePageSerializer(serializers.ModelSerializer):
             "how_it_works",
         ]
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # dropdowns left empty in the admin fall back to the normalized catalog
+        for key, option_model in (("brand_options", Brand), ("model_options", BikeModel), ("variant_options", BikeVariant)):
+            if not data.get(key):
+                names = option_model.objects.order_by("name").values_list("name", flat=True).distinct()
+                data[key] = ",".join(names)
+        return data
+
 
-class AboutSection3ImageSerializer(serializers.ModelSerializer):
-    image = serializers.ImageField(use_url=True)
+class AboutSection3ImageSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
+    image = MediaImageField(use_url=True)
+    image_srcset = MediaSrcsetField(source="image")
 
     class Meta:
         model = AboutSection3Image
-        fields = ("id", "image", "order")
+        fields = ("id", "image", "image_srcset", "order")
 
 
 class AboutSection3Serializer(serializers.ModelSerializer):
@@ -60,35 +100,38 @@ class AboutSection3Serializer(serializers.ModelSerializer):
         fields = ("id", "title", "content", "images")
 
 
-class AboutSection1Serializer(serializers.ModelSerializer):
-    image = serializers.ImageField(use_url=True)
+class AboutSection1Serializer(AbsoluteImageMixin, serializers.ModelSerializer):
+    image = MediaImageField(use_url=True)
+    image_srcset = MediaSrcsetField(source="image")
 
     class Meta:
         model = AboutSection1
-        fields = ("id", "title", "content", "image")
+        fields = ("id", "title", "content", "image", "image_srcset")
 
 
-class AboutSection2Serializer(serializers.ModelSerializer):
-    background_image = serializers.ImageField(use_url=True)
+class AboutSection2Serializer(AbsoluteImageMixin, serializers.ModelSerializer):
+    background_image = MediaImageField(use_url=True)
+    background_image_srcset = MediaSrcsetField(source="background_image")
 
     class Meta:
         model = AboutSection2
-        fields = ("id", "background_image", "overlay_title", "overlay_text")
+        fields = ("id", "background_image", "background_image_srcset", "overlay_title", "overlay_text")
 
 
-class AboutSectionOneSerializer(serializers.ModelSerializer):
+class AboutSectionOneSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_srcset = MediaSrcsetField(source="image")
 
     class Meta:
         model = AboutSectionOne
-        fields = ("id", "heading", "content", "image", "image_url", "alt_text", "is_active", "order", "created_at")
+        fields = (
+            "id", "heading", "content", "image", "image_url", "image_srcset", "alt_text", "is_active", "order",
+            "created_at",
+        )
         read_only_fields = ("id", "image_url", "created_at")
 
     def get_image_url(self, obj):
-        request = self.context.get("request")
-        if obj.image and hasattr(obj.image, "url"):
-            return request.build_absolute_uri(obj.image.url) if request else obj.image.url
-        return None
+        return self.media_url(obj.image)
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -122,22 +165,17 @@ class AuthImageSerializer(serializers.Serializer):
     image_url = serializers.CharField(allow_null=True)
 
 
-class LastSectionImageSerializer(serializers.ModelSerializer):
+class LastSectionImageSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_srcset = MediaSrcsetField(source="image")
 
     class Meta:
         model = LastSectionImage
-        fields = ["id", "title", "image", "image_url", "alt_text", "order_no"]
+        fields = ["id", "title", "image", "image_url", "image_srcset", "alt_text", "order_no"]
         read_only_fields = ["id", "image_url"]
 
     def get_image_url(self, obj):
-        request = self.context.get("request")
-        if obj.image:
-            # Use full absolute URL if request provided (useful for frontend)
-            if request is not None:
-                return request.build_absolute_uri(obj.image.url)
-            return obj.image.url
-        return None
+        return self.media_url(obj.image)
 
 
 class LastSectionSerializer(serializers.ModelSerializer):
@@ -150,37 +188,68 @@ class LastSectionSerializer(serializers.ModelSerializer):
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
-    buybike = serializers.PrimaryKeyRelatedField(queryset=BuyBike.objects.all())
+    # the created booking is rendered with BookingDetailSerializer, which reads the location
+    buybike = serializers.PrimaryKeyRelatedField(queryset=BuyBike.objects.select_related("location"))
+
+    # codes of the optional PRICING_FEES the buyer picked; amounts are always the server's (bike/pricing.py)
+    fees = serializers.ListField(child=serializers.CharField(), required=False, write_only=True)
+    # older clients send an amount here; any positive value only asks for the "test_drive" fee
+    test_drive_fee = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False, write_only=True,
+    )
 
     class Meta:
         model = Booking
-        fields = ("id", "buybike", "test_drive_fee")
+        fields = ("id", "buybike", "fees", "test_drive_fee")
+
+    def validate(self, attrs):
+        codes = list(attrs.get("fees", []))
+        if attrs.pop("test_drive_fee", None):
+            codes.append("test_drive")
+        unknown = sorted(set(codes) - set(pricing.fees()))
+        if unknown:
+            raise serializers.ValidationError({"fees": f"Unknown fees: {', '.join(unknown)}."})
+        attrs["fees"] = list(dict.fromkeys(codes))
+        return attrs
 
     def create(self, validated_data):
-        bike = validated_data["buybike"]
-        subtotal = float(getattr(bike, "price", 0) or 0)
-        test_drive_fee = float(validated_data.get("test_drive_fee", 0) or 0)
-        gst_amount = round(subtotal * 0.18, 2)
-        total_amount = subtotal + gst_amount + test_drive_fee
-
-        booking = Booking.objects.create(
-            buybike=bike,
-            amount=subtotal,
-            gst_amount=gst_amount,
-            test_drive_fee=test_drive_fee,
-            total_amount=total_amount,
-            status="created",
-        )
-        bike.is_booked = True
-        bike.save(update_fields=["is_booked"])
-        return booking
+        return bookings.book(validated_data["buybike"], user=validated_data.get("user"), fees=validated_data["fees"])
+
+
+# pricing.quote_many() output; decimals render as exact strings
+class TaxLineSerializer(serializers.Serializer):
+    code = serializers.CharField()
+    rate = serializers.DecimalField(max_digits=7, decimal_places=4)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class FeeLineSerializer(serializers.Serializer):
+    code = serializers.CharField()
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
 
 
+class PriceQuoteSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    taxes = TaxLineSerializer(many=True)
+    tax_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    fees = FeeLineSerializer(many=True)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
 
 
-class BookingDetailSerializer(serializers.ModelSerializer):
+
+
+class BookingDetailSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     buybike_obj = serializers.SerializerMethodField()
 
+    # the only columns this serializer reads; views load bookings with
+    # select_related("buybike__location").only(*BookingDetailSerializer.PROJECTION)
+    PROJECTION = (
+        "id", "buybike", "amount", "gst_amount", "test_drive_fee", "total_amount", "status", "created_at", "updated_at",
+        "buybike__id", "buybike__title", "buybike__price", "buybike__featured_image",
+        "buybike__location__id", "buybike__location__name",
+    )
+
     class Meta:
         model = Booking
         fields = [
@@ -201,33 +270,27 @@ class BookingDetailSerializer(serializers.ModelSerializer):
             "id": obj.buybike.id,
             "title": obj.buybike.title,
             "price": obj.buybike.price,
-            "featured_image_url": (obj.buybike.featured_image.url if obj.buybike.featured_image else None),
+            "location": obj.buybike.location.name if obj.buybike.location else None,
+            "featured_image_url": self.media_url(obj.buybike.featured_image),
+            "featured_image_srcset": build_srcset(obj.buybike.featured_image, self.context.get("request")),
         }
 
 
-class AbsoluteImageMixin:
-    def get_absolute_url(self, obj, field_name, request):
-        field = getattr(obj, field_name)
-        if field and hasattr(field, "url"):
-            return request.build_absolute_uri(field.url) if request else field.url
-        return None
-    
-class HeroBikeImageSerializer(serializers.ModelSerializer):
+class HeroBikeImageSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_srcset = MediaSrcsetField(source="image")
 
     class Meta:
         model = HeroBikeImage
-        fields = ["id", "image", "image_url", "order"]
+        fields = ["id", "image", "image_url", "image_srcset", "order"]
 
     def get_image_url(self, obj):
-        request = self.context.get("request")
-        if request:
-            return request.build_absolute_uri(obj.image.url)
-        return obj.image.url  # fallback if no request in context
+        return self.media_url(obj.image)
 
 
-class HeroSectionSerializer(serializers.ModelSerializer):
+class HeroSectionSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     trapezoid_image_url = serializers.SerializerMethodField()
+    trapezoid_image_srcset = MediaSrcsetField(source="trapezoid_image")
     bike_images = HeroBikeImageSerializer(many=True, read_only=True)
 
     class Meta:
@@ -239,71 +302,89 @@ class HeroSectionSerializer(serializers.ModelSerializer):
             "button_text",
             "trapezoid_image",
             "trapezoid_image_url",
+            "trapezoid_image_srcset",
             "bike_images",
         ]
 
     def get_trapezoid_image_url(self, obj):
-        request = self.context.get("request")
-        if request:
-            return request.build_absolute_uri(obj.trapezoid_image.url)
-        return obj.trapezoid_image.url
+        return self.media_url(obj.trapezoid_image)
 
 
-class InfoSectionSerializer(serializers.ModelSerializer):
+class InfoSectionSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     bike_image_url = serializers.SerializerMethodField()
+    bike_image_srcset = MediaSrcsetField(source="bike_image")
 
     class Meta:
         model = InfoSection
-        fields = ["id","description","button_text","bike_image","bike_image_url","order"]
+        fields = ["id","description","button_text","bike_image","bike_image_url","bike_image_srcset","order"]
 
     def get_bike_image_url(self, obj):
-        request = self.context.get("request")
-        return AbsoluteImageMixin().get_absolute_url(obj, "bike_image", request)
+        return self.media_url(obj.bike_image)
 
 
-class SupportFeatureSerializer(serializers.ModelSerializer):
+class SupportFeatureSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_srcset = MediaSrcsetField(source="image")
     arrow_image_url = serializers.SerializerMethodField()
+    arrow_image_srcset = MediaSrcsetField(source="arrow_image")
 
     class Meta:
         model = SupportFeature
-        fields = ["id","title","subtitle","description","image","image_url","arrow_image","arrow_image_url","arrow","order"]
+        fields = [
+            "id", "title", "subtitle", "description", "image", "image_url", "image_srcset",
+            "arrow_image", "arrow_image_url", "arrow_image_srcset", "arrow", "order",
+        ]
 
     def get_image_url(self, obj):
-        request = self.context.get("request")
-        return AbsoluteImageMixin().get_absolute_url(obj, "image", request)
+        return self.media_url(obj.image)
 
     def get_arrow_image_url(self, obj):
-        request = self.context.get("request")
-        return AbsoluteImageMixin().get_absolute_url(obj, "arrow_image", request)
+        return self.media_url(obj.arrow_image)
    
 
-class LocationSerializer(serializers.ModelSerializer):
+class LocationSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_srcset = MediaSrcsetField(source="image")
 
     class Meta:
         model = Location
-        fields = ["id", "name", "image", "image_url"]
+        fields = ["id", "name", "image", "image_url", "image_srcset"]
+
+    def get_image_url(self, obj):
+        return self.media_url(obj.image)
+
+class BikeImageSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
+    image_url = serializers.SerializerMethodField()
+    image_srcset = MediaSrcsetField(source="image")
+
+    class Meta:
+        model = BikeImage
+        fields = ["id", "image", "image_url", "image_srcset", "order", "alt_text"]
 
     def get_image_url(self, obj):
-        request = self.context.get("request")
-        if obj.image:
-            return request.build_absolute_uri(obj.image.url) if request else obj.image.url
-        return None
+        return self.media_url(obj.image)
+
 
-class BuyBikeSerializer(serializers.ModelSerializer):
+class BuyBikeSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     featured_image_url = serializers.SerializerMethodField()
+    featured_image_srcset = MediaSrcsetField(source="featured_image")
     card_bg_image_url = serializers.SerializerMethodField()
+    card_bg_image_srcset = MediaSrcsetField(source="card_bg_image")
 
-    #  Variant image URLs
-    variant_image1_url = serializers.SerializerMethodField()
-    variant_image2_url = serializers.SerializerMethodField()
-    variant_image3_url = serializers.SerializerMethodField()
-    variant_image4_url = serializers.SerializerMethodField()
-    variant_image5_url = serializers.SerializerMethodField()
+    # ordered gallery; BuyBikeDetail prefetches it in one query
+    images = BikeImageSerializer(many=True, read_only=True)
+    gallery_urls = serializers.SerializerMethodField()
 
     location_obj = LocationSerializer(source="location", read_only=True)
 
+    # catalog lookups are exposed by name, as the free-text fields used to be
+    brand = serializers.SlugRelatedField(slug_field="name", read_only=True)
+    bike_model = serializers.SlugRelatedField(slug_field="name", read_only=True)
+    bike_variant = serializers.SlugRelatedField(slug_field="name", read_only=True)
+    fuel_type = serializers.SlugRelatedField(slug_field="name", read_only=True)
+    color = serializers.SlugRelatedField(slug_field="name", read_only=True)
+    category = serializers.SlugRelatedField(slug_field="name", read_only=True)
+
     class Meta:
         model = BuyBike
         fields = [
@@ -316,108 +397,116 @@ class BuyBikeSerializer(serializers.ModelSerializer):
             "is_booked",
             "ignition_type", "front_brake_type", "rear_brake_type", "abs", "odometer", "wheel_type",
             # images
-            "featured_image", "featured_image_url",
-            "card_bg_image", "card_bg_image_url",
-            "variant_image1", "variant_image1_url",
-            "variant_image2", "variant_image2_url",
-            "variant_image3", "variant_image3_url",
-            "variant_image4", "variant_image4_url",
-            "variant_image5", "variant_image5_url",
+            "featured_image", "featured_image_url", "featured_image_srcset",
+            "card_bg_image", "card_bg_image_url", "card_bg_image_srcset",
+            "images", "gallery_urls",
             "created_at", "updated_at"
         ]
 
     def get_featured_image_url(self, obj):
-        request = self.context.get("request")
-        return request.build_absolute_uri(obj.featured_image.url) if obj.featured_image and request else (obj.featured_image.url if obj.featured_image else None)
+        return self.media_url(obj.featured_image)
 
     def get_card_bg_image_url(self, obj):
-        request = self.context.get("request")
-        return request.build_absolute_uri(obj.card_bg_image.url) if obj.card_bg_image and request else (obj.card_bg_image.url if obj.card_bg_image else None)
+        return self.media_url(obj.card_bg_image)
 
-    def get_variant_image1_url(self, obj):
-        request = self.context.get("request")
-        return request.build_absolute_uri(obj.variant_image1.url) if obj.variant_image1 and request else (obj.variant_image1.url if obj.variant_image1 else None)
+    def get_gallery_urls(self, obj):
+        return [self.media_url(image.image) for image in obj.images.all()]
 
-    def get_variant_image2_url(self, obj):
-        request = self.context.get("request")
-        return request.build_absolute_uri(obj.variant_image2.url) if obj.variant_image2 and request else (obj.variant_image2.url if obj.variant_image2 else None)
 
-    def get_variant_image3_url(self, obj):
-        request = self.context.get("request")
-        return request.build_absolute_uri(obj.variant_image3.url) if obj.variant_image3 and request else (obj.variant_image3.url if obj.variant_image3 else None)
+class BuyBikeCardSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
+    """
+    Compact listing-card representation used by BuyBikeList; the detail
+    endpoint keeps the full BuyBikeSerializer.
+    """
+    featured_image_url = serializers.SerializerMethodField()
+    featured_image_srcset = MediaSrcsetField(source="featured_image")
+    card_bg_image_url = serializers.SerializerMethodField()
+    card_bg_image_srcset = MediaSrcsetField(source="card_bg_image")
+    location_obj = LocationSerializer(source="location", read_only=True)
+    brand = serializers.SlugRelatedField(slug_field="name", read_only=True)
+    bike_model = serializers.SlugRelatedField(slug_field="name", read_only=True)
+    fuel_type = serializers.SlugRelatedField(slug_field="name", read_only=True)
+
+    # related rows to join and columns to load with .only(); includes every
+    # ordering field so the cursor pagination never triggers a deferred-field query
+    load_related = ["location", "brand", "bike_model", "fuel_type"]
+    load_only = [
+        "id", "title", "price", "year", "kilometers", "owner", "is_booked",
+        "featured_image", "card_bg_image", "created_at", "updated_at",
+        "location", "brand", "bike_model", "fuel_type",
+        "location__name", "location__image", "brand__name", "bike_model__name", "fuel_type__name",
+    ]
 
-    def get_variant_image4_url(self, obj):
-        request = self.context.get("request")
-        return request.build_absolute_uri(obj.variant_image4.url) if obj.variant_image4 and request else (obj.variant_image4.url if obj.variant_image4 else None)
+    class Meta:
+        model = BuyBike
+        fields = [
+            "id", "title", "price", "location", "location_obj",
+            "brand", "bike_model", "year", "kilometers", "fuel_type", "owner",
+            "is_booked",
+            "featured_image", "featured_image_url", "featured_image_srcset",
+            "card_bg_image_url", "card_bg_image_srcset",
+            "created_at",
+        ]
 
-    def get_variant_image5_url(self, obj):
-        request = self.context.get("request")
-        return request.build_absolute_uri(obj.variant_image5.url) if obj.variant_image5 and request else (obj.variant_image5.url if obj.variant_image5 else None)
+    def get_featured_image_url(self, obj):
+        return self.media_url(obj.featured_image)
+
+    def get_card_bg_image_url(self, obj):
+        return self.media_url(obj.card_bg_image)
 
     
-class StatItemSerializer(serializers.ModelSerializer):
+class StatItemSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     icon_url = serializers.SerializerMethodField()
+    icon_srcset = MediaSrcsetField(source="icon")
 
     class Meta:
         model = StatItem
-        fields = ("id", "icon_url", "value", "caption", "order", "is_visible")
+        fields = ("id", "icon_url", "icon_srcset", "value", "caption", "order", "is_visible")
 
     def get_icon_url(self, obj):
-        request = self.context.get("request")
-        if obj.icon and hasattr(obj.icon, "url"):
-            return request.build_absolute_uri(obj.icon.url) if request else obj.icon.url
-        return None
+        return self.media_url(obj.icon)
 
-class HomepageBannerSerializer(serializers.ModelSerializer):
+class HomepageBannerSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     stats = StatItemSerializer(many=True, read_only=True)
     logo_url = serializers.SerializerMethodField()
+    logo_srcset = MediaSrcsetField(source="logo")
 
     class Meta:
         model = HomepageBanner
         fields = (
-            "id", "title", "logo_url", 
+            "id", "title", "logo_url", "logo_srcset",
             "is_active", "created_at", "stats"
         )
 
-    def _abs_url(self, field):
-        request = self.context.get("request")
-        if field and hasattr(field, "url"):
-            return request.build_absolute_uri(field.url) if request else field.url
-        return None
-
-    def get_logo_url(self, obj): return self._abs_url(obj.logo)
+    def get_logo_url(self, obj): return self.media_url(obj.logo)
     
 
-class TestimonialSerializer(serializers.ModelSerializer):
+class TestimonialSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_srcset = MediaSrcsetField(source="image")
 
     class Meta:
         model = Testimonial
-        fields = ("id", "name", "role", "quote", "image_url", "is_visible", "order")
+        fields = ("id", "name", "role", "quote", "image_url", "image_srcset", "is_visible", "order")
 
     def get_image_url(self, obj):
-        request = self.context.get("request")
-        if obj.image and hasattr(obj.image, "url"):
-            return request.build_absolute_uri(obj.image.url) if request else obj.image.url
-        return None
+        return self.media_url(obj.image)
 
 class TestimonialsSectionSerializer(serializers.ModelSerializer):
     class Meta:
         model = TestimonialsSection
         fields = ("id", "title", "subtitle", "is_active")
         
-class TrustedSectionSerializer(serializers.ModelSerializer):
+class TrustedSectionSerializer(AbsoluteImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_srcset = MediaSrcsetField(source="image")
 
     class Meta:
         model = TrustedSection
-        fields = ("id", "title", "description", "image_url", "is_active", "created_at")
+        fields = ("id", "title", "description", "image_url", "image_srcset", "is_active", "created_at")
 
     def get_image_url(self, obj):
-        request = self.context.get("request")
-        if obj.image and hasattr(obj.image, "url"):
-            return request.build_absolute_uri(obj.image.url) if request else obj.image.url
-        return None
+        return self.media_url(obj.image)
     
 class FAQSerializer(serializers.ModelSerializer):
     class Meta:
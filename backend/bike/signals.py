@@ -0,0 +1,103 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import jobs, search
+from .cache import bump_catalog_version
+from .models import (
+    BikeImage, BikeModel, BikeVariant, Brand, BuyBike, Category, Color, FuelType, ImageJob, Location,
+)
+
+CATALOG_OPTIONS = [Brand, BikeModel, BikeVariant, Category, FuelType, Color]
+
+
+def touch_bikes(queryset):
+    # listing/detail payloads render related names, so bump updated_at for the
+    # conditional GET validators and the inventory index watermark
+    queryset.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=BuyBike)
+@receiver(post_delete, sender=BuyBike)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_catalog(sender, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=BikeImage)
+@receiver(post_delete, sender=BikeImage)
+def gallery_changed(sender, instance, **kwargs):
+    # admin inlines are saved after their bike, so invalidate once more
+    touch_bikes(BuyBike.objects.filter(pk=instance.bike_id))
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=BuyBike)
+def index_buybike(sender, instance, update_fields=None, **kwargs):
+    # e.g. the booking flow only touches is_booked -> nothing searchable changed
+    if update_fields and not (set(update_fields) & search.INDEXED_FIELDS):
+        return
+    search.index_bike(instance)
+
+
+@receiver(post_delete, sender=BuyBike)
+def unindex_buybike(sender, instance, **kwargs):
+    search.remove_bike(instance.pk)
+
+
+@receiver(post_save, sender=Location)
+def reindex_location_bikes(sender, instance, **kwargs):
+    touch_bikes(instance.buybikes.all())
+    search.index_bikes(instance.buybikes.select_related(*search.DOCUMENT_RELATED))
+
+
+def catalog_option_saved(sender, instance, **kwargs):
+    # a renamed brand/model/... changes the listing payloads and search documents
+    bump_catalog_version()
+    touch_bikes(instance.buybikes.all())
+    search.index_bikes(instance.buybikes.select_related(*search.DOCUMENT_RELATED))
+
+
+def remember_option_bikes(sender, instance, **kwargs):
+    instance._touch_bike_ids = list(instance.buybikes.values_list("id", flat=True))
+
+
+def catalog_option_deleted(sender, instance, **kwargs):
+    bump_catalog_version()
+    touch_bikes(BuyBike.objects.filter(id__in=getattr(instance, "_touch_bike_ids", [])))
+
+
+for option_model in CATALOG_OPTIONS:
+    post_save.connect(catalog_option_saved, sender=option_model, dispatch_uid=f"catalog-saved-{option_model.__name__}")
+    pre_delete.connect(remember_option_bikes, sender=option_model, dispatch_uid=f"catalog-pre-delete-{option_model.__name__}")
+    post_delete.connect(catalog_option_deleted, sender=option_model, dispatch_uid=f"catalog-deleted-{option_model.__name__}")
+
+
+@receiver(pre_delete, sender=Location)
+def remember_location_bikes(sender, instance, **kwargs):
+    # the FK is SET_NULL via a bulk UPDATE, so collect the affected bikes first
+    instance._search_bike_ids = list(instance.buybikes.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Location)
+def reindex_orphaned_bikes(sender, instance, **kwargs):
+    ids = getattr(instance, "_search_bike_ids", [])
+    touch_bikes(BuyBike.objects.filter(id__in=ids))
+    search.index_bikes(BuyBike.objects.filter(id__in=ids).select_related(*search.DOCUMENT_RELATED))
+
+
+@receiver(pre_save, dispatch_uid="image-uploads")
+def remember_image_uploads(sender, instance, **kwargs):
+    # files are written by the field's pre_save, after this signal
+    if sender._meta.app_label == "bike" and sender is not ImageJob:
+        instance._image_uploads = jobs.new_uploads(instance)
+
+
+@receiver(post_save, dispatch_uid="image-jobs")
+def queue_image_jobs(sender, instance, **kwargs):
+    # resizing / metadata stripping / renditions run in `process_image_jobs`
+    uploads = getattr(instance, "_image_uploads", None)
+    if uploads:
+        jobs.enqueue(instance, uploads)
+        instance._image_uploads = []
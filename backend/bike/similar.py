@@ -0,0 +1,121 @@
+"""
+"Similar bikes" scoring for /api/buybikes/<pk>/similar/.
+
+Candidates are ranked by a vectorized score over the shared inventory index
+(bike/inventory.py): closeness of the standardized numeric features (log
+price, year, log kilometers, log engine_cc) plus weighted exact matches on
+brand, category, fuel type and location. The standardized feature matrix is
+rebuilt only when the index generation changes, so a request is one pass of
+array arithmetic and an argpartition top-k. Booked bikes are never suggested.
+
+Without NumPy the endpoint falls back to unbooked bikes of the same brand or
+category, closest in price first.
+"""
+import threading
+import warnings
+
+from django.db.models import F, Q
+from django.db.models.functions import Abs
+
+from . import inventory
+from .inventory import NULL_REF, np
+
+# column -> (weight, log-scale)
+NUMERIC_FEATURES = {
+    "price": (2.0, True),
+    "year": (1.0, False),
+    "kilometers": (1.0, True),
+    "engine_cc": (1.5, True),
+}
+CATEGORICAL_WEIGHTS = {"brand": 1.5, "category": 1.0, "fuel_type": 0.5, "location": 0.5}
+NUMERIC_WEIGHT = 2.0
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 24
+
+
+class FeatureMatrix:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = None
+        self.raw = None
+        self.scaled = None
+        self.columns = None
+        self.positions = None
+
+    def build(self, index):
+        cols = index.columns
+        raw = np.column_stack([
+            np.log1p(cols[name]) if log else cols[name] for name, (_, log) in NUMERIC_FEATURES.items()
+        ]) if len(cols["id"]) else np.empty((0, len(NUMERIC_FEATURES)))
+        with warnings.catch_warnings():
+            # all-NaN columns (e.g. no engine_cc anywhere) are expected
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mean = np.nanmean(raw, axis=0)
+            std = np.nanstd(raw, axis=0)
+        std = np.where(np.isnan(std) | (std == 0), 1.0, std)
+        # a missing value sits at the column mean, i.e. neither near nor far
+        self.scaled = np.nan_to_num((raw - np.nan_to_num(mean)) / std, nan=0.0).astype("float32")
+        self.raw = raw
+        # keep the columns this matrix was built from; the index may move on
+        self.columns = cols
+        self.positions = {int(pk): i for i, pk in enumerate(cols["id"])}
+        self.generation = index.generation
+
+    def current(self, index):
+        with self.lock:
+            if self.generation != index.generation:
+                self.build(index)
+            return self
+
+
+_matrix = FeatureMatrix()
+
+
+def similar_ids(bike, limit=DEFAULT_LIMIT):
+    """[(id, score), ...] of the `limit` most similar unbooked bikes, best first."""
+    if np is None:
+        return fallback_ids(bike, limit)
+
+    index = inventory.shared_index(type(bike))
+    matrix = _matrix.current(index)
+    target = matrix.positions.get(bike.pk)
+    if target is None:
+        return fallback_ids(bike, limit)
+
+    cols = matrix.columns
+    weights = np.array([w for w, _ in NUMERIC_FEATURES.values()], dtype="float32")
+    # features the target bike lacks do not count towards the distance
+    weights[np.isnan(matrix.raw[target])] = 0.0
+    distance = np.sqrt(((matrix.scaled - matrix.scaled[target]) ** 2 * weights).sum(axis=1))
+    scores = NUMERIC_WEIGHT / (1.0 + distance)
+    for column, weight in CATEGORICAL_WEIGHTS.items():
+        value = cols[column][target]
+        if value != NULL_REF:
+            scores += weight * (cols[column] == value)
+
+    candidates = ~cols["is_booked"]
+    candidates[target] = False
+    count = int(candidates.sum())
+    if not count:
+        return []
+    scores = np.where(candidates, scores, -np.inf)
+    k = min(limit, count)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.lexsort((cols["id"][top], -scores[top]))]
+    return [(int(cols["id"][i]), round(float(scores[i]), 4)) for i in top]
+
+
+def fallback_ids(bike, limit=DEFAULT_LIMIT):
+    related = Q(pk__in=[])
+    if bike.brand_id:
+        related |= Q(brand_id=bike.brand_id)
+    if bike.category_id:
+        related |= Q(category_id=bike.category_id)
+    queryset = (
+        type(bike).objects.filter(related, is_booked=False)
+        .exclude(pk=bike.pk)
+        .annotate(distance=Abs(F("price") - bike.price))
+        .order_by("distance", "id")
+    )
+    return [(pk, None) for pk in queryset.values_list("id", flat=True)[:limit]]
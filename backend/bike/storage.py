@@ -0,0 +1,56 @@
+"""
+Content-addressed media storage, the default storage when MEDIA_CONTENT_ADDRESSED
+is enabled (see STORAGES in settings).
+
+An upload is stored as blobs/<h[:2]>/<h[2:4]>/<h><ext>, where h is the SHA-256
+of its bytes and ext the lowercased extension of the uploaded name. Saving
+content that is already stored writes nothing and returns the existing name,
+so a hero bike or avatar uploaded ten times is one file, and the two shard
+levels keep every directory small. Blobs never change, so anything under
+MEDIA_URL + "blobs/" can be served with `Cache-Control: public,
+max-age=31536000, immutable`.
+
+It is a FileSystemStorage otherwise: names stored before it was enabled keep
+working, and renditions (bike/renditions.py) keep their `<original>.<w>w.<ext>`
+names next to their blob, since they are derived from immutable content.
+"""
+import hashlib
+import os
+import posixpath
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+
+from . import renditions
+
+BLOB_ROOT = "blobs"
+
+
+def blob_name(digest, ext):
+    return posixpath.join(BLOB_ROOT, digest[:2], digest[2:4], f"{digest}{ext}")
+
+
+def content_digest(content):
+    sha = hashlib.sha256()
+    for chunk in content.chunks():
+        sha.update(chunk)
+    return sha.hexdigest()
+
+
+def is_blob(name):
+    return name.startswith(BLOB_ROOT + "/")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def _save(self, name, content):
+        if renditions.is_rendition(name):
+            return super()._save(name, content)
+        ext = os.path.splitext(name)[1].lower()
+        target = blob_name(content_digest(content), ext)
+        if self.exists(target):
+            return target
+        # write under a unique name, then move it into place: a concurrent save
+        # of the same bytes may win the rename, which is harmless
+        temp = super()._save(f"{target}.{uuid.uuid4().hex}.part", content)
+        os.replace(self.path(temp), self.path(target))
+        return target
@@ -0,0 +1,169 @@
+"""
+In-memory prefix index for the buy page typeahead (/api/buybikes/suggest/).
+
+Brand, model, variant, location and title values of the BuyBike rows are kept
+as sorted arrays of normalized keys, one key per word start, so "cla" finds
+"Royal Enfield Classic 350". A prefix lookup is two bisects over the keys plus
+a sort of the matching entries. Every suggestion carries the number of bikes
+it leads to, so only locations that have listings are suggested (their names
+come through the bikes' location join); the same goes for catalog options.
+
+Each process keeps its own index. It refreshes incrementally from `updated_at`
+as soon as the catalog version changes (or every SUGGEST_REFRESH_SECONDS) and
+reloads fully when rows disappear; location / catalog option renames touch
+`updated_at` of their bikes, so they are picked up as well. Like the
+inventory index, each refresh re-reads the rows updated within
+WATERMARK_OVERLAP of its watermark, so a transaction that commits late with
+an older `updated_at` is not missed. Results are cached per prefix until the
+next refresh.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from .cache import catalog_version
+from .inventory import WATERMARK_OVERLAP
+
+KINDS = ["brand", "model", "variant", "location", "title"]
+KIND_FIELDS = {
+    "brand": "brand__name",
+    "model": "bike_model__name",
+    "variant": "bike_variant__name",
+    "location": "location__name",
+    "title": "title",
+}
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+RESULT_CACHE_SIZE = 2048
+
+
+def normalize(value):
+    return " ".join(WORD_RE.findall((value or "").lower()))
+
+
+def word_keys(label):
+    """Every word-start suffix of the normalized label."""
+    words = normalize(label).split(" ")
+    return {" ".join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+class SuggestIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys = []          # sorted (key, kind, label) triples
+        self.counts = Counter()  # (kind, label) -> number of bikes
+        self.bike_terms = {}    # bike id -> set of (kind, label)
+        self.watermark = None
+        self.version = None
+        self.checked_at = 0.0
+        self.results = OrderedDict()
+
+    # ---- loading -----------------------------------------------------------
+
+    def _fetch(self, queryset):
+        fields = ["id", "updated_at", *KIND_FIELDS.values()]
+        return list(queryset.order_by().values_list(*fields))
+
+    def _terms(self, row):
+        return {(kind, value.strip()) for kind, value in zip(KINDS, row[2:]) if value and value.strip()}
+
+    def _add_terms(self, terms):
+        for term in terms:
+            if term not in self.counts:
+                kind, label = term
+                for key in word_keys(label):
+                    insort(self.keys, (key, kind, label))
+            self.counts[term] += 1
+
+    def _remove_terms(self, terms):
+        # keys of terms that drop to zero stay in place and are skipped on lookup
+        for term in terms:
+            self.counts[term] -= 1
+
+    def _reload(self, model):
+        rows = self._fetch(model.objects.all())
+        self.bike_terms = {row[0]: self._terms(row) for row in rows}
+        self.counts = Counter(term for terms in self.bike_terms.values() for term in terms)
+        self.keys = sorted(
+            (key, kind, label) for kind, label in self.counts for key in word_keys(label)
+        )
+        self.watermark = max((row[1] for row in rows), default=None)
+
+    def _merge(self, model):
+        # re-merging a row it has already seen is a no-op
+        rows = self._fetch(model.objects.filter(updated_at__gte=self.watermark - WATERMARK_OVERLAP))
+        for row in rows:
+            self._remove_terms(self.bike_terms.get(row[0], ()))
+            terms = self.bike_terms[row[0]] = self._terms(row)
+            self._add_terms(terms)
+        self.watermark = max([self.watermark, *(row[1] for row in rows)])
+
+    def refresh(self, model, force=False):
+        interval = getattr(settings, "SUGGEST_REFRESH_SECONDS", 5)
+        version = catalog_version()
+        fresh = time.monotonic() - self.checked_at < interval and version == self.version
+        if fresh and not force:
+            return
+        with self.lock:
+            total = model.objects.count()
+            if self.watermark is not None:
+                self._merge(model)
+            if self.watermark is None or total != len(self.bike_terms):
+                # first load, or rows were deleted (or bulk-written without updated_at)
+                self._reload(model)
+            self.results.clear()
+            self.checked_at = time.monotonic()
+            self.version = version
+
+    # ---- querying ----------------------------------------------------------
+
+    def lookup(self, prefix, limit=DEFAULT_LIMIT):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self.lock:
+            return self._lookup(prefix, limit)
+
+    def _lookup(self, prefix, limit):
+        cache_key = (prefix, limit)
+        if cache_key in self.results:
+            self.results.move_to_end(cache_key)
+            return self.results[cache_key]
+
+        start = bisect_left(self.keys, (prefix,))
+        end = bisect_left(self.keys, (prefix + "\uffff",))
+        matches = {}
+        for key, kind, label in self.keys[start:end]:
+            count = self.counts[(kind, label)]
+            if count > 0:
+                # a match on the first word ranks above a match inside the label
+                whole = normalize(label).startswith(prefix)
+                matches[(kind, label)] = max(matches.get((kind, label), False), whole)
+        ranked = sorted(
+            matches.items(),
+            key=lambda item: (not item[1], KINDS.index(item[0][0]), -self.counts[item[0]], item[0][1].lower()),
+        )
+        results = [
+            {"kind": kind, "value": label, "count": self.counts[(kind, label)]}
+            for (kind, label), _ in ranked[:limit]
+        ]
+
+        self.results[cache_key] = results
+        if len(self.results) > RESULT_CACHE_SIZE:
+            self.results.popitem(last=False)
+        return results
+
+
+_index = SuggestIndex()
+
+
+def suggest(prefix, limit=DEFAULT_LIMIT):
+    from .models import BuyBike
+
+    _index.refresh(BuyBike)
+    return _index.lookup(prefix, limit)
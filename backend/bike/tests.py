@@ -1,3 +1,1755 @@
-from django.test import TestCase
+import csv
+import hashlib
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from . import bookings, export, inventory, jobs, media, renditions, search, suggest
+from .cache import bump_catalog_version, catalog_version, response_stats
+from .importer import BikeImporter, read_records
+from .serializers import BuyBikeCardSerializer
+from .models import (
+    FAQ, AboutSection1, AboutSection2, AboutSection3, AboutSection3Image, AboutSectionOne, AuthImage, BikeImage,
+    BikeModel, Booking, Brand, BuyBike, Category, ContactConfig, HeroBikeImage, HeroSection, HomepageBanner,
+    HowItWorks, IdempotencyKey, ImageJob, InfoSection, LastSection, LastSectionImage, Location, SellBikePage,
+    StatItem, SupportFeature, Testimonial, TestimonialsSection, TrustedSection,
+)
+
+
+# content addressing is opt-in (MEDIA_CONTENT_ADDRESSED); tests that rely on it turn it on
+content_addressed = override_settings(
+    STORAGES={**settings.STORAGES, "default": {"BACKEND": "bike.storage.ContentAddressedStorage"}},
+)
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # with seq scans disabled a remaining Seq Scan means no index applies
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql)
+        else:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+class BuyBikeQueryPlanTests(TestCase):
+    """
+    EXPLAINs every query BuyBikeList issues for each supported BikeFilter
+    range filter / ordering combination (page-number and cursor modes) and
+    fails if any of them falls back to a full scan of the buybike table.
+    """
+    FILTERS = {
+        "none": {},
+        "price": {"price_min": 50000, "price_max": 150000},
+        "year": {"year_min": 2015, "year_max": 2022},
+        "km": {"km_max": 30000},
+        "engine_cc": {"engine_cc_min": 100, "engine_cc_max": 400},
+        "available": {"available": "true"},
+        "available_price": {"available": "true", "price_min": 50000},
+        "brand": {"brand": "honda,Bajaj"},
+    }
+    ORDERINGS = ["-created_at", "created_at", "price", "-price", "kilometers", "-kilometers", "year", "-year"]
+
+    @classmethod
+    def setUpTestData(cls):
+        location = Location.objects.create(name="Chennai")
+        brands = [Brand.objects.resolve(name) for name in ("Honda", "Bajaj", "TVS")]
+        for i in range(30):
+            BuyBike.objects.create(
+                title=f"Bike {i}", price=40000 + i * 5000, location=location, brand=brands[i % 3],
+                year=2012 + i % 12 if i % 5 else None,
+                kilometers=1000 * i if i % 4 else None,
+                engine_cc=100 + 10 * i, is_booked=i % 3 == 0,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def explain(self, sql):
+        return explain(sql)
+
+    def assertNoTableScan(self, plan, label):
+        if connection.vendor == "postgresql":
+            scan = re.search(r"Seq Scan on buybike\b", plan)
+        else:
+            scan = re.search(r"\bSCAN buybike\b(?! USING)", plan)
+        self.assertIsNone(scan, f"{label} regressed to a table scan:\n{plan}")
+
+    def buybike_queries(self, params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/api/buybikes/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        queries = [q["sql"] for q in ctx.captured_queries if 'FROM "buybike"' in q["sql"]]
+        self.assertTrue(queries)
+        return response, queries
+
+    def test_filter_and_ordering_combinations_use_indexes(self):
+        for (name, filters), ordering in itertools.product(self.FILTERS.items(), self.ORDERINGS):
+            modes = {
+                "page": {**filters, "ordering": ordering},
+                "cursor": {**filters, "ordering": ordering, "pagination": "cursor", "page_size": 4},
+            }
+            for mode, params in modes.items():
+                response, queries = self.buybike_queries(params)
+                if mode == "cursor" and response.data["next"]:
+                    # also cover the seek predicate used by the following page
+                    cursor = parse_qs(urlparse(response.data["next"]).query)["cursor"][0]
+                    _, more = self.buybike_queries({**params, "cursor": cursor})
+                    queries += more
+                for sql in queries:
+                    label = f"filter={name} ordering={ordering} mode={mode}"
+                    with self.subTest(label):
+                        self.assertNoTableScan(self.explain(sql), label)
+
+
+class EndpointQueryBudgetTests(TestCase):
+    """
+    Every route in bike/urls.py has a fixed query budget. Each endpoint is
+    measured with a small and a large catalog: the count must stay within
+    the budget and must not grow with the number of rows (no N+1).
+    """
+    # url name -> (method, url kwargs, payload factory, max queries)
+    BUDGETS = {
+        "hero-section": ("get", None, None, 3),
+        "info-section": ("get", None, None, 2),
+        "support-features": ("get", None, None, 2),
+        "homepage-banner": ("get", None, None, 2),
+        "buybike-list": ("get", None, None, 2),
+        "buybike-facets": ("get", None, None, 1),
+        "buybike-suggest": ("get", None, None, 2),
+        "buybike-export": ("get", None, None, 2),
+        "buybike-detail": ("get", "bike", None, 2),
+        "buybike-similar": ("get", "bike", None, 4),
+        # SELECT bike, conditional UPDATE, INSERT + the transaction's savepoint/release
+        "booking-create": ("post", None, "booking_payload", 5),
+        "booking-detail": ("get", "booking", None, 1),
+        # page keys from the covering index, then the page's rows by pk
+        "booking-mine": ("get", None, None, 2),
+        "booking-confirm": ("post", "booking", None, 2),
+        "pricing-quote": ("get", None, "quote_params", 1),
+        "last-section-latest": ("get", None, None, 2),
+        "testimonials": ("get", None, None, 2),
+        "trusted-section": ("get", None, None, 1),
+        "faq-list": ("get", None, None, 2),
+        "contact-config": ("get", None, None, 1),
+        "contact-submit": ("post", None, "contact_payload", 4),
+        "api-register": ("post", None, "register_payload", 3),
+        "api-login": ("post", None, "login_payload", 9),
+        "api-logout": ("post", None, None, 2),
+        "api-auth-image": ("get", None, None, 1),
+        "about-section1": ("get", None, None, 1),
+        "api-about": ("get", None, None, 4),
+        "sellbike-page": ("get", None, None, 5),
+    }
+
+    def setUp(self):
+        from django.core.cache import caches
+
+        for cache in caches.all():
+            cache.clear()
+        # per-process indexes would otherwise outlive the rolled-back test data
+        inventory._index = inventory.InventoryIndex()
+        suggest._index = suggest.SuggestIndex()
+        self.client = APIClient()
+        self.counter = 0
+        self.user = User.objects.create_user("rider", "rider@example.com", "secret-pass-123")
+        # booking-confirm requires an authenticated user for POST
+        self.client.force_authenticate(self.user)
+
+    def seed(self, rows):
+        """Creates `rows` child records for every list/nested endpoint."""
+        location = Location.objects.create(name=f"City {self.counter}", image="locations/city.jpg")
+        hero = HeroSection.objects.create(title="Hero", trapezoid_image="hero/t.jpg")
+        last = LastSection.objects.create(heading="Steps")
+        banner = HomepageBanner.objects.create(title="Banner", logo="homepage/banner/logo.png")
+        section3 = AboutSection3.objects.first() or AboutSection3.objects.create(title="Approach")
+        page = SellBikePage.objects.first() or SellBikePage.objects.create(
+            top_banner_image="sellbike/top.jpg", top_banner_text="Sell", second_banner_image="sellbike/second.jpg",
+        )
+        if not AboutSection1.objects.exists():
+            AboutSection1.objects.create(image="about/section1/a.jpg")
+            AboutSection2.objects.create(background_image="about/section2/b.jpg")
+            AboutSectionOne.objects.create(heading="About", image="about/section1/c.jpg")
+            TestimonialsSection.objects.create()
+            TrustedSection.objects.create(image="trusted_section/t.jpg")
+            ContactConfig.objects.create(email="hello@example.com")
+            AuthImage.objects.create(image="auth_images/a.jpg")
+        for _ in range(rows):
+            self.counter += 1
+            bike = BuyBike.objects.create(
+                title=f"Bike {self.counter}", brand=Brand.objects.resolve("Honda"), price=50000 + self.counter,
+                location=location,
+                featured_image="buybikes/images/f.jpg", card_bg_image="buybikes/card_bg/c.jpg",
+            )
+            Booking.objects.create(buybike=bike, user=self.user, amount=bike.price)
+            BikeImage.objects.create(bike=bike, image="buybikes/variants/v.jpg", order=1)
+            BikeImage.objects.create(bike=bike, image="buybikes/variants/w.jpg", order=2)
+            HeroBikeImage.objects.create(hero_section=hero, image="hero/bike/b.jpg", order=self.counter)
+            LastSectionImage.objects.create(section=last, image="last_section/s.jpg", order_no=self.counter)
+            StatItem.objects.create(banner=banner, icon="homepage/stat_icons/i.png", value="1", caption="c")
+            AboutSection3Image.objects.create(section=section3, image="about/section3/i.jpg", order=self.counter)
+            HowItWorks.objects.create(page=page, title="Step", image="sellbike/step.jpg")
+            InfoSection.objects.create(bike_image="info_section/i.jpg", order=self.counter)
+            SupportFeature.objects.create(title="Support", image="support_features/s.jpg")
+            Testimonial.objects.create(name="Rider", quote="Great", image="testimonials/t.jpg")
+            FAQ.objects.create(question="Q?", answer="A")
+
+    def url_kwargs(self, kind):
+        if kind == "bike":
+            return {"pk": BuyBike.objects.first().pk}
+        if kind == "booking":
+            bike = BuyBike.objects.filter(is_booked=False).first()
+            return {"pk": Booking.objects.create(buybike=bike, amount=bike.price).pk}
+        return {}
+
+    def booking_payload(self):
+        return {"buybike": BuyBike.objects.filter(is_booked=False).first().pk, "fees": ["test_drive"]}
+
+    def quote_params(self):
+        return {"ids": ",".join(str(pk) for pk in BuyBike.objects.values_list("pk", flat=True)[:12])}
+
+    def contact_payload(self):
+        return {"name": "Rider", "email": "rider@example.com", "message": "Hi"}
+
+    def register_payload(self):
+        self.counter += 1
+        return {"username": f"new{self.counter}", "email": "new@example.com", "password": "another-pass-456"}
+
+    def login_payload(self):
+        return {"username": "rider", "password": "secret-pass-123"}
+
+    def measure(self, name):
+        method, kind, payload, _ = self.BUDGETS[name]
+        url = reverse(name, kwargs=self.url_kwargs(kind))
+        data = getattr(self, payload)() if payload else None
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, format="json")
+            # streamed bodies query while they are consumed
+            body = b"".join(response.streaming_content) if response.streaming else response.content
+        self.assertLess(response.status_code, 400, f"{name}: {body[:200]}")
+        return len(ctx)
+
+    def test_every_route_has_a_budget(self):
+        from . import urls
+
+        names = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(names - set(self.BUDGETS), set())
+
+    def test_query_count_is_bounded_and_independent_of_row_count(self):
+        self.seed(rows=2)
+        small = {name: self.measure(name) for name in self.BUDGETS}
+        self.seed(rows=15)
+        large = {name: self.measure(name) for name in self.BUDGETS}
+        for name, (_, _, _, budget) in self.BUDGETS.items():
+            with self.subTest(endpoint=name):
+                self.assertLessEqual(large[name], budget, f"{name} exceeded its query budget")
+                self.assertEqual(small[name], large[name], f"{name} query count grows with rows")
+
+
+class BookingContentionTests(TransactionTestCase):
+    """
+    Load test for the conditional-UPDATE claim in bike/bookings.py: many
+    threads POST /api/bookings/ for the same bikes at once, and every bike
+    must end up with exactly one Booking and one 201 (everyone else gets 409).
+    """
+    THREADS = 8
+    BIKES = 10
+
+    def test_concurrent_bookings_have_exactly_one_winner_per_bike(self):
+        bikes = [BuyBike.objects.create(title=f"Hot bike {i}", price=90000 + i) for i in range(self.BIKES)]
+        url = reverse("booking-create")
+        barrier = threading.Barrier(self.THREADS)
+        results = []  # (bike id, status code)
+        lock = threading.Lock()
+
+        def rider():
+            client = APIClient()
+            try:
+                barrier.wait()
+                for bike in bikes:
+                    response = client.post(url, {"buybike": bike.pk, "fees": ["test_drive"]}, format="json")
+                    with lock:
+                        results.append((bike.pk, response.status_code))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=rider) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), self.THREADS * self.BIKES)
+        for bike in bikes:
+            with self.subTest(bike=bike.pk):
+                codes = sorted(code for pk, code in results if pk == bike.pk)
+                self.assertEqual(codes, [201] + [409] * (self.THREADS - 1))
+                self.assertEqual(Booking.objects.filter(buybike=bike).count(), 1)
+        self.assertFalse(BuyBike.objects.filter(pk__in=[b.pk for b in bikes], is_booked=False).exists())
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.bike = BuyBike.objects.create(title="Retry bike", price=80000)
+        self.create_url = reverse("booking-create")
+
+    def book(self, key, **data):
+        payload = {"buybike": self.bike.pk, "fees": ["test_drive"], **data}
+        return self.client.post(self.create_url, payload, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retried_booking_replays_the_first_response_with_one_query(self):
+        first = self.book("checkout-1")
+        self.assertEqual(first.status_code, 201)
+        with CaptureQueriesContext(connection) as ctx:
+            retry = self.book("checkout-1")
+        self.assertEqual(len(ctx), 1)
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Booking.objects.count(), 1)
+        # without a key the same retry is a conflict
+        self.assertEqual(self.client.post(self.create_url, {"buybike": self.bike.pk}, format="json").status_code, 409)
+
+    def test_key_reused_for_a_different_request_is_rejected(self):
+        self.assertEqual(self.book("checkout-2").status_code, 201)
+        self.assertEqual(self.book("checkout-2", fees=[]).status_code, 422)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_failed_requests_are_not_stored_and_expired_keys_run_again(self):
+        self.bike.is_booked = True
+        self.bike.save()
+        self.assertEqual(self.book("checkout-3").status_code, 409)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        BuyBike.objects.filter(pk=self.bike.pk).update(is_booked=False)
+        self.assertEqual(self.book("checkout-3").status_code, 201)
+        IdempotencyKey.objects.update(expires_at=timezone.now())
+        BuyBike.objects.filter(pk=self.bike.pk).update(is_booked=False)
+        self.assertEqual(self.book("checkout-3").status_code, 201)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_retried_payment_confirmation_replays_instead_of_already_paid(self):
+        user = User.objects.create_user("payer", "payer@example.com", "secret-pass-123")
+        self.client.force_authenticate(user)
+        booking = Booking.objects.create(buybike=self.bike, user=user, amount=self.bike.price)
+        url = reverse("booking-confirm", kwargs={"pk": booking.pk})
+        responses = [self.client.post(url, {}, format="json", HTTP_IDEMPOTENCY_KEY="pay-1") for _ in range(2)]
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+        self.assertEqual(responses[1]["Idempotent-Replayed"], "true")
+        self.assertEqual(self.client.post(url, {}, format="json", HTTP_IDEMPOTENCY_KEY="pay-2").status_code, 400)
+
+
+class BookingHoldExpiryTests(TestCase):
+    def setUp(self):
+        self.bikes = [BuyBike.objects.create(title=f"Held bike {i}", price=60000 + i) for i in range(6)]
+        self.holds = [bookings.book(bike) for bike in self.bikes]
+        # four abandoned holds, one of them paid since; two fresh holds
+        Booking.objects.filter(pk__in=[b.pk for b in self.holds[:4]]).update(
+            created_at=timezone.now() - timedelta(minutes=settings.BOOKING_HOLD_MINUTES + 5),
+        )
+        Booking.objects.filter(pk=self.holds[3].pk).update(status="paid")
+
+    def test_expired_holds_release_their_bikes_in_batches(self):
+        stats = bookings.expire_holds(batch_size=2)
+        self.assertEqual((stats["expired"], stats["released"], stats["batches"]), (3, 3, 2))
+        self.assertEqual(
+            list(Booking.objects.order_by("pk").values_list("status", flat=True)),
+            ["expired"] * 3 + ["paid", "created", "created"],
+        )
+        self.assertEqual(
+            list(BuyBike.objects.order_by("pk").values_list("is_booked", flat=True)), [False] * 3 + [True] * 3,
+        )
+        self.assertEqual(bookings.expire_holds()["expired"], 0)
+
+    def test_sweep_reads_holds_through_the_status_created_index(self):
+        with CaptureQueriesContext(connection) as ctx:
+            bookings.expire_holds()
+        select = next(q["sql"] for q in ctx.captured_queries if q["sql"].startswith('SELECT "bike_booking"'))
+        self.assertIn("booking_status_created_idx", explain(select))
+
+    def test_expired_hold_cannot_be_paid(self):
+        bookings.expire_holds()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("late", "late@example.com", "secret-pass-123"))
+        response = client.post(reverse("booking-confirm", kwargs={"pk": self.holds[0].pk}), {}, format="json")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Booking.objects.get(pk=self.holds[0].pk).status, "expired")
+
+
+class PricingQuoteTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.bikes = [BuyBike.objects.create(title=f"Quoted bike {i}", price=price) for i, price in enumerate((85000, 101, 64999))]
+        self.url = reverse("pricing-quote")
+
+    def get_quotes(self, **params):
+        return self.client.get(self.url, {"ids": ",".join(str(b.pk) for b in self.bikes) + ",999999", **params})
+
+    def test_batch_quote_is_one_query_then_cached_until_the_price_changes(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get_quotes(fees="test_drive")
+        self.assertEqual(len(ctx), 1)
+        self.assertEqual(response.data["missing"], [999999])
+        first = response.data["quotes"][0]
+        self.assertEqual(
+            (first["price"], first["tax_total"], first["total"]), ("85000.00", "15300.00", "101300.00"),
+        )
+        self.assertEqual(first["fees"], [{"code": "test_drive", "amount": "1000.00"}])
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.get_quotes(fees="test_drive").data["quotes"][0], first)
+        self.assertEqual(len(ctx), 0)
+
+        self.bikes[0].price = 90000
+        self.bikes[0].save()
+        self.assertEqual(self.get_quotes().data["quotes"][0]["total"], "106200.00")
+
+    @override_settings(PRICING_TAX_RULES="cgst:0.0625,sgst:0.0625")
+    def test_taxes_round_half_up_exactly(self):
+        # 101 * 0.0625 = 6.3125 per tax; float rounding of such halves drifts, Decimal does not
+        quote = self.get_quotes().data["quotes"][1]
+        self.assertEqual([tax["amount"] for tax in quote["taxes"]], ["6.31", "6.31"])
+        self.assertEqual(quote["total"], "113.62")
+        booking = bookings.book(self.bikes[1], fees=["test_drive"])
+        self.assertEqual(
+            (booking.amount, booking.gst_amount, booking.test_drive_fee, booking.total_amount),
+            (Decimal("101.00"), Decimal("12.62"), Decimal("1000.00"), Decimal("1113.62")),
+        )
+
+    def test_bookings_charge_the_configured_fee_whatever_the_client_sends(self):
+        create = reverse("booking-create")
+        quoted = self.get_quotes(fees="test_drive").data["quotes"][0]
+        response = self.client.post(create, {"buybike": self.bikes[0].pk, "fees": ["test_drive"]}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["test_drive_fee"], response.data["total_amount"]), ("1000.00", quoted["total"]))
+        # legacy amount field: only a flag, the amount comes from PRICING_FEES
+        response = self.client.post(create, {"buybike": self.bikes[1].pk, "test_drive_fee": "1"}, format="json")
+        self.assertEqual(response.data["test_drive_fee"], "1000.00")
+        for payload in ({"test_drive_fee": "-500"}, {"fees": ["discount"]}):
+            with self.subTest(payload=payload):
+                response = self.client.post(create, {"buybike": self.bikes[2].pk, **payload}, format="json")
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Booking.objects.filter(buybike=self.bikes[2]).exists())
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get(self.url, {"ids": "1,x"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.get_quotes(fees="gift_wrap").status_code, 400)
+
+
+class MyBookingsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user("collector", "collector@example.com", "secret-pass-123")
+        other = User.objects.create_user("other", "other@example.com", "secret-pass-123")
+        location = Location.objects.create(name="Madurai")
+        bike = BuyBike.objects.create(title="History bike", price=70000, location=location)
+        Booking.objects.bulk_create([Booking(buybike=bike, user=self.user, amount=bike.price) for _ in range(7)])
+        Booking.objects.bulk_create([Booking(buybike=bike, user=other, amount=bike.price) for _ in range(3)])
+        # equal timestamps: the id tiebreaker must still give every booking exactly once
+        Booking.objects.filter(pk__in=Booking.objects.filter(user=self.user).values("pk")[:3]).update(
+            created_at=timezone.now() - timedelta(days=1),
+        )
+        self.url = reverse("booking-mine")
+
+    def test_keyset_pages_list_only_the_users_bookings_newest_first(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_authenticate(self.user)
+        seen, url = [], self.url + "?page_size=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += response.data["results"]
+            url = response.data["next"]
+        expected = list(Booking.objects.filter(user=self.user).order_by("-created_at", "-id").values_list("pk", flat=True))
+        self.assertEqual([row["id"] for row in seen], expected)
+        self.assertEqual(seen[0]["buybike_obj"]["location"], "Madurai")
+
+    def test_page_keys_come_from_the_user_created_index_alone(self):
+        self.client.force_authenticate(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {"page_size": 3})
+            self.client.get(response.data["next"])
+        seeks = [q["sql"] for q in ctx.captured_queries if "ORDER BY" in q["sql"] and 'FROM "bike_booking"' in q["sql"]]
+        self.assertEqual(len(seeks), 2)
+        for sql in seeks:
+            plan = explain(sql)
+            self.assertIn("booking_user_created_idx", plan)
+            if connection.vendor == "sqlite":
+                self.assertIn("COVERING INDEX", plan)
+
+
+class MigrationTestMixin:
+    def migrate(self, targets):
+        from django.db.migrations.executor import MigrationExecutor
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        from django.db.migrations.loader import MigrationLoader
+
+        self.migrate(MigrationLoader(connection).graph.leaf_nodes())
+
+
+class FoldCatalogStringsMigrationTests(MigrationTestMixin, TransactionTestCase):
+    """Migration 0033: free-text BuyBike columns -> lookup rows."""
+    before = [("bike", "0032_catalog_lookups")]
+    after = [("bike", "0033_fold_catalog_strings")]
+
+    def test_spelling_variants_fold_into_one_option(self):
+        old = self.migrate(self.before)
+        OldBuyBike = old.get_model("bike", "BuyBike")
+        first = OldBuyBike.objects.create(
+            title="A", price=1, brand="  Royal   Enfield ", bike_model="Classic 350", category="EV (Electric Vehicle)",
+            color="Red",
+        )
+        second = OldBuyBike.objects.create(title="B", price=2, brand="ROYAL ENFIELD", bike_model="classic 350", color="")
+        old.get_model("bike", "SellBikePage").objects.create(
+            top_banner_image="s.jpg", top_banner_text="Sell", second_banner_image="t.jpg", brand_options="Yamaha, royal enfield",
+        )
+
+        new = self.migrate(self.after)
+        Brand = new.get_model("bike", "Brand")
+        NewBuyBike = new.get_model("bike", "BuyBike")
+        self.assertEqual(sorted(Brand.objects.values_list("name", flat=True)), ["Royal Enfield", "Yamaha"])
+        self.assertEqual(new.get_model("bike", "BikeModel").objects.get().name, "Classic 350")
+        first, second = NewBuyBike.objects.get(pk=first.pk), NewBuyBike.objects.get(pk=second.pk)
+        self.assertEqual(first.brand_ref_id, second.brand_ref_id)
+        self.assertEqual(first.bike_model_ref_id, second.bike_model_ref_id)
+        self.assertEqual(first.bike_model_ref.brand_id, first.brand_ref_id)
+        self.assertEqual(first.category_ref.name, "EV (Electric Vehicle)")
+        self.assertIsNone(second.category_ref_id)
+        self.assertIsNone(second.color_ref_id)
+
+
+class CopyVariantImagesMigrationTests(MigrationTestMixin, TransactionTestCase):
+    """Migration 0038: variant_image1..5 -> ordered BikeImage rows, and back."""
+    before = [("bike", "0037_bikeimage")]
+    after = [("bike", "0038_copy_variant_images")]
+
+    def test_variant_columns_become_an_ordered_gallery_and_back(self):
+        old = self.migrate(self.before)
+        OldBuyBike = old.get_model("bike", "BuyBike")
+        bike = OldBuyBike.objects.create(title="A", price=1, variant_image1="v/1.jpg", variant_image3="v/3.jpg")
+        bare = OldBuyBike.objects.create(title="B", price=2)
+
+        new = self.migrate(self.after)
+        NewBikeImage = new.get_model("bike", "BikeImage")
+        self.assertEqual(
+            list(NewBikeImage.objects.filter(bike_id=bike.pk).order_by("order").values_list("order", "image")),
+            [(1, "v/1.jpg"), (3, "v/3.jpg")],
+        )
+        self.assertFalse(NewBikeImage.objects.filter(bike_id=bare.pk).exists())
+
+        NewBikeImage.objects.create(bike_id=bike.pk, image="v/0.jpg", order=0)
+        old = self.migrate(self.before)
+        columns = ["variant_image1", "variant_image2", "variant_image3", "variant_image4", "variant_image5"]
+        self.assertEqual(
+            list(old.get_model("bike", "BuyBike").objects.filter(pk=bike.pk).values_list(*columns).get()),
+            ["v/0.jpg", "v/1.jpg", "v/3.jpg", "", ""],
+        )
+
+
+class CatalogOptionFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ev = Category.objects.resolve("EV (Electric Vehicle)")
+        scooty = Category.objects.resolve("Scooty")
+        cls.enfield = BuyBike.objects.create(title="Bullet", price=1, brand=Brand.objects.resolve("Royal Enfield"), category=scooty)
+        cls.ather = BuyBike.objects.create(title="450X", price=2, brand=Brand.objects.resolve("Ather"), category=ev)
+        cls.tvs = BuyBike.objects.create(title="iQube", price=3, brand=Brand.objects.resolve("TVS"), category=ev)
+        cls.tvs_copy = BuyBike.objects.create(title="Jupiter", price=4, brand=Brand.objects.resolve("TVS Motor"), category=scooty)
+
+    def ids(self, **params):
+        response = APIClient().get("/api/buybikes/", {**params, "page_size": 50})
+        self.assertEqual(response.status_code, 200)
+        return sorted(row["id"] for row in response.data["results"])
+
+    def test_partial_names_match_like_the_old_icontains_filter(self):
+        self.assertEqual(self.ids(category="EV"), sorted([self.ather.pk, self.tvs.pk]))
+        self.assertEqual(self.ids(brand="royal"), [self.enfield.pk])
+
+    def test_a_full_name_matches_only_that_option(self):
+        self.assertEqual(self.ids(brand="tvs"), [self.tvs.pk])
+        self.assertEqual(self.ids(brand="TVS Motor"), [self.tvs_copy.pk])
+
+    def test_ids_and_names_combine(self):
+        self.assertEqual(self.ids(brand=f"{self.ather.brand_id},royal"), sorted([self.enfield.pk, self.ather.pk]))
+        self.assertEqual(self.ids(brand="Yamaha"), [])
+
+
+@override_settings(CATALOG_RESPONSE_CACHE_ENABLED=False)
+class CursorPaginationTests(TestCase):
+    ORDERINGS = ["-created_at", "created_at", "price", "-price", "year", "-year", "kilometers", "-kilometers"]
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(23):
+            BuyBike.objects.create(
+                title=f"Bike {i}", price=40000 + (i % 4) * 10000,  # ties
+                year=None if i % 3 == 0 else 2015 + i % 2,
+                kilometers=None if i % 2 else i * 1000,
+            )
+        BuyBike.objects.filter(pk__in=BuyBike.objects.values("pk")[:8]).update(created_at=timezone.now())
+
+    def expected(self, ordering):
+        field = ordering.lstrip("-")
+        rows = list(BuyBike.objects.values_list("id", field))
+        # NULLs last in both directions, id breaks ties in the field's direction
+        present = sorted((row for row in rows if row[1] is not None), key=lambda row: (row[1], row[0]))
+        nulls = sorted(row for row in rows if row[1] is None)
+        if ordering.startswith("-"):
+            present.reverse()
+            nulls.reverse()
+        return [pk for pk, _ in present + nulls]
+
+    def walk(self, url, params=None, direction="next"):
+        pages = []
+        while url:
+            response = APIClient().get(url, params)
+            self.assertEqual(response.status_code, 200)
+            pages.append([row["id"] for row in response.data["results"]])
+            url, params = response.data[direction], None
+            last = response.data
+        return pages, last
+
+    def test_pages_walk_forward_and_back_through_nulls_and_ties(self):
+        for ordering in self.ORDERINGS:
+            with self.subTest(ordering=ordering):
+                forward, last = self.walk("/api/buybikes/", {"pagination": "cursor", "page_size": 4, "ordering": ordering})
+                self.assertEqual([pk for page in forward for pk in page], self.expected(ordering))
+                self.assertEqual([len(page) for page in forward], [4] * 5 + [3])
+                self.assertIsNone(last["next"])
+
+                backward, first = self.walk(last["previous"], direction="previous")
+                self.assertEqual(backward[::-1], forward[:-1])
+                self.assertIsNone(first["previous"])
+
+    def test_a_tampered_cursor_is_a_404(self):
+        response = APIClient().get("/api/buybikes/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CATALOG_RESPONSE_CACHE_ENABLED=False)
+class FullTextSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        enfield = Brand.objects.resolve("Royal Enfield")
+        cls.classic = BuyBike.objects.create(title="Classic 350", price=1, brand=enfield)
+        cls.mention = BuyBike.objects.create(title="Splendor", price=2, description="Rides like a classic")
+        cls.hunter = BuyBike.objects.create(
+            title="Hunter", price=3, brand=enfield, location=Location.objects.create(name="Chennai"),
+        )
+
+    def search(self, value, **params):
+        response = APIClient().get("/api/buybikes/", {"search": value, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_terms_match_word_prefixes_and_all_must_match(self):
+        self.assertEqual(sorted(self.search("roy enf")), [self.classic.pk, self.hunter.pk])
+        self.assertEqual(self.search("royal chen"), [self.hunter.pk])
+        self.assertEqual(self.search("royal mumbai"), [])
+
+    def test_results_are_ranked_title_first_unless_ordered(self):
+        self.assertEqual(self.search("classic"), [self.classic.pk, self.mention.pk])
+        self.assertEqual(self.search("classic", ordering="-price"), [self.mention.pk, self.classic.pk])
+
+    def test_the_index_follows_renames_and_deletes(self):
+        brand = self.classic.brand
+        brand.name = "Enfield Motors"
+        brand.save()
+        self.assertEqual(sorted(self.search("motors")), [self.classic.pk, self.hunter.pk])
+        self.hunter.location.name = "Madurai"
+        self.hunter.location.save()
+        self.assertEqual(self.search("madurai"), [self.hunter.pk])
+        self.hunter.delete()
+        self.assertEqual(self.search("motors"), [self.classic.pk])
+
+    def test_query_syntax_is_treated_as_text(self):
+        for value in ['"', "classic*", "NOT classic", "a OR b", "(350)", "title:classic"]:
+            with self.subTest(value=value):
+                self.search(value)
+        self.assertEqual(self.search("CLASSIC*"), self.search("classic"))
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        caches["catalog"].clear()
+        honda, bajaj = Brand.objects.resolve("Honda"), Brand.objects.resolve("Bajaj")
+        ev = Category.objects.resolve("EV (Electric Vehicle)")
+        rows = [
+            # brand, category, price, year, owners, transmission, booked
+            (honda, ev, 45000, 2008, "1st Owner", "auto", False),
+            (honda, None, 75000, 2016, "1st Owner", "manual", False),
+            (honda, None, 120000, None, "2nd Owner", None, True),
+            (bajaj, ev, 600000, 2021, None, "manual", False),
+        ]
+        for i, (brand, category, price, year, owners, transmission, booked) in enumerate(rows):
+            BuyBike.objects.create(
+                title=f"Bike {i}", brand=brand, category=category, price=price, year=year,
+                owners=owners, transmission=transmission, is_booked=booked,
+            )
+        self.honda, self.bajaj, self.ev = honda, bajaj, ev
+
+    def facets(self, **params):
+        response = APIClient().get("/api/buybikes/facets/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def counts(self, buckets):
+        return [bucket["count"] for bucket in buckets]
+
+    def test_counts_cover_every_facet_of_the_selection(self):
+        data = self.facets()
+        self.assertEqual(data["count"], 4)
+        facets = data["facets"]
+        self.assertEqual(facets["brand"], [
+            {"id": self.honda.pk, "value": "Honda", "count": 3}, {"id": self.bajaj.pk, "value": "Bajaj", "count": 1},
+        ])
+        self.assertEqual(facets["category"], [{"id": self.ev.pk, "value": "EV (Electric Vehicle)", "count": 2}])
+        self.assertEqual(facets["owners"], [{"value": "1st Owner", "count": 2}, {"value": "2nd Owner", "count": 1}])
+        self.assertEqual(facets["transmission"], [{"value": "manual", "count": 2}, {"value": "auto", "count": 1}])
+        self.assertEqual(self.counts(facets["price"]), [1, 1, 1, 0, 1])
+        self.assertEqual(self.counts(facets["year"]), [1, 0, 1, 1])  # the NULL year is in no bucket
+
+    def test_filters_narrow_the_counts(self):
+        data = self.facets(available="true", brand="honda")
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(self.counts(data["facets"]["price"]), [1, 1, 0, 0, 0])
+        self.assertEqual(self.facets(price_min=500000)["facets"]["brand"][0]["value"], "Bajaj")
+
+    def test_cached_counts_follow_catalog_changes(self):
+        self.assertEqual(self.facets()["count"], 4)
+        BuyBike.objects.create(title="New", price=1, brand=self.bajaj)
+        data = self.facets()
+        self.assertEqual(data["count"], 5)
+        self.assertEqual(data["facets"]["brand"][1], {"id": self.bajaj.pk, "value": "Bajaj", "count": 2})
+
+    def test_invalid_filters_are_a_400(self):
+        self.assertEqual(APIClient().get("/api/buybikes/facets/", {"price_min": "cheap"}).status_code, 400)
+
+
+@override_settings(CATALOG_RESPONSE_CACHE_ENABLED=False)
+class ListingCardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.bike = BuyBike.objects.create(
+            title="Classic 350", price=150000, description="A long description " * 50, year=2019,
+            brand=Brand.objects.resolve("Royal Enfield"), location=Location.objects.create(name="Chennai"),
+            featured_image="buybikes/images/f.jpg", owner="1st Owner",
+        )
+
+    def test_listing_rows_are_cards_with_only_the_card_columns_loaded(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = APIClient().get("/api/buybikes/")
+        row = response.data["results"][0]
+        self.assertEqual(list(row), BuyBikeCardSerializer.Meta.fields)
+        self.assertFalse(any("description" in query["sql"] for query in ctx))
+
+    def test_cards_agree_with_the_detail_payload(self):
+        card = APIClient().get("/api/buybikes/").data["results"][0]
+        detail = APIClient().get(f"/api/buybikes/{self.bike.pk}/").data
+        self.assertEqual(detail["description"], self.bike.description)
+        for field in card:
+            with self.subTest(field=field):
+                self.assertEqual(card[field], detail[field])
+
+
+@override_settings(CATALOG_RESPONSE_CACHE_ENABLED=False)
+class MediaURLTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(3):
+            BuyBike.objects.create(title=f"Bike {i}", price=1, featured_image="buybikes/images/shared.jpg")
+
+    def urls(self, **extra):
+        response = APIClient().get("/api/buybikes/", **extra)
+        return [(row["featured_image_url"], row["card_bg_image_url"]) for row in response.data["results"]]
+
+    def test_urls_are_absolute_for_the_request_scheme_and_host(self):
+        self.assertEqual(self.urls()[0], ("http://testserver/media/buybikes/images/shared.jpg", None))
+        self.assertEqual(
+            self.urls(secure=True, HTTP_HOST="bikes.example.com")[0][0],
+            "https://bikes.example.com/media/buybikes/images/shared.jpg",
+        )
+
+    def test_a_cdn_origin_replaces_the_request_host(self):
+        with self.settings(MEDIA_CDN_URL="https://cdn.example.com/"):
+            self.assertEqual(self.urls()[0][0], "https://cdn.example.com/media/buybikes/images/shared.jpg")
+
+    def test_storage_urls_are_resolved_once_per_name(self):
+        media.storage_url.cache_clear()
+        self.urls()
+        info = media.storage_url.cache_info()
+        # featured_image and featured_image_url of three rows, one storage lookup
+        self.assertEqual((info.misses, info.hits), (1, 5))
+
+    def test_absolute_storage_urls_are_kept(self):
+        storage = mock.Mock()
+        storage.url.return_value = "https://bucket.s3.amazonaws.com/bike.jpg"
+        resolver = media.MediaURLResolver()
+        self.assertEqual(resolver.name_url(storage, "bike.jpg"), "https://bucket.s3.amazonaws.com/bike.jpg")
+
+
+class SuggestTests(TestCase):
+    def setUp(self):
+        suggest._index = suggest.SuggestIndex()
+        honda = Brand.objects.resolve("Honda")
+        hosur = Location.objects.create(name="Hosur")
+        shine = BikeModel.objects.resolve("Shine", brand=honda)
+        self.shine = BuyBike.objects.create(title="Honda Shine 125", price=1, brand=honda, bike_model=shine, location=hosur)
+        self.splendor = BuyBike.objects.create(title="Hero Honda Splendor", price=2, brand=honda)
+
+    def results(self, q, **params):
+        response = APIClient().get("/api/buybikes/suggest/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(row["kind"], row["value"], row["count"]) for row in response.data["results"]]
+
+    def test_word_start_matches_rank_label_starts_first_then_by_kind(self):
+        self.assertEqual(self.results("HO"), [
+            ("brand", "Honda", 2), ("location", "Hosur", 1), ("title", "Honda Shine 125", 1),
+            ("title", "Hero Honda Splendor", 1),
+        ])
+        self.assertEqual(self.results("shi"), [("model", "Shine", 1), ("title", "Honda Shine 125", 1)])
+        self.assertEqual(self.results("onda"), [])  # not a word start
+
+    def test_limit_and_blank_queries(self):
+        self.assertEqual(len(self.results("ho", limit=1)), 1)
+        self.assertEqual(self.results("  ", limit=1), [])
+        self.assertEqual(APIClient().get("/api/buybikes/suggest/", {"q": "ho", "limit": "many"}).status_code, 400)
+
+    def test_edits_show_up_on_the_next_request(self):
+        self.assertEqual(self.results("ho")[0], ("brand", "Honda", 2))
+        self.splendor.title = "Splendor Plus"
+        self.splendor.save()
+        self.assertEqual(self.results("splendor"), [("title", "Splendor Plus", 1)])
+        self.shine.delete()
+        self.assertEqual(self.results("ho"), [("brand", "Honda", 1)])
+
+    def test_only_locations_with_listings_are_suggested(self):
+        Location.objects.create(name="Hospet")
+        self.assertEqual([row for row in self.results("hos") if row[0] == "location"], [("location", "Hosur", 1)])
+        self.shine.delete()
+        self.assertEqual(self.results("hos"), [])
+
+
+@override_settings(CATALOG_RESPONSE_CACHE_ENABLED=False)
+class SimilarBikesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        honda, bajaj, ktm = (Brand.objects.resolve(name) for name in ("Honda", "Bajaj", "KTM"))
+        commuter, sports = Category.objects.resolve("Commuter"), Category.objects.resolve("Sports")
+
+        def bike(title, brand, category, price, year, kilometers, engine_cc, **extra):
+            return BuyBike.objects.create(
+                title=title, brand=brand, category=category, price=price, year=year,
+                kilometers=kilometers, engine_cc=engine_cc, **extra,
+            )
+
+        cls.target = bike("Shine", honda, commuter, 80000, 2019, 10000, 125)
+        cls.twin = bike("Shine SP", honda, commuter, 82000, 2019, 12000, 125)
+        cls.cousin = bike("Platina", bajaj, commuter, 85000, 2018, 15000, 110)
+        cls.far = bike("Duke 990", ktm, sports, 900000, 2005, 90000, 990)
+        cls.booked = bike("Shine (sold)", honda, commuter, 80000, 2019, 10000, 125, is_booked=True)
+
+    def setUp(self):
+        inventory._index = inventory.InventoryIndex()
+
+    def similar(self, bike, **params):
+        response = APIClient().get(f"/api/buybikes/{bike.pk}/similar/", params)
+        self.assertEqual(response.status_code, 200)
+        return [(row["id"], row["score"]) for row in response.data["results"]]
+
+    def test_closest_unbooked_bikes_rank_first(self):
+        ranked = self.similar(self.target)
+        self.assertEqual([pk for pk, _ in ranked], [self.twin.pk, self.cousin.pk, self.far.pk])
+        scores = [score for _, score in ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertGreater(scores[0], 2.5)  # brand + category match on top of the numeric closeness
+        self.assertLess(scores[-1], 1.0)
+        self.assertEqual(self.similar(self.target, limit=1), ranked[:1])
+
+    def test_a_bike_booked_since_the_last_request_drops_out(self):
+        self.assertEqual(self.similar(self.target)[0][0], self.twin.pk)
+        self.twin.is_booked = True
+        self.twin.save()
+        self.assertEqual([pk for pk, _ in self.similar(self.target)], [self.cousin.pk, self.far.pk])
+
+    def test_without_numpy_same_brand_or_category_closest_in_price(self):
+        with mock.patch("bike.similar.np", None):
+            self.assertEqual(self.similar(self.target), [(self.twin.pk, None), (self.cousin.pk, None)])
+
+    def test_unknown_bikes_and_bad_limits(self):
+        self.assertEqual(APIClient().get("/api/buybikes/999999/similar/").status_code, 404)
+        self.assertEqual(APIClient().get(f"/api/buybikes/{self.target.pk}/similar/", {"limit": "x"}).status_code, 400)
+
+
+@override_settings(CATALOG_RESPONSE_CACHE_ENABLED=False)
+class GalleryTests(TestCase):
+    def setUp(self):
+        self.bike = BuyBike.objects.create(title="Bike", price=1)
+        for order, name in [(2, "b"), (1, "a"), (2, "c"), (0, "first")]:
+            BikeImage.objects.create(bike=self.bike, image=f"buybikes/variants/{name}.jpg", order=order)
+
+    def detail(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return APIClient().get(f"/api/buybikes/{self.bike.pk}/", **headers)
+
+    def test_gallery_is_served_by_order_then_upload(self):
+        data = self.detail().data
+        names = ["first", "a", "b", "c"]
+        self.assertEqual([image["image_url"].rsplit("/", 1)[1] for image in data["images"]], [f"{n}.jpg" for n in names])
+        self.assertEqual(data["gallery_urls"], [image["image_url"] for image in data["images"]])
+
+    def test_gallery_edits_invalidate_the_bike(self):
+        etag = self.detail()["ETag"]
+        image = self.bike.images.get(image="buybikes/variants/c.jpg")
+        image.order = 0
+        image.save()
+        response = self.detail(etag)
+        self.assertEqual(response.status_code, 200)
+        # same order as "first", uploaded earlier
+        self.assertEqual([i["image_url"].rsplit("/", 1)[1] for i in response.data["images"]][:2], ["c.jpg", "first.jpg"])
+
+        etag = response["ETag"]
+        image.delete()
+        response = self.detail(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["images"]), 3)
+
+
+@override_settings(CATALOG_RESPONSE_CACHE_ENABLED=False)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.bikes = [BuyBike.objects.create(title=f"Bike {i}", price=40000 + i) for i in range(15)]
+
+    def get(self, params, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return APIClient().get("/api/buybikes/", params, **headers)
+
+    def test_listing_revalidates_with_a_304_until_the_selection_changes(self):
+        params = {"ordering": "price", "price_min": 40005}
+        first = self.get(params)
+        etag = first["ETag"]
+        self.assertIn("no-cache", first["Cache-Control"])
+        revalidated = self.get(params, etag)
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b"")
+        since = APIClient().get("/api/buybikes/", params, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(since.status_code, 304)
+
+        self.assertNotEqual(self.get({**params, "ordering": "-price"})["ETag"], etag)
+        # a bike outside the filter does not matter, one inside does, and so does a delete
+        BuyBike.objects.filter(pk=self.bikes[0].pk).update(title="Renamed", updated_at=timezone.now())
+        self.assertEqual(self.get(params, etag).status_code, 304)
+        self.bikes[-1].delete()
+        self.assertEqual(self.get(params, etag).status_code, 200)
+
+    def test_detail_revalidates_with_a_304_until_the_bike_changes(self):
+        url = f"/api/buybikes/{self.bikes[0].pk}/"
+        etag = APIClient().get(url)["ETag"]
+        self.assertEqual(APIClient().get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.bikes[0].price = 1
+        self.bikes[0].save()
+        response = APIClient().get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(str(response.data["price"])), 1)
+
+    def test_page_number_mode_counts_the_selection_once(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get({"price_min": 40001, "page": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["count"], len(response.data["results"])), (14, 2))
+        self.assertEqual([q["sql"].upper().count("COUNT(") for q in ctx.captured_queries], [1, 0])
+        self.assertEqual(self.get({"price_min": 40001, "page": 3}).status_code, 404)
+
+    def test_cursor_pages_do_not_count_the_selection(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get({"pagination": "cursor", "page_size": 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(ctx), 1)
+        self.assertNotIn("COUNT(", ctx[0]["sql"].upper())
+
+    def test_cursor_page_etag_tracks_only_its_own_rows(self):
+        params = {"pagination": "cursor", "page_size": 5, "ordering": "price"}
+        etag = self.get(params)["ETag"]
+        self.assertEqual(self.get(params, etag).status_code, 304)
+
+        BuyBike.objects.filter(pk=self.bikes[-1].pk).update(title="Renamed", updated_at=timezone.now())
+        self.assertEqual(self.get(params, etag).status_code, 304)
+
+        BuyBike.objects.filter(pk=self.bikes[0].pk).update(title="Renamed", updated_at=timezone.now())
+        response = self.get(params, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_http_and_https_responses_are_cached_apart(self):
+        from django.core.cache import caches
+
+        caches["catalog"].clear()
+        BuyBike.objects.filter(pk=self.bikes[0].pk).update(featured_image="buybikes/images/f.jpg")
+        with self.settings(CATALOG_RESPONSE_CACHE_ENABLED=True):
+            plain = APIClient().get("/api/buybikes/", {"ordering": "price"})
+            secure = APIClient().get("/api/buybikes/", {"ordering": "price"}, secure=True)
+        self.assertEqual((plain["X-Cache"], secure["X-Cache"]), ("MISS", "MISS"))
+        self.assertNotEqual(plain["ETag"], secure["ETag"])
+        self.assertTrue(secure.data["results"][0]["featured_image"].startswith("https://"))
+        self.assertEqual(self.get({"ordering": "price"}, secure["ETag"]).status_code, 200)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        for cache in caches.all():
+            cache.clear()
+        self.location = Location.objects.create(name="Chennai")
+        self.bikes = [
+            BuyBike.objects.create(title=f"Bike {i}", price=40000 + i, location=self.location) for i in range(4)
+        ]
+        self.params = {"ordering": "price", "available": "true"}
+
+    def get(self):
+        return APIClient().get("/api/buybikes/", self.params)
+
+    def assertMissesAfter(self, change):
+        first = self.get()
+        self.assertEqual(first["X-Cache"], "MISS")
+        version = catalog_version()
+        change()
+        self.assertGreater(catalog_version(), version)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.get()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertTrue(ctx.captured_queries)
+        return response
+
+    def test_repeated_request_is_served_without_queries(self):
+        first = self.get()
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.get()
+        self.assertEqual((first["X-Cache"], second["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(len(ctx), 0)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_saving_a_bike_invalidates(self):
+        def rename():
+            self.bikes[0].title = "Renamed"
+            self.bikes[0].save()
+
+        response = self.assertMissesAfter(rename)
+        self.assertEqual(response.data["results"][0]["title"], "Renamed")
+
+    def test_saving_a_location_invalidates(self):
+        def rename():
+            self.location.name = "Madurai"
+            self.location.save()
+
+        response = self.assertMissesAfter(rename)
+        self.assertEqual(response.data["results"][0]["location_obj"]["name"], "Madurai")
+
+    def test_booking_invalidates(self):
+        def book():
+            with self.captureOnCommitCallbacks(execute=True):
+                bookings.book(self.bikes[0])
+
+        response = self.assertMissesAfter(book)
+        self.assertNotIn(self.bikes[0].pk, [row["id"] for row in response.data["results"]])
+
+    def test_expiring_holds_invalidates(self):
+        hold = bookings.book(self.bikes[0])
+        Booking.objects.filter(pk=hold.pk).update(
+            created_at=timezone.now() - timedelta(minutes=settings.BOOKING_HOLD_MINUTES + 5),
+        )
+        response = self.assertMissesAfter(bookings.expire_holds)
+        self.assertIn(self.bikes[0].pk, [row["id"] for row in response.data["results"]])
+
+    def test_stats_command_counts_hits_and_misses(self):
+        for _ in range(3):
+            self.get()
+        self.params = {**self.params, "ordering": "-price"}
+        self.get()
+        out = StringIO()
+        call_command("catalog_cache_stats", "--reset", stdout=out)
+        self.assertIn("2 hits, 2 misses (50.0% hit ratio)", out.getvalue())
+        self.assertEqual(response_stats(), {"hits": 0, "misses": 0, "hit_ratio": 0.0})
+
+
+@override_settings(CATALOG_RESPONSE_CACHE_ENABLED=False)
+class InventoryIndexTests(TestCase):
+    """The columnar index must page exactly like the ORM path, NULLs and ties included."""
+    FILTERS = [{}, {"available": "true"}, {"available": "true", "price_min": 50000}, {"year_min": 2016}, {"brand": "honda"}]
+    ORDERINGS = ["", "created_at", "-created_at", "price", "-price", "year", "-year", "kilometers", "-kilometers"]
+
+    @classmethod
+    def setUpTestData(cls):
+        brands = [Brand.objects.resolve(name) for name in ("Honda", "Bajaj")]
+        for i in range(30):
+            BuyBike.objects.create(
+                title=f"Bike {i}", brand=brands[i % 2], is_booked=i % 4 == 0,
+                price=40000 + (i % 5) * 10000,  # five prices, six bikes each
+                year=None if i % 3 == 0 else 2014 + i % 4,
+                kilometers=None if i % 5 == 0 else (i % 3) * 10000,
+            )
+        # a bulk import stamps many rows with the same created_at
+        BuyBike.objects.filter(pk__in=BuyBike.objects.values("pk")[:10]).update(created_at=timezone.now())
+
+    def setUp(self):
+        inventory._index = inventory.InventoryIndex()
+
+    def pages(self, params):
+        ids, page = [], 1
+        while True:
+            response = APIClient().get("/api/buybikes/", {**params, "page": page})
+            self.assertEqual(response.status_code, 200)
+            ids.append([row["id"] for row in response.data["results"]])
+            if not response.data["next"]:
+                return ids
+            page += 1
+
+    def test_indexed_pages_match_the_orm(self):
+        for filters, ordering in itertools.product(self.FILTERS, self.ORDERINGS):
+            params = {**filters, **({"ordering": ordering} if ordering else {})}
+            with self.subTest(**params):
+                with self.settings(INVENTORY_INDEX_ENABLED=False):
+                    expected = self.pages(params)
+                with self.settings(INVENTORY_INDEX_ENABLED=True):
+                    self.assertEqual(self.pages(params), expected)
+        self.assertIsNotNone(inventory._index.columns)
+
+    def test_a_refresh_between_mask_and_ordering_does_not_break_the_request(self):
+        with self.settings(INVENTORY_INDEX_ENABLED=False):
+            expected = self.pages({"available": "true", "ordering": "price"})
+        real_mask = inventory.InventoryIndex.mask
+
+        def mask_then_refresh(index, cols, filterset):
+            mask = real_mask(index, cols, filterset)
+            # another thread merges: the index now holds arrays of a different length
+            index.columns = {name: column[:-3] for name, column in index.columns.items()}
+            return mask
+
+        with self.settings(INVENTORY_INDEX_ENABLED=True):
+            inventory.shared_index(BuyBike)
+            with mock.patch.object(inventory.InventoryIndex, "mask", mask_then_refresh):
+                response = APIClient().get("/api/buybikes/", {"available": "true", "ordering": "price"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.data["results"]], expected[0])
+
+    def test_orm_order_puts_nulls_last_and_breaks_ties_by_id(self):
+        rows = [row for page in self.pages({"ordering": "-year"}) for row in page]
+        years = dict(BuyBike.objects.values_list("id", "year"))
+        expected = sorted(years, key=lambda pk: (years[pk] is None, -(years[pk] or 0), -pk))
+        self.assertEqual(rows, expected)
+
+    def test_refresh_picks_up_a_late_commit_with_an_older_updated_at(self):
+        index = inventory.shared_index(BuyBike)
+        bike = BuyBike.objects.order_by("updated_at").last()
+        # committed after the index read, stamped before its watermark
+        BuyBike.objects.filter(pk=bike.pk).update(price=1, updated_at=index.watermark - timedelta(seconds=30))
+        index.refresh(BuyBike, force=True)
+        position = list(index.columns["id"]).index(bike.pk)
+        self.assertEqual(index.columns["price"][position], 1)
+
+    def test_suggest_refresh_picks_up_a_late_commit_with_an_older_updated_at(self):
+        index = suggest.SuggestIndex()
+        index.refresh(BuyBike, force=True)
+        bike = BuyBike.objects.order_by("updated_at").last()
+        BuyBike.objects.filter(pk=bike.pk).update(title="Zephyr", updated_at=index.watermark - timedelta(seconds=30))
+        index.refresh(BuyBike, force=True)
+        self.assertEqual([row["value"] for row in index.lookup("zep")], ["Zephyr"])
+
+
+class ExportImportRoundTripTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.enterContext(self.settings(MEDIA_ROOT=self.media))
+        self.location = Location.objects.create(name="Chennai")
+        self.brand = Brand.objects.resolve("Honda")
+
+    def bikes(self, count, external_ref=False):
+        bikes = []
+        for i in range(count):
+            bike = BuyBike.objects.create(
+                title=f"Bike {i}", price=40000 + i, brand=self.brand, location=self.location,
+                external_ref=f"ext-{i}" if external_ref else None,
+            )
+            for order in (1, 2):
+                name = default_storage.save("buybikes/variants/v.jpg", ContentFile(f"{bike.pk}-{order}".encode()))
+                BikeImage.objects.create(bike=bike, image=name, order=order)
+            bikes.append(bike)
+        return bikes
+
+    def export_file(self, fmt):
+        path = f"{self.media}/export.{'csv' if fmt == 'csv' else 'jsonl'}"
+        with open(path, "wb") as handle:
+            handle.writelines(export.stream(BuyBike.objects.all(), fmt))
+        return path
+
+    def reimport(self, path):
+        return BikeImporter(images_dir=self.media).run(read_records(path))
+
+    def test_an_export_reimports_onto_the_same_bikes(self):
+        self.bikes(2, external_ref=True)
+        self.bikes(3)
+        galleries = {bike.pk: list(bike.images.order_by("order").values_list("image", flat=True)) for bike in BuyBike.objects.all()}
+        for fmt in export.FORMATS:
+            with self.subTest(fmt=fmt):
+                stats = self.reimport(self.export_file(fmt))
+                self.assertEqual((stats.created, stats.updated, stats.failed), (0, 5, 0), stats.errors)
+                self.assertEqual(BuyBike.objects.count(), 5)
+                for bike in BuyBike.objects.all():
+                    self.assertEqual(list(bike.images.order_by("order").values_list("image", flat=True)), galleries[bike.pk])
+
+    def test_an_unknown_id_creates_a_bike(self):
+        path = f"{self.media}/new.jsonl"
+        with open(path, "w") as handle:
+            handle.write('{"id": 987654, "title": "Fresh", "price": 1}\n')
+        stats = self.reimport(path)
+        self.assertEqual((stats.created, stats.updated), (1, 0))
+        self.assertFalse(BuyBike.objects.filter(pk=987654).exists())
+        self.assertTrue(BuyBike.objects.filter(title="Fresh").exists())
+
+    def test_import_queries_do_not_grow_with_the_chunk(self):
+        counts = []
+        for rows in (2, 8):
+            BuyBike.objects.all().delete()
+            self.bikes(rows, external_ref=True)
+            path = f"{self.media}/titles.jsonl"
+            with open(path, "w") as handle:
+                # partial updates: the search documents still need brand / location
+                handle.writelines(f'{{"external_ref": "ext-{i}", "title": "Renamed {i}"}}\n' for i in range(rows))
+            with CaptureQueriesContext(connection) as ctx:
+                self.reimport(path)
+            counts.append(len(ctx))
+        self.assertEqual(counts[0], counts[1])
+        # full export files (galleries included) as well
+        path = self.export_file("csv")
+        with CaptureQueriesContext(connection) as ctx:
+            self.reimport(path)
+        BuyBike.objects.filter(pk__in=BuyBike.objects.values("pk")[:6]).delete()
+        path = self.export_file("csv")
+        with CaptureQueriesContext(connection) as small:
+            self.reimport(path)
+        self.assertEqual(len(small), len(ctx))
+
+
+class ImportCommandTests(TestCase):
+    def setUp(self):
+        self.media, self.source = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.addCleanup(shutil.rmtree, self.source)
+        self.enterContext(self.settings(MEDIA_ROOT=self.media))
+
+    def write(self, *lines):
+        path = os.path.join(self.source, "bikes.jsonl")
+        with open(path, "w") as handle:
+            handle.writelines(f"{line}\n" for line in lines)
+        return path
+
+    def image(self, name, color="red"):
+        Image.new("RGB", (8, 8), color).save(os.path.join(self.source, name), "JPEG")
+
+    def media_files(self):
+        return sorted(os.path.relpath(os.path.join(root, name), self.media) for root, _, names in os.walk(self.media) for name in names)
+
+    def import_bikes(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_bikes", path, "--images-dir", self.source, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_dry_run_validates_and_writes_nothing(self):
+        self.image("a.jpg")
+        path = self.write(
+            '{"title": "A", "price": 1, "location": "Pune", "featured_image": "a.jpg"}',
+            '{"title": "B", "price": "cheap"}',
+        )
+        out, err = self.import_bikes(path, "--dry-run")
+        self.assertIn("Dry run: 2 records", out)
+        self.assertIn("1 created, 0 updated, 1 failed", out)
+        self.assertIn("record 2: price:", err)
+        self.assertEqual((BuyBike.objects.count(), Location.objects.count()), (0, 0))
+        self.assertEqual(self.media_files(), [])
+        self.assertFalse(os.path.exists(f"{path}.checkpoint.json"))
+
+    def test_an_interrupted_import_resumes_after_its_last_committed_chunk(self):
+        path = self.write(*(f'{{"external_ref": "r{i}", "title": "Bike {i}", "price": {i + 1}}}' for i in range(5)))
+        real_write_chunk = BikeImporter.write_chunk
+        calls = []
+
+        def fail_second_chunk(importer, chunk):
+            calls.append(chunk)
+            if len(calls) == 2:
+                raise RuntimeError("disk full")
+            return real_write_chunk(importer, chunk)
+
+        with mock.patch.object(BikeImporter, "write_chunk", fail_second_chunk):
+            with self.assertRaisesMessage(CommandError, "rerun with --resume"):
+                self.import_bikes(path, "--chunk-size", "2")
+        self.assertEqual(sorted(BuyBike.objects.values_list("external_ref", flat=True)), ["r0", "r1"])
+        with open(f"{path}.checkpoint.json") as handle:
+            self.assertEqual(json.load(handle)["records"], 2)
+
+        out, _ = self.import_bikes(path, "--chunk-size", "2", "--resume")
+        self.assertIn("Resuming after record 2.", out)
+        self.assertIn("3 records", out)
+        self.assertEqual(BuyBike.objects.count(), 5)
+        self.assertFalse(os.path.exists(f"{path}.checkpoint.json"))
+
+    def test_error_report_lists_every_failed_record(self):
+        report = os.path.join(self.source, "errors.csv")
+        path = self.write(
+            '{"title": "Fine", "price": 1}',
+            '{"title": "No price"}',
+            "not json",
+            '{"title": "Bad year", "price": 1, "year": "soon"}',
+            '{"title": "No photo", "price": 1, "featured_image": "missing.jpg"}',
+        )
+        self.import_bikes(path, "--error-report", report)
+        with open(report, newline="") as handle:
+            rows = list(csv.reader(handle))
+        self.assertEqual(rows[0], ["record", "error"])
+        self.assertEqual([row[0] for row in rows[1:]], ["2", "3", "4", "5"])
+        self.assertIn("missing required column(s): price", rows[1][1])
+        self.assertIn("invalid JSON", rows[2][1])
+        self.assertTrue(rows[3][1].startswith("year:"))
+        self.assertIn("missing.jpg", rows[4][1])
+        self.assertEqual(BuyBike.objects.count(), 1)
+
+    def test_an_invalid_record_leaves_its_bike_untouched(self):
+        path = self.write(
+            '{"external_ref": "r1", "title": "First", "price": 1}',
+            '{"external_ref": "r1", "title": "Second", "price": "cheap"}',
+        )
+        self.import_bikes(path)
+        self.assertEqual(BuyBike.objects.get(external_ref="r1").title, "First")
+
+    @content_addressed
+    def test_a_rolled_back_chunk_removes_the_files_it_copied(self):
+        self.image("new.jpg", "green")
+        with open(os.path.join(self.source, "new.jpg"), "rb") as handle:
+            kept = default_storage.save("buybikes/images/kept.jpg", ContentFile(handle.read()))
+        BuyBike.objects.create(title="Existing", price=1, featured_image=kept)
+        self.image("other.jpg", "blue")
+        path = self.write(
+            '{"title": "A", "price": 1, "featured_image": "new.jpg", "images": "other.jpg"}',
+        )
+        before = self.media_files()
+        with mock.patch.object(search, "index_bikes", side_effect=RuntimeError("index locked")):
+            with self.assertRaises(CommandError):
+                self.import_bikes(path)
+        self.assertEqual(BuyBike.objects.count(), 1)
+        # a shared (content-addressed) blob of a committed bike stays
+        self.assertEqual(self.media_files(), before)
+        self.assertTrue(default_storage.exists(kept))
+
+
+class ExportEncodingTests(TestCase):
+    def setUp(self):
+        BuyBike.objects.create(title="Bike", price=1)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("staff", "staff@example.com", "secret-pass-123"))
+
+    def test_gzip_follows_the_accept_encoding_q_values(self):
+        cases = {
+            "gzip": True,
+            "gzip, deflate, br": True,
+            "br;q=1.0, gzip;q=0.5": True,
+            "*": True,
+            "gzip;q=0": False,
+            "gzip; q=0.000, deflate": False,
+            "*, gzip;q=0": False,
+            "identity": False,
+            "": False,
+        }
+        for header, gzipped in cases.items():
+            with self.subTest(header=header):
+                response = self.client.get("/api/buybikes/export/", HTTP_ACCEPT_ENCODING=header)
+                body = b"".join(response.streaming_content)
+                self.assertEqual(response.get("Content-Encoding") == "gzip", gzipped)
+                self.assertEqual(body.startswith(b"\x1f\x8b"), gzipped)
+                self.assertIn("Accept-Encoding", response["Vary"])
+
+    def exported_titles(self, params):
+        response = self.client.get("/api/buybikes/export/", {"type": "ndjson", **params})
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        return sorted(json.loads(line)["title"] for line in lines)
+
+    def test_listing_filters_select_the_exported_rows(self):
+        honda, bajaj = Brand.objects.resolve("Honda"), Brand.objects.resolve("Bajaj")
+        for title, brand, price in [
+            ("Shine", honda, 70000), ("Unicorn", honda, 120000), ("Platina", bajaj, 60000), ("Activa", honda, 75000),
+        ]:
+            BuyBike.objects.create(title=title, brand=brand, price=price)
+        self.assertEqual(self.exported_titles({"brand": "honda", "price_max": 80000}), ["Activa", "Shine"])
+        self.assertEqual(self.exported_titles({"brand": "Bajaj,Honda", "price_min": 100000}), ["Unicorn"])
+        self.assertEqual(len(self.exported_titles({})), 5)
+        bad = self.client.get("/api/buybikes/export/", {"price_max": "cheap"})
+        self.assertEqual((bad.status_code, list(bad.data)), (400, ["price_max"]))
+
+    def test_export_needs_a_signed_in_user(self):
+        response = APIClient().get("/api/buybikes/export/")
+        self.assertIn(response.status_code, (401, 403))
+        self.assertNotIn("Bike", response.content.decode())
+
+
+@content_addressed
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.enterContext(self.settings(MEDIA_ROOT=self.media))
+
+    def files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.media).replace(os.sep, "/")
+            for root, _, names in os.walk(self.media) for name in names
+        )
+
+    def test_identical_uploads_share_one_blob(self):
+        first = default_storage.save("buybikes/images/front.JPG", ContentFile(b"bytes"))
+        second = default_storage.save("testimonials/other.jpg", ContentFile(b"bytes"))
+        digest = hashlib.sha256(b"bytes").hexdigest()
+        self.assertEqual(first, f"blobs/{digest[:2]}/{digest[2:4]}/{digest}.jpg")
+        self.assertEqual(second, first)
+        self.assertNotEqual(default_storage.save("a.png", ContentFile(b"bytes")), first)  # the extension is kept
+        self.assertNotEqual(default_storage.save("a.jpg", ContentFile(b"other")), first)
+        self.assertEqual(len(self.files()), 3)
+
+    def test_renditions_keep_their_names(self):
+        original = default_storage.save("buybikes/images/front.jpg", ContentFile(b"bytes"))
+        rendition = renditions.rendition_name(original, 320, "webp")
+        self.assertEqual(default_storage.save(rendition, ContentFile(b"webp")), rendition)
+
+    def test_legacy_files_move_into_blobs(self):
+        for name in ("buybikes/images/old.jpg", "buybikes/variants/copy.jpg"):
+            os.makedirs(os.path.dirname(default_storage.path(name)), exist_ok=True)
+            with open(default_storage.path(name), "wb") as handle:
+                handle.write(b"legacy")
+        bike = BuyBike.objects.create(title="Bike", price=1, featured_image="buybikes/images/old.jpg")
+        image = BikeImage.objects.create(bike=bike, image="buybikes/variants/copy.jpg", order=1)
+
+        call_command("content_address_media", "--dry-run", stdout=StringIO())
+        bike.refresh_from_db()
+        self.assertEqual(bike.featured_image.name, "buybikes/images/old.jpg")
+
+        out = StringIO()
+        call_command("content_address_media", stdout=out)
+        self.assertIn("2 files -> 1 blobs (1 duplicates", out.getvalue())
+        bike.refresh_from_db()
+        image.refresh_from_db()
+        self.assertTrue(bike.featured_image.name.startswith("blobs/"))
+        self.assertEqual(image.image.name, bike.featured_image.name)
+        # the old files stay for collect_media; the blob gets its renditions from the worker
+        self.assertEqual(len(self.files()), 3)
+        self.assertEqual(
+            sorted(ImageJob.objects.filter(name=bike.featured_image.name).values_list("field", flat=True)),
+            ["featured_image", "image"],
+        )
+
+
+@content_addressed
+class CollectMediaTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        self.enterContext(self.settings(MEDIA_ROOT=self.media))
+
+    def blob(self, content):
+        name = default_storage.save("buybikes/images/bike.jpg", ContentFile(content))
+        os.utime(default_storage.path(name), (0, 0))  # well past the grace period
+        return name
+
+    def rendition(self, name):
+        rendition = renditions.rendition_name(name, 320, "webp")
+        with open(default_storage.path(rendition), "wb") as handle:
+            handle.write(b"webp")
+        os.utime(default_storage.path(rendition), (0, 0))
+        return rendition
+
+    def collect(self, *args):
+        out = StringIO()
+        call_command("collect_media", "--grace-hours=1", *args, stdout=out)
+        return out.getvalue()
+
+    def exists(self, *names):
+        return [default_storage.exists(name) for name in names]
+
+    def test_a_shared_blob_is_kept_while_any_row_references_it(self):
+        shared = self.blob(b"same bytes")
+        self.assertEqual(self.blob(b"same bytes"), shared)
+        bike = BuyBike.objects.create(title="Bike", price=1, featured_image=shared)
+        image = BikeImage.objects.create(bike=bike, image=shared, order=1)
+
+        bike.featured_image = ""
+        bike.save()
+        self.collect()
+        self.assertEqual(self.exists(shared), [True])
+
+        image.delete()
+        self.collect()
+        self.assertEqual(self.exists(shared), [False])
+        # emptied shard directories are pruned, MEDIA_ROOT is not
+        self.assertEqual(os.listdir(self.media), [])
+
+    def test_renditions_live_as_long_as_their_original(self):
+        kept, dropped = self.blob(b"kept"), self.blob(b"dropped")
+        BuyBike.objects.create(title="Bike", price=1, featured_image=kept)
+        kept_rendition, dropped_rendition = self.rendition(kept), self.rendition(dropped)
+        self.collect()
+        self.assertEqual(self.exists(kept, kept_rendition, dropped, dropped_rendition), [True, True, False, False])
+
+    def test_dry_run_and_grace_period_remove_nothing(self):
+        old = self.blob(b"old")
+        young = default_storage.save("buybikes/images/young.jpg", ContentFile(b"young"))
+        output = self.collect("--dry-run", "--verbosity=2")
+        self.assertIn(old, output)
+        self.assertNotIn(young, output)
+        self.assertIn("1 unreferenced would be removed", output)
+        self.assertEqual(self.exists(old, young), [True, True])
+
+        self.collect()
+        self.assertEqual(self.exists(old, young), [False, True])
+
+
+@override_settings(CATALOG_RESPONSE_CACHE_ENABLED=False, IMAGE_RENDITION_WIDTHS=[32, 64, 128, 400])
+class RenditionTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(self.settings(MEDIA_ROOT=media))
+        caches["catalog"].clear()
+        renditions.forget()
+        buffer = BytesIO()
+        Image.new("RGB", (200, 100), "blue").save(buffer, "JPEG")
+        self.name = default_storage.save("buybikes/images/blue.jpg", ContentFile(buffer.getvalue()))
+
+    def test_renditions_are_written_at_the_configured_widths_without_upscaling(self):
+        self.assertEqual(renditions.generate(default_storage, self.name), (32, 64, 128))
+        for width, fmt in itertools.product((32, 64, 128), renditions.FORMATS):
+            with self.subTest(width=width, fmt=fmt):
+                with default_storage.open(renditions.rendition_name(self.name, width, fmt), "rb") as handle:
+                    image = Image.open(handle)
+                    self.assertEqual(image.format, renditions.FORMATS[fmt][1])
+                    self.assertEqual(image.size, (width, width // 2))
+        # the original is 200px wide: no 400w file
+        for fmt in renditions.FORMATS:
+            self.assertFalse(default_storage.exists(renditions.rendition_name(self.name, 400, fmt)))
+
+    def assertSrcset(self, srcset):
+        self.assertEqual(set(srcset), set(renditions.FORMATS))
+        for fmt, value in srcset.items():
+            candidates = [candidate.split(" ") for candidate in value.split(", ")]
+            self.assertEqual([descriptor for _, descriptor in candidates], ["32w", "64w", "128w"])
+            for (url, descriptor) in candidates:
+                self.assertTrue(url.startswith("http://testserver/"), url)
+                self.assertTrue(url.endswith(renditions.rendition_name(self.name, int(descriptor[:-1]), fmt)), url)
+
+    def test_serializers_list_every_rendition_with_its_width(self):
+        location = Location.objects.create(name="Chennai", image=self.name)
+        bike = BuyBike.objects.create(title="Bike", price=1, location=location, featured_image=self.name)
+        BikeImage.objects.create(bike=bike, image=self.name)
+        renditions.generate(default_storage, self.name)
+
+        card = APIClient().get("/api/buybikes/").data["results"][0]
+        detail = APIClient().get(f"/api/buybikes/{bike.pk}/").data
+        for label, srcset in [
+            ("card", card["featured_image_srcset"]),
+            ("card location", card["location_obj"]["image_srcset"]),
+            ("detail", detail["featured_image_srcset"]),
+            ("gallery", detail["images"][0]["image_srcset"]),
+        ]:
+            with self.subTest(label):
+                self.assertSrcset(srcset)
+
+    def test_an_image_without_renditions_has_an_empty_srcset(self):
+        bike = BuyBike.objects.create(title="Bike", price=1, featured_image=self.name)
+        card = APIClient().get("/api/buybikes/").data["results"][0]
+        self.assertEqual(card["featured_image_srcset"], {})
+        self.assertTrue(card["featured_image_url"].endswith(self.name))
+        self.assertEqual(APIClient().get(f"/api/buybikes/{bike.pk}/").data["featured_image_srcset"], {})
+
+
+class ImageJobTests(TestCase):
+    def setUp(self):
+        from django.core.cache import caches
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(self.settings(MEDIA_ROOT=media, IMAGE_MAX_DIMENSION=64, IMAGE_RENDITION_WIDTHS=[32]))
+        caches["catalog"].clear()
+        renditions.forget()
+
+    def upload(self, title, size=(200, 100)):
+        buffer = BytesIO()
+        Image.new("RGB", size, "red").save(buffer, "JPEG")
+        # like an admin upload: an uncommitted file written by the save, which queues the job
+        bike = BuyBike.objects.create(title=title, price=1, featured_image=ContentFile(buffer.getvalue(), f"{title}.jpg"))
+        return bike, ImageJob.objects.get(object_id=bike.pk, field="featured_image")
+
+    @content_addressed
+    def test_losing_the_update_race_keeps_a_blob_other_rows_share(self):
+        first, first_job = self.upload("first")
+        second, second_job = self.upload("second")
+        self.assertEqual(first.featured_image.name, second.featured_image.name)  # one deduplicated blob
+
+        self.assertEqual(jobs.process(second_job), "done")
+        shrunk = BuyBike.objects.get(pk=second.pk).featured_image.name
+        real_normalize = renditions.normalize
+
+        def reupload_meanwhile(*args, **kwargs):
+            BuyBike.objects.filter(pk=first.pk).update(featured_image="buybikes/images/newer.jpg")
+            return real_normalize(*args, **kwargs)
+
+        with mock.patch.object(renditions, "normalize", reupload_meanwhile):
+            self.assertEqual(jobs.process(first_job), "superseded")
+        self.assertEqual(first_job.result_name, "")
+        self.assertTrue(default_storage.exists(shrunk))
+
+    def test_pending_renditions_are_remembered_until_the_job_queue_settles_them(self):
+        bike, job = self.upload("small", size=(60, 30))
+        name = bike.featured_image.name
+        self.assertEqual(renditions.available(default_storage, name), ())
+
+        # a catalog version bump alone does not send it back to the storage
+        bump_catalog_version()
+        with mock.patch.object(renditions, "complete") as complete:
+            self.assertEqual(renditions.available(default_storage, name), ())
+        complete.assert_not_called()
+
+        self.assertEqual(jobs.process(job), "done")
+        self.assertEqual(BuyBike.objects.get(pk=bike.pk).featured_image.name, name)  # small enough to keep
+        self.assertEqual(renditions.available(default_storage, name), (32,))
+
+    def test_a_missing_original_stays_pending_until_it_is_rendered(self):
+        bike, _ = self.upload("late")
+        name = bike.featured_image.name
+        content = default_storage.open(name).read()
+        default_storage.delete(name)
+        self.assertEqual(renditions.available(default_storage, name), ())
+
+        # the file shows up (e.g. synced late); the backfill renders it and clears the marker
+        default_storage.save(name, ContentFile(content))
+        self.assertEqual(renditions.available(default_storage, name), ())
+        call_command("generate_renditions", stdout=StringIO())
+        self.assertEqual(renditions.available(default_storage, name), (32,))
+
+    def test_saves_queue_a_job_instead_of_processing_inline(self):
+        bike, job = self.upload("orm")
+        self.assertEqual((job.status, job.field, job.name), ("pending", "featured_image", bike.featured_image.name))
+        with default_storage.open(bike.featured_image.name) as handle:
+            self.assertEqual(Image.open(handle).size, (200, 100))  # IMAGE_MAX_DIMENSION is 64
+        self.assertFalse(default_storage.exists(renditions.rendition_name(bike.featured_image.name, 32, "webp")))
+
+        admin = User.objects.create_superuser("admin", "admin@example.com", "secret-pass-123")
+        self.client.force_login(admin)
+        buffer = BytesIO()
+        Image.new("RGB", (200, 100), "blue").save(buffer, "JPEG")
+        upload = ContentFile(buffer.getvalue(), "pune.jpg")
+        response = self.client.post(reverse("admin:bike_location_add"), {"name": "Pune", "image": upload})
+        self.assertEqual(response.status_code, 302)
+        location = Location.objects.get(name="Pune")
+        job = ImageJob.objects.get(model="bike.location", object_id=location.pk)
+        self.assertEqual((job.status, job.field, job.name), ("pending", "image", location.image.name))
+        with default_storage.open(location.image.name) as handle:
+            self.assertEqual(Image.open(handle).size, (200, 100))
+
+    def test_a_job_is_claimed_by_one_worker_only(self):
+        for i in range(4):
+            self.upload(f"bike{i}")
+        real_filter = ImageJob.objects.filter
+        theirs = []
+
+        def another_worker_claims_first(*args, **kwargs):
+            # between our SELECT of pending ids and our UPDATE, another worker takes two of them
+            if "id__in" in kwargs and not theirs:
+                theirs.append(None)
+                theirs[:] = jobs.claim(2)
+            return real_filter(*args, **kwargs)
+
+        with mock.patch.object(ImageJob.objects, "filter", another_worker_claims_first):
+            mine = jobs.claim(3)
+        self.assertEqual((len(theirs), len(mine)), (2, 1))
+        self.assertFalse({job.pk for job in theirs} & {job.pk for job in mine})
+        self.assertNotEqual(theirs[0].claimed_by, mine[0].claimed_by)
+        self.assertEqual(len(jobs.claim(10)), 1)
+        self.assertEqual(jobs.claim(10), [])
+        self.assertEqual(set(ImageJob.objects.values_list("status", "attempts")), {("running", 1)})
+
+    def test_a_failing_job_is_retried_with_backoff_then_failed(self):
+        _, job = self.upload("broken")
+        with mock.patch.object(jobs, "process", side_effect=OSError("storage offline")):
+            for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+                started = timezone.now()
+                counts = jobs.run_batch()
+                job.refresh_from_db()
+                self.assertEqual(job.attempts, attempt)
+                self.assertEqual(job.last_error, "OSError: storage offline")
+                if attempt == jobs.MAX_ATTEMPTS:
+                    break
+                self.assertEqual((counts, job.status, job.claimed_by), ({"retried": 1}, "pending", ""))
+                # the delay grows with every attempt
+                self.assertGreaterEqual(job.run_after - started, jobs.RETRY_DELAY * attempt)
+                self.assertLess(job.run_after - started, jobs.RETRY_DELAY * attempt + timedelta(seconds=5))
+                self.assertEqual(jobs.run_batch(), {})  # not due yet
+                ImageJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertEqual(counts, {"failed": 1})
+        self.assertEqual(job.status, "failed")
+        self.assertIsNotNone(job.finished_at)
+        ImageJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertEqual(jobs.run_batch(), {})
+
+    def test_a_stale_running_lease_is_released(self):
+        self.upload("crashed")
+        self.upload("busy")
+        crashed, busy = jobs.claim(2)
+        # the worker holding `crashed` died long ago; `busy` is still being worked on
+        ImageJob.objects.filter(pk=crashed.pk).update(claimed_at=timezone.now() - jobs.STALE_AFTER - timedelta(minutes=1))
+        self.assertEqual(jobs.release_stale(), 1)
+        crashed.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual((crashed.status, crashed.claimed_by), ("pending", ""))
+        self.assertEqual(busy.status, "running")
+
+        self.assertEqual(jobs.run_batch(), {"done": 1})
+        crashed.refresh_from_db()
+        self.assertEqual((crashed.status, crashed.attempts), ("done", 2))
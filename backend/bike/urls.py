@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import HeroSectionList, InfoSectionList, SupportFeatureList
-from .views import BuyBikeList, BuyBikeDetail, BookingCreateView, BookingDetailView, BookingConfirmPaymentAPIView
+from .views import BuyBikeList, BuyBikeDetail, BuyBikeFacetsAPIView, BuyBikeSuggestAPIView, BuyBikeSimilarAPIView, BuyBikeExportAPIView, BookingCreateView, BookingDetailView, MyBookingsAPIView, BookingConfirmPaymentAPIView, PricingQuoteAPIView
 from .views import LastSectionLatestAPIView
 from .views import HomepageBannerAPIView
 from .views import TestimonialsAPIView
@@ -19,10 +19,16 @@ urlpatterns = [
     path("support/", SupportFeatureList.as_view(), name="support-features"),
     path("homepage-banner/", HomepageBannerAPIView.as_view(), name="homepage-banner"),
     path("buybikes/", BuyBikeList.as_view(), name="buybike-list"),
+    path("buybikes/facets/", BuyBikeFacetsAPIView.as_view(), name="buybike-facets"),
+    path("buybikes/suggest/", BuyBikeSuggestAPIView.as_view(), name="buybike-suggest"),
+    path("buybikes/export/", BuyBikeExportAPIView.as_view(), name="buybike-export"),
     path("buybikes/<int:pk>/", BuyBikeDetail.as_view(), name="buybike-detail"),
+    path("buybikes/<int:pk>/similar/", BuyBikeSimilarAPIView.as_view(), name="buybike-similar"),
     path("bookings/", BookingCreateView.as_view(), name="booking-create"),
+    path("bookings/mine/", MyBookingsAPIView.as_view(), name="booking-mine"),
     path("bookings/<int:pk>/", BookingDetailView.as_view(), name="booking-detail"),
     path("bookings/<int:pk>/confirm-payment/", BookingConfirmPaymentAPIView.as_view(), name="booking-confirm"),
+    path("pricing/quote/", PricingQuoteAPIView.as_view(), name="pricing-quote"),
     path("last-section/", LastSectionLatestAPIView.as_view(), name="last-section-latest"),
     path("testimonials/", TestimonialsAPIView.as_view(), name="testimonials"),
     path("trusted-section/", TrustedSectionAPIView.as_view(), name="trusted-section"),
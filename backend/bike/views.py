@@ -2,14 +2,30 @@
 from rest_framework import generics, filters
 from .models import BuyBike
 from django_filters.rest_framework import DjangoFilterBackend
-from .serializers import BuyBikeSerializer
+from .serializers import BuyBikeSerializer, BuyBikeCardSerializer
 from .models import HeroSection, InfoSection, SupportFeature
 from .serializers import HeroSectionSerializer, InfoSectionSerializer, SupportFeatureSerializer
-from .filters import BikeFilter  
+from .filters import BikeFilter, BuyBikeOrderingFilter
+from .pagination import BookingHistoryPagination, BuyBikePagination
+from .facets import cached_facets
+from .media import build_media_url
+from . import inventory
+from . import suggest
+from . import similar
+from . import export
+from . import pricing
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from . import conditional
+from .idempotency import idempotent
+from . import cache as catalog_cache
+from django.utils.http import parse_http_date_safe
+from django.db.models import Count, Max
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from .models import HomepageBanner
 from .serializers import HomepageBannerSerializer
@@ -18,7 +34,7 @@ from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 
 from .models import BuyBike, Booking
-from .serializers import BookingCreateSerializer, BookingDetailSerializer
+from .serializers import BookingCreateSerializer, BookingDetailSerializer, FeeLineSerializer, PriceQuoteSerializer
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
@@ -70,7 +86,7 @@ class AboutAPIView(APIView):
         # pick the first instance of each (admin can keep only one).
         s1 = AboutSection1.objects.first()
         s2 = AboutSection2.objects.first()
-        s3 = AboutSection3.objects.first()
+        s3 = AboutSection3.objects.prefetch_related("images").first()
 
         data = {
             "section1": AboutSection1Serializer(s1, context={"request": request}).data if s1 else {},
@@ -110,7 +126,7 @@ class AuthImageAPIView(APIView):
             img = AuthImage.objects.filter(is_active=True, image__isnull=False).order_by("-created_at").first()
             if not img:
                 return Response({"image_url": None})
-            url = request.build_absolute_uri(img.image.url)
+            url = build_media_url(img.image, request)
             return Response({"image_url": url})
         except Exception as exc:
             # log traceback to console / Django log so you can inspect it
@@ -165,13 +181,13 @@ class LastSectionListCreateAPIView(generics.ListCreateAPIView):
     GET: list all sections (most recent first)
     POST: create a new section (admin usage via API if desired)
     """
-    queryset = LastSection.objects.all()
+    queryset = LastSection.objects.prefetch_related("images")
     serializer_class = LastSectionSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]  # restrict POST to authenticated if you want
 
 
 class LastSectionRetrieveAPIView(generics.RetrieveAPIView):
-    queryset = LastSection.objects.all()
+    queryset = LastSection.objects.prefetch_related("images")
     serializer_class = LastSectionSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
@@ -182,7 +198,7 @@ class LastSectionLatestAPIView(generics.GenericAPIView):
     Useful for `/last-section/` endpoint that front-end will call.
     """
     serializer_class = LastSectionSerializer
-    queryset = LastSection.objects.all()
+    queryset = LastSection.objects.prefetch_related("images")
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get(self, request, *args, **kwargs):
@@ -199,34 +215,19 @@ class BookingCreateView(generics.CreateAPIView):
     serializer_class = BookingCreateSerializer
     permission_classes = [AllowAny]  # change if you require auth
 
+    # retries with the same Idempotency-Key replay the first 201 (bike/idempotency.py)
+    @idempotent("booking-create")
+    def post(self, request, *args, **kwargs):
+        return self.create(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         # validate incoming payload
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        buybike = serializer.validated_data.get("buybike")
-        test_drive_fee = float(serializer.validated_data.get("test_drive_fee", 0) or 0)
-
-        # server-side compute: subtotal from buybike.price, gst 18%
-        subtotal = float(getattr(buybike, "price", 0) or 0)
-        gst_amount = round(subtotal * 0.18, 2)
-        total_amount = round(subtotal + gst_amount + test_drive_fee, 2)
-
         user = request.user if request.user and request.user.is_authenticated else None
-
-        booking = Booking.objects.create(
-            buybike=buybike,
-            user=user,
-            amount=subtotal,
-            gst_amount=gst_amount,
-            test_drive_fee=test_drive_fee,
-            total_amount=total_amount,
-            status="created",
-        )
-
-        # mark the product as booked in the buybike table (for admin visibility)
-        buybike.is_booked = True
-        buybike.save(update_fields=["is_booked"])
+        # claims the bike atomically (bike/bookings.py); a bike that is already booked -> 409
+        booking = serializer.save(user=user)
 
         out = BookingDetailSerializer(booking, context={"request": request})
         headers = self.get_success_headers(out.data)
@@ -235,31 +236,96 @@ class BookingCreateView(generics.CreateAPIView):
 
 # Booking detail (used by payment page to show amounts)
 class BookingDetailView(generics.RetrieveAPIView):
-    queryset = Booking.objects.select_related("buybike").all()
+    queryset = Booking.objects.select_related("buybike__location").only(*BookingDetailSerializer.PROJECTION)
     serializer_class = BookingDetailSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
+class MyBookingsAPIView(generics.ListAPIView):
+    """
+    GET /api/bookings/mine/?cursor=<token>&page_size=12
+    The logged-in user's bookings, newest first, in keyset pages. The page is picked by an
+    index-only scan of booking_user_created_idx (id + created_at), then its rows are loaded
+    by pk with the bike and its location, so the cost does not grow with the user's history
+    or the bookings table.
+    """
+    serializer_class = BookingDetailSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = BookingHistoryPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        return Booking.objects.filter(user=self.request.user).only("id", "created_at")
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        rows = (
+            Booking.objects.select_related("buybike__location").only(*BookingDetailSerializer.PROJECTION)
+            .order_by().in_bulk([booking.pk for booking in page])
+        )
+        serializer = self.get_serializer([rows[booking.pk] for booking in page if booking.pk in rows], many=True)
+        return self.get_paginated_response(serializer.data)
+
+
 # Optional: lightweight confirm endpoint that only toggles booking.status to 'paid' (no payment details saved)
 class BookingConfirmPaymentAPIView(APIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    # a retried confirmation replays its 200 instead of answering "Already paid"
+    @idempotent("booking-confirm")
     def post(self, request, pk):
         booking = get_object_or_404(Booking, pk=pk)
 
         if booking.status == "paid":
             return Response({"detail": "Already paid"}, status=status.HTTP_400_BAD_REQUEST)
 
+        if booking.status == "expired":
+            return Response({"detail": "Booking hold expired"}, status=status.HTTP_409_CONFLICT)
+
         # toggle paid — do NOT save payment_method or payment_reference (as requested)
-        booking.status = "paid"
-        booking.save(update_fields=["status"])
+        # conditional on the status read above, so a hold expired meanwhile by the sweeper stays expired
+        if not Booking.objects.filter(pk=booking.pk, status=booking.status).update(status="paid"):
+            return Response({"detail": "Booking hold expired"}, status=status.HTTP_409_CONFLICT)
 
         return Response({"detail": "Booking marked as paid"}, status=status.HTTP_200_OK)
 
 
 
+class PricingQuoteAPIView(APIView):
+    """
+    GET /api/pricing/quote/?ids=3,7,12&fees=test_drive
+    Exact price + taxes (+ chosen fees) for up to pricing.MAX_IDS bikes from one query, cached per
+    bike per catalog version (bike/pricing.py):
+    {"quotes": [{"id": 3, "price": "85000.00", "taxes": [...], "tax_total": ..., "fees": [...], "total": ...}],
+     "missing": [12], "fees": [{"code": "test_drive", "amount": "1000.00"}]}
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        raw_ids = [part for value in request.query_params.getlist("ids") for part in value.split(",") if part.strip()]
+        try:
+            ids = list(dict.fromkeys(int(part) for part in raw_ids))
+        except ValueError:
+            return Response({"ids": "Must be comma separated integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids or len(ids) > pricing.MAX_IDS:
+            return Response({"ids": f"Give between 1 and {pricing.MAX_IDS} bike ids."}, status=status.HTTP_400_BAD_REQUEST)
+
+        available = pricing.fees()
+        codes = [code.strip() for code in request.query_params.get("fees", "").split(",") if code.strip()]
+        unknown = [code for code in codes if code not in available]
+        if unknown:
+            return Response({"fees": f"Unknown fees: {', '.join(unknown)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        quotes, missing = pricing.quote_many(ids, {code: available[code] for code in codes})
+        return Response({
+            "quotes": PriceQuoteSerializer([{"id": pk, **quotes[pk]} for pk in ids if pk in quotes], many=True).data,
+            "missing": missing,
+            "fees": FeeLineSerializer([{"code": code, "amount": amount} for code, amount in available.items()], many=True).data,
+        })
+
+
 class HeroSectionList(generics.ListAPIView):
-    queryset = HeroSection.objects.all()
+    queryset = HeroSection.objects.prefetch_related("bike_images")
     serializer_class = HeroSectionSerializer
 
 class InfoSectionList(generics.ListAPIView):
@@ -270,23 +336,200 @@ class SupportFeatureList(generics.ListAPIView):
     queryset = SupportFeature.objects.all()
     serializer_class = SupportFeatureSerializer
 
-class BuyBikeList(generics.ListAPIView):
-    queryset = BuyBike.objects.all()
-    serializer_class = BuyBikeSerializer
+class CatalogResponseCacheMixin:
+    """
+    Serves GETs from the catalog response cache, keyed by the catalog version
+    plus the normalized query params / url kwargs. Only 200s are stored; the
+    stored ETag / Last-Modified still answer conditional requests with 304.
+    """
+    cache_scope = None
 
-    # enable django-filter + DRF search & ordering
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
+    def get(self, request, *args, **kwargs):
+        if not catalog_cache.response_cache_enabled():
+            return super().get(request, *args, **kwargs)
+
+        signature = "|".join([conditional.query_signature(request), *(f"{k}={v}" for k, v in sorted(kwargs.items()))])
+        key = catalog_cache.response_key(self.cache_scope, request, signature)
+        entry = catalog_cache.get_response(key)
+        if entry is not None:
+            response = None
+            if entry["etag"]:
+                response = conditional.not_modified(request, entry["etag"], entry["last_modified"])
+            if response is None:
+                response = Response(entry["data"])
+            if entry["etag"]:
+                conditional.set_validators(response, entry["etag"], entry["last_modified"])
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            catalog_cache.set_response(key, {
+                "data": response.data,
+                "etag": response.get("ETag"),
+                "last_modified": parse_http_date_safe(response.get("Last-Modified", "")),
+            })
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class BuyBikeList(CatalogResponseCacheMixin, generics.ListAPIView):
+    # listing cards only need a handful of columns; BuyBikeDetail serves the full record
+    queryset = BuyBike.objects.select_related(*BuyBikeCardSerializer.load_related).only(*BuyBikeCardSerializer.load_only)
+    serializer_class = BuyBikeCardSerializer
+    # page-number by default; ?pagination=cursor switches to keyset pages
+    pagination_class = BuyBikePagination
+
+    # enable django-filter + ordering; ?search= is handled by BikeFilter's full-text index
+    filter_backends = [DjangoFilterBackend, BuyBikeOrderingFilter]
     filterset_class = BikeFilter
 
     ordering_fields = ["created_at", "price", "kilometers", "year"]
     ordering = ["-created_at"]
-    # keep DRF search, but our BikeFilter also provides 'search' param; both can coexist
-    search_fields = ["title", "brand", "category", "description", "location__name"]
+
+    cache_scope = "buybike-list"
+
+    def filter_queryset(self, queryset):
+        # answered from the in-memory columnar index when enabled (see bike/inventory.py)
+        indexed = inventory.lookup(self, queryset)
+        if indexed is not None:
+            return indexed
+        return super().filter_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        # conditional GET: fingerprint the selection before serializing anything
+        cursor_mode = self.paginator is not None and self.paginator.is_cursor_request(request)
+        if cursor_mode:
+            # a keyset page never counts the selection; fingerprint the page itself
+            page = self.paginate_queryset(queryset)
+            etag, last_modified = conditional.page_validators(
+                request, page, self.paginator.delegate.has_next, self.paginator.delegate.has_previous,
+            )
+        else:
+            if isinstance(queryset, inventory.IndexedResult):
+                latest, total = queryset.latest, queryset.count()
+            else:
+                state = queryset.order_by().aggregate(latest=Max("updated_at"), total=Count("id"))
+                latest, total = state["latest"], state["total"]
+            etag, last_modified = conditional.list_validators(request, latest, total)
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+        if not cursor_mode:
+            page = None
+            if self.paginator is not None:
+                # the paginator reuses the count of the validators instead of its own COUNT(*)
+                page = self.paginator.paginate_queryset(queryset, request, view=self, count=total)
+        if page is not None:
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        else:
+            response = Response(self.get_serializer(queryset, many=True).data)
+        return conditional.set_validators(response, etag, last_modified)
+
+
+class BuyBikeFacetsAPIView(APIView):
+    """
+    GET /api/buybikes/facets/?<same filters as /api/buybikes/>
+    Returns counts per brand/category/fuel_type/color/owners/transmission and
+    price/year buckets for the current selection, cached per catalog version.
+    """
+    def get(self, request, *args, **kwargs):
+        filterset = BikeFilter(request.query_params, queryset=BuyBike.objects.all(), request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(cached_facets(filterset))
+
+
+class BuyBikeExportAPIView(APIView):
+    """
+    GET /api/buybikes/export/?type=csv|ndjson&<same filters as /api/buybikes/>
+    Streams every matching bike (bike/export.py); gzip-compressed on the fly
+    when the client sends Accept-Encoding: gzip.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        fmt = request.query_params.get("type", "csv")
+        if fmt not in export.FORMATS:
+            return Response({"type": f"Choose one of {', '.join(export.FORMATS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        filterset = BikeFilter(request.query_params, queryset=BuyBike.objects.all(), request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        gzip = export.accepts_gzip(request.META.get("HTTP_ACCEPT_ENCODING"))
+        response = StreamingHttpResponse(
+            export.stream(filterset.qs, fmt, gzip=gzip), content_type=f"{export.FORMATS[fmt]}; charset=utf-8"
+        )
+        filename = f"buybikes-{timezone.now():%Y%m%d}.{fmt}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        if gzip:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
+
+class BuyBikeSuggestAPIView(APIView):
+    """
+    GET /api/buybikes/suggest/?q=<prefix>&limit=10
+    Typeahead completions from the in-memory prefix index (bike/suggest.py):
+    {"query": "hon", "results": [{"kind": "brand", "value": "Honda", "count": 12}, ...]}
+    """
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "")
+        try:
+            limit = int(request.query_params.get("limit", suggest.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"limit": "Must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, suggest.MAX_LIMIT))
+        return Response({"query": query, "results": suggest.suggest(query, limit)})
 
 
-class BuyBikeDetail(generics.RetrieveAPIView):
-    queryset = BuyBike.objects.select_related("location").all()
+class BuyBikeDetail(CatalogResponseCacheMixin, generics.RetrieveAPIView):
+    queryset = BuyBike.objects.select_related(
+        "location", "brand", "bike_model", "bike_variant", "fuel_type", "color", "category"
+    ).prefetch_related("images")
     serializer_class = BuyBikeSerializer
+    cache_scope = "buybike-detail"
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = conditional.object_validators(request, instance)
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return conditional.set_validators(response, etag, last_modified)
+
+class BuyBikeSimilarAPIView(CatalogResponseCacheMixin, generics.RetrieveAPIView):
+    """
+    GET /api/buybikes/<pk>/similar/?limit=8
+    Unbooked bikes most similar to <pk> (bike/similar.py), as listing cards
+    with their score: {"bike": <pk>, "results": [{...card, "score": 5.12}, ...]}
+    """
+    queryset = BuyBike.objects.select_related(*BuyBikeCardSerializer.load_related).only(*BuyBikeCardSerializer.load_only)
+    serializer_class = BuyBikeCardSerializer
+    cache_scope = "buybike-similar"
+
+    def retrieve(self, request, *args, **kwargs):
+        bike = get_object_or_404(BuyBike.objects.only("id", "price", "brand", "category"), pk=kwargs["pk"])
+        try:
+            limit = int(request.query_params.get("limit", similar.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"limit": "Must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, similar.MAX_LIMIT))
+
+        ranked = similar.similar_ids(bike, limit)
+        rows = self.get_queryset().in_bulk([pk for pk, _ in ranked])
+        results = []
+        for pk, score in ranked:
+            if pk in rows:
+                item = self.get_serializer(rows[pk]).data
+                item["score"] = score
+                results.append(item)
+        return Response({"bike": bike.pk, "results": results})
+
 
 class HomepageBannerAPIView(APIView):
     def get(self, request, *args, **kwargs):
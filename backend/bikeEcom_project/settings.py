@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 import os
 from pathlib import Path
+from django.conf import global_settings
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -68,6 +70,8 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+# Payment.jsx sends an Idempotency-Key with booking/confirm-payment POSTs (bike/idempotency.py)
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 SESSION_COOKIE_SAMESITE = None
 SESSION_COOKIE_SECURE = False  
 CSRF_COOKIE_SAMESITE = None
@@ -113,10 +117,34 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # a file (not the shared in-memory default) so the threaded booking
+        # contention test gets SQLite's busy-wait locking instead of "table is locked"
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# "catalog" holds the catalog version counter, facet counts and cached buybike
+# responses (bike/cache.py). Local memory is per process; with several workers
+# use a shared backend, e.g. CATALOG_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# and CATALOG_CACHE_LOCATION=redis://127.0.0.1:6379/1, or FileBasedCache with a directory.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': os.environ.get("CATALOG_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.environ.get("CATALOG_CACHE_LOCATION", "bike-catalog"),
+        'TIMEOUT': int(os.environ.get("CATALOG_CACHE_TIMEOUT", 600)),
+    },
+}
+# Cache BuyBikeList / BuyBikeDetail responses per catalog version
+CATALOG_RESPONSE_CACHE_ENABLED = os.environ.get("CATALOG_RESPONSE_CACHE_ENABLED", "True") == "True"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -158,6 +186,31 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Optional CDN origin for media files, e.g. "https://cdn.example.com"
+MEDIA_CDN_URL = os.environ.get("MEDIA_CDN_URL", "")
+
+# Opt-in: store new uploads once per distinct content under sharded hash paths (bike/storage.py)
+MEDIA_CONTENT_ADDRESSED = os.environ.get("MEDIA_CONTENT_ADDRESSED", "False") == "True"
+if MEDIA_CONTENT_ADDRESSED:
+    STORAGES = {**global_settings.STORAGES, "default": {"BACKEND": "bike.storage.ContentAddressedStorage"}}
+
+# Serve BuyBikeList filtering/sorting from an in-process NumPy index (bike/inventory.py)
+INVENTORY_INDEX_ENABLED = os.environ.get("INVENTORY_INDEX_ENABLED", "False") == "True"
+INVENTORY_INDEX_REFRESH_SECONDS = int(os.environ.get("INVENTORY_INDEX_REFRESH_SECONDS", 5))
+# Max staleness of the typeahead prefix index (bike/suggest.py) between catalog version bumps
+SUGGEST_REFRESH_SECONDS = int(os.environ.get("SUGGEST_REFRESH_SECONDS", 5))
+# Widths of the WebP/JPEG renditions written next to every uploaded image (bike/renditions.py)
+IMAGE_RENDITION_WIDTHS = [int(w) for w in os.environ.get("IMAGE_RENDITION_WIDTHS", "320,640,1024,1600").split(",")]
+# Longest side of stored originals; larger uploads are shrunk by `process_image_jobs`
+IMAGE_MAX_DIMENSION = int(os.environ.get("IMAGE_MAX_DIMENSION", 2560))
+# How long a booking/confirm-payment response is replayed for its Idempotency-Key
+IDEMPOTENCY_KEY_TTL_HOURS = float(os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+# Unpaid bookings older than this are expired and their bikes released (`expire_booking_holds`)
+BOOKING_HOLD_MINUTES = float(os.environ.get("BOOKING_HOLD_MINUTES", 30))
+# Taxes charged on a bike's price as "code:rate" pairs, e.g. "cgst:0.09,sgst:0.09" (bike/pricing.py)
+PRICING_TAX_RULES = os.environ.get("PRICING_TAX_RULES", "gst:0.18")
+# Optional, untaxed add-ons as "code:amount" pairs
+PRICING_FEES = os.environ.get("PRICING_FEES", "test_drive:1000")
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -3,6 +3,9 @@ import { Link } from "react-router-dom";
 import axios from "axios";
 import ccImg from "../../assets/images/cc.png";
 
+// cards span a third of the grid on desktop, half on tablets
+const CARD_SIZES = "(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw";
+
 export default function HomeBikes({ ids = [1, 2, 3], highlightFirst = true }) {
   const [bikes, setBikes] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -85,6 +88,8 @@ export default function HomeBikes({ ids = [1, 2, 3], highlightFirst = true }) {
                   {b.card_bg_image_url && (
                     <img
                       src={b.card_bg_image_url}
+                      srcSet={b.card_bg_image_srcset?.webp || undefined}
+                      sizes={CARD_SIZES}
                       alt="card bg"
                       className="absolute inset-0 w-full h-full object-cover"
                       style={{ opacity: 1 }}
@@ -93,6 +98,8 @@ export default function HomeBikes({ ids = [1, 2, 3], highlightFirst = true }) {
 
                   <img
                     src={b.featured_image_url ?? b.featured_image ?? ""}
+                    srcSet={b.featured_image_srcset?.webp || undefined}
+                    sizes={CARD_SIZES}
                     alt={b.title}
                     className="relative max-h-44 object-contain p-4 z-10"
                   />
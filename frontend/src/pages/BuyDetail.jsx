@@ -70,16 +70,11 @@ export default function BuyDetail() {
     return makeUrl(p);
   };
 
-  // Choose an initial image: prefer featured -> variant1..5 -> gallery entries
+  // Choose an initial image: prefer featured -> gallery entries
   const pickInitialFromData = (data) => {
     if (!data) return null;
     const candidates = [
       data.featured_image_url ?? data.featured_image,
-      data.variant_image1_url ?? data.variant_image1,
-      data.variant_image2_url ?? data.variant_image2,
-      data.variant_image3_url ?? data.variant_image3,
-      data.variant_image4_url ?? data.variant_image4,
-      data.variant_image5_url ?? data.variant_image5,
       ...(Array.isArray(data.gallery_urls) ? data.gallery_urls : (Array.isArray(data.gallery) ? data.gallery : []))
     ].filter(Boolean);
     return candidates.length ? candidates[0] : null;
@@ -258,11 +253,6 @@ export default function BuyDetail() {
 
   const thumbnails = [
     bike.featured_image_url ?? bike.featured_image,
-    bike.variant_image1_url ?? bike.variant_image1,
-    bike.variant_image2_url ?? bike.variant_image2,
-    bike.variant_image3_url ?? bike.variant_image3,
-    bike.variant_image4_url ?? bike.variant_image4,
-    bike.variant_image5_url ?? bike.variant_image5,
     ...(Array.isArray(bike.gallery_urls) ? bike.gallery_urls : (Array.isArray(bike.gallery) ? bike.gallery : []))
   ]
     .map(normUrl)
@@ -8,6 +8,9 @@ import EvImg from "../assets/images/ev.png";
 import ccImg from "../assets/images/cc.png";
 import logoImg from "../assets/images/logo.png";
 
+// cards span a third of the grid on desktop, half on tablets
+const CARD_SIZES = "(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw";
+
 function AccordionBlock({ title, children, open, onToggle }) {
   return (
     <div className="mb-4">
@@ -391,6 +394,8 @@ export default function BuyPage() {
                   {b.card_bg_image_url && (
                     <img
                       src={b.card_bg_image_url}
+                      srcSet={b.card_bg_image_srcset?.webp || undefined}
+                      sizes={CARD_SIZES}
                       alt="card bg"
                       className="absolute inset-0 w-full h-full object-cover opacity-100"
                     />
@@ -403,6 +408,8 @@ export default function BuyPage() {
 
                   <img
                     src={b.featured_image_url ?? b.featured_image}
+                    srcSet={b.featured_image_srcset?.webp || undefined}
+                    sizes={CARD_SIZES}
                     alt={b.title}
                     className="relative max-h-48 object-contain p-4"
                   />
@@ -59,7 +59,19 @@ export default function Payment() {
   const [selectedMethod, setSelectedMethod] = useState("paytm");
 
   const [showSuccessModal, setShowSuccessModal] = useState(false);
+  // server-side price quote (exact taxes/fees) for the product flow; without it there is no price to pay
+  const [quote, setQuote] = useState(null);
+  const [quoteFailed, setQuoteFailed] = useState(false);
   const successTimeoutRef = useRef(null);
+  // one Idempotency-Key per action, reused by double clicks and retries so the server replays instead of re-booking
+  const idempotencyKeysRef = useRef({});
+  const idempotencyHeaders = (action) => {
+    if (!idempotencyKeysRef.current[action]) {
+      idempotencyKeysRef.current[action] =
+        window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    }
+    return { headers: { "Idempotency-Key": idempotencyKeysRef.current[action] } };
+  };
 
   useEffect(() => {
     if (bookingId) {
@@ -158,29 +170,58 @@ export default function Payment() {
     setError("Product not found (404) or backend unreachable. Check attempted URLs below.");
   }
 
+  useEffect(() => {
+    if (mode !== "product" || !productId) return;
+    let cancelled = false;
+    const query = `ids=${productId}${testDriveFlag ? "&fees=test_drive" : ""}`;
+    setQuote(null);
+    setQuoteFailed(false);
+    (async () => {
+      for (const url of [makeUrl(`/pricing/quote/?${query}`), makeUrl(`/api/pricing/quote/?${query}`)]) {
+        try {
+          const res = await axios.get(url);
+          const bikeQuote = res.data?.quotes?.[0];
+          if (!bikeQuote) continue;
+          if (!cancelled) setQuote(bikeQuote);
+          return;
+        } catch (err) {
+          continue;
+        }
+      }
+      if (!cancelled) setQuoteFailed(true);
+    })();
+    return () => {
+      cancelled = true;
+    };
+  }, [mode, productId, testDriveFlag]);
+
   const subtotal = useMemo(() => {
     if (mode === "booking" && booking) return Number(booking.amount || 0);
     if (mode === "product" && product) return Number(product.price || 0);
     return 0;
   }, [mode, booking, product]);
 
+  // fees, taxes and totals only ever come from the server (booking or quote); null = not priced (yet)
   const testDriveFee = useMemo(() => {
-    // booking provides server value
     if (mode === "booking" && booking) return Number(booking.test_drive_fee || 0);
-    // product flow uses query param passed from BuyDetail
-    if (mode === "product") return testDriveFlag ? 1000 : 0;
-    return 0;
-  }, [mode, booking, product, testDriveFlag]);
+    if (mode === "product" && quote) return quote.fees.reduce((sum, fee) => sum + Number(fee.amount), 0);
+    return null;
+  }, [mode, booking, quote]);
 
   const gst = useMemo(() => {
     if (mode === "booking" && booking) return Number(booking.gst_amount || 0);
-    return Number((subtotal * 0.18).toFixed(2));
-  }, [mode, booking, subtotal]);
+    if (mode === "product" && quote) return Number(quote.tax_total);
+    return null;
+  }, [mode, booking, quote]);
 
   const grandTotal = useMemo(() => {
     if (mode === "booking" && booking) return Number(booking.total_amount || subtotal + gst + testDriveFee);
-    return Number((subtotal + gst + testDriveFee).toFixed(2));
-  }, [mode, booking, subtotal, gst, testDriveFee]);
+    if (mode === "product" && quote) return Number(quote.total);
+    return null;
+  }, [mode, booking, subtotal, gst, testDriveFee, quote]);
+
+  const priced = grandTotal !== null;
+  const money = (value) => (value === null ? "—" : `Rs.${value.toFixed(2)}`);
 
   const showSuccessThenRedirect = () => {
     setShowSuccessModal(true);
@@ -193,6 +234,7 @@ export default function Payment() {
   };
 
   const handleConfirm = async () => {
+    if (!priced) return;
     setProcessing(true);
     setError(null);
 
@@ -206,7 +248,7 @@ export default function Payment() {
         let ok = false;
         for (const url of candidates) {
           try {
-            await axios.post(url, {});
+            await axios.post(url, {}, idempotencyHeaders(`confirm-${booking.id}`));
             ok = true;
             break;
           } catch (err) {
@@ -228,9 +270,9 @@ export default function Payment() {
           try {
             const payload = {
               buybike: Number(productId),
-              test_drive_fee: testDriveFlag ? 1000 : 0, // pass test drive fee according to query param
+              fees: testDriveFlag ? ["test_drive"] : [], // fee codes; the server prices them (same as the quote)
             };
-            const res = await axios.post(url, payload);
+            const res = await axios.post(url, payload, idempotencyHeaders(`create-${productId}-${payload.fees.join(",")}`));
             created = res.data;
             break;
           } catch (err) {
@@ -246,7 +288,7 @@ export default function Payment() {
         ];
         for (const url of confirmCandidates) {
           try {
-            await axios.post(url, {});
+            await axios.post(url, {}, idempotencyHeaders(`confirm-${created.id}`));
             break;
           } catch (err) {
             continue;
@@ -318,23 +360,36 @@ export default function Payment() {
 
               <div className="space-y-3 text-sm">
                 <div className="flex justify-between"><div>SubTotal</div><div>Rs.{subtotal.toFixed(2)}</div></div>
-                <div className="flex justify-between"><div>GST (18%)</div><div>Rs.{gst.toFixed(2)}</div></div>
-                <div className="flex justify-between"><div>Test Drive</div><div>Rs.{testDriveFee.toFixed(2)}</div></div>
+                <div className="flex justify-between"><div>GST</div><div>{money(gst)}</div></div>
+                <div className="flex justify-between"><div>Test Drive</div><div>{money(testDriveFee)}</div></div>
 
                 <div className="border-t border-gray-200 mt-3 pt-3 flex justify-between items-center">
                   <div className="text-base font-semibold">Grand Total</div>
-                  <div className="text-base font-bold">Rs.{grandTotal.toFixed(2)}</div>
+                  <div className="text-base font-bold">{money(grandTotal)}</div>
                 </div>
               </div>
 
+              {quoteFailed && (
+                <div className="mt-3 text-sm text-red-600">
+                  We could not get the price of this bike. Please reload the page to try again.
+                </div>
+              )}
               {error && <div className="mt-3 text-sm text-red-600">{String(error)}</div>}
 
               <button
                 onClick={handleConfirm}
-                disabled={processing}
-                className={`mt-6 w-full rounded-full py-3 text-white font-medium ${processing ? "bg-gray-400" : "bg-[#07435c]"}`}
+                disabled={processing || !priced}
+                className={`mt-6 w-full rounded-full py-3 text-white font-medium ${
+                  processing || !priced ? "bg-gray-400" : "bg-[#07435c]"
+                }`}
               >
-                {processing ? "Processing..." : "Confirm Payment"}
+                {processing
+                  ? "Processing..."
+                  : priced
+                    ? "Confirm Payment"
+                    : quoteFailed
+                      ? "Price unavailable"
+                      : "Fetching price..."}
               </button>
             </div>
           </div>